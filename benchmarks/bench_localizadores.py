@@ -0,0 +1,102 @@
+"""
+Micro-benchmark: busca dos campos do formulário por XPath (label) x por id em cache.
+
+Abre um Chrome headless numa página local que imita o formulário do
+'registerIframe' (labels + inputs com ids aleatórios, mais N elementos de
+"ruído") e mede o tempo por registro das 7 buscas de campo em cada estratégia.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_localizadores --registros 200 --ruido 2000
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import tempfile
+import statistics
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main import XPATHS  # noqa: E402
+from utils.localizadores import LocalizadorCampos  # noqa: E402
+
+LABELS = ['Nome', 'Sobrenome', 'Email', 'Cargo', 'Empresa', 'Endereço', 'Telefone']
+
+
+def gerar_html(ruido):
+    """Formulário com ids aleatórios (como um form gerado por framework) e 'ruido' divs extras."""
+    linhas = []
+    for label in LABELS:
+        id_ = f"f-{uuid.uuid4().hex[:8]}"
+        linhas.append(f'<div><label for="{id_}">{label}</label><input id="{id_}"></div>')
+    enchimento = "\n".join(f'<div class="x"><span>item {n}</span></div>' for n in range(ruido))
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>
+{enchimento}
+<form>{''.join(linhas)}<button type="button">Cadastrar Funcionário</button></form>
+</body></html>"""
+
+
+def medir(funcao, registros):
+    """Executa 'funcao' uma vez por registro e retorna a lista de tempos (ms)."""
+    tempos = []
+    for _ in range(registros):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def resumo(nome, tempos):
+    tempos_ordenados = sorted(tempos)
+    p95 = tempos_ordenados[int(len(tempos_ordenados) * 0.95) - 1]
+    print(f"{nome:<22} média={statistics.mean(tempos):8.2f} ms  "
+          f"p50={statistics.median(tempos):8.2f} ms  p95={p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=200, help="Registros simulados (7 buscas cada).")
+    parser.add_argument("--ruido", type=int, default=2000, help="Elementos extras no documento.")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False, encoding='utf-8') as f:
+        f.write(gerar_html(args.ruido))
+        pagina = f.name
+
+    opcoes = Options()
+    opcoes.add_argument("--headless=new")
+    opcoes.add_argument("--no-sandbox")
+    opcoes.add_argument("--disable-dev-shm-usage")
+    driver = webdriver.Chrome(options=opcoes)
+
+    try:
+        driver.get(f"file://{pagina}")
+        campos = [c for c in XPATHS if c.startswith("campo_") and "//label[" in XPATHS[c]]
+
+        def por_xpath():
+            for campo in campos:
+                driver.find_element("xpath", XPATHS[campo])
+
+        localizador = LocalizadorCampos(XPATHS)
+        inicio = time.perf_counter()
+        localizador.resolver(driver)
+        custo_resolucao = (time.perf_counter() - inicio) * 1000
+
+        def por_id():
+            for campo in campos:
+                localizador.encontrar(driver, campo)
+
+        print(f"Registros: {args.registros} | Campos por registro: {len(campos)} | Ruído: {args.ruido} elementos")
+        print(f"Resolução única dos ids (por carregamento do formulário): {custo_resolucao:.2f} ms")
+        resumo("XPath por label", medir(por_xpath, args.registros))
+        resumo("By.ID (cache)", medir(por_id, args.registros))
+    finally:
+        driver.quit()
+        os.remove(pagina)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Benchmark de ponta a ponta do robô contra a réplica local do site.
+
+Sobe o 'site_local' numa thread, gera planilhas com N linhas e executa as
+funções REAIS do main.py (login, download, leitura e cadastro). Reporta
+registros/s, latência por registro (p50/p95/p99) e pico de RSS, e compara
+com um resultado anterior (baseline).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.executar_benchmark --linhas 100 1000 --saida bench_atual.json
+    python -m benchmarks.executar_benchmark --linhas 1000 --baseline bench_atual.json --workers 4
+    python -m benchmarks.executar_benchmark --linhas 100 --inicio sequencial   # inicialização antiga, para comparar
+    python -m benchmarks.executar_benchmark --linhas 1000 --taxa-falha 0.02 --verificar   # conferência em lote
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import configparser
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main as robo  # noqa: E402
+from utils import helpers  # noqa: E402
+from utils import logs  # noqa: E402
+from utils import metricas  # noqa: E402
+from utils import esperas  # noqa: E402
+from utils import credenciais  # noqa: E402
+from utils import saude  # noqa: E402
+from utils.checkpoint import JournalCadastro  # noqa: E402
+from benchmarks import site_local  # noqa: E402
+
+try:
+    import psutil  # Opcional: mede a árvore de processos inteira (Python + chromedriver + Chrome)
+except ImportError:
+    psutil = None
+
+
+class MedidorRSS:
+    """Amostra o RSS (processo atual + filhos) numa thread e guarda o pico."""
+
+    def __init__(self, intervalo=0.2):
+        self.intervalo = intervalo
+        self.pico_bytes = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name="medidor-rss", daemon=True)
+
+    def _rss_atual(self):
+        if psutil:
+            processo = psutil.Process()
+            total = 0
+            for p in [processo] + processo.children(recursive=True):
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        try:
+            import resource
+            # Sem psutil: só o pico do próprio processo Python (ru_maxrss em KiB no Linux)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+    def _amostrar(self):
+        while not self._parar.is_set():
+            self.pico_bytes = max(self.pico_bytes, self._rss_atual())
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        return False
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, max(0, round(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+def instrumentar_cadastro(latencias):
+    """
+    Envolve main.cadastrar_registro para medir cada registro. A troca é feita
+    no módulo, então vale tanto para o modo sequencial quanto para o paralelo.
+    """
+    original = robo.cadastrar_registro
+    lock = threading.Lock()
+
+    def cadastrar_registro_medido(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            with lock:
+                latencias.append((time.perf_counter() - inicio) * 1000)
+
+    robo.cadastrar_registro = cadastrar_registro_medido
+    return original
+
+
+def montar_contexto(url, pasta_download, perfil_enxuto):
+    """
+    Contexto como o do 'carregar_contexto', com a senha do site criptografada
+    (salt novo e cache de chaves limpo: a descriptografia custa o PBKDF2
+    inteiro, como no início de um processo novo).
+    """
+    salt = base64.b64encode(os.urandom(16)).decode()
+    cifra = credenciais.Credenciais("benchmark", salt)
+    config = configparser.ConfigParser()
+    config['CREDENCIAS_APP'] = {
+        "chave_mestra": "benchmark",
+        "salt": salt,
+        "senha_criptografada": cifra.criptografar(site_local.SENHA_PADRAO),
+    }
+    config['EMAIL'] = {"email_senha_criptografada": cifra.criptografar("nao-usada")}
+    credenciais._chaves_derivadas.clear()
+
+    return {
+        "config": config,
+        "url_login": url,
+        "usuario": site_local.USUARIO_PADRAO,
+        "diretorio_rpa": pasta_download,
+        "opcoes_navegador": {
+            "chromedriver_path": None,
+            "perfil_chrome": None,
+            "arquivo_sessao": None,
+            "perfil_enxuto": perfil_enxuto,
+        },
+    }
+
+
+def executar_cenario(linhas, args):
+    """Executa o robô de ponta a ponta para uma planilha de 'linhas' registros."""
+    pasta = tempfile.mkdtemp(prefix="bench_rpa_")
+    planilha = site_local.gerar_planilha(os.path.join(pasta, "origem", "funcionarios.xlsx"), linhas)
+    estado = site_local.EstadoSite(planilha, latencia_ms=args.latencia_ms, taxa_falha=args.taxa_falha, semente=1)
+    servidor, url = site_local.iniciar_em_thread(estado)
+
+    pasta_download = os.path.join(pasta, "download")
+    latencias = []
+    original = instrumentar_cadastro(latencias)
+    driver = None
+    perfil_enxuto = list(robo.PADROES_BLOQUEADOS_PADRAO) if args.enxuto else None
+    ctx = montar_contexto(url, pasta_download, perfil_enxuto)
+
+    try:
+        with MedidorRSS() as medidor:
+            metricas.reiniciar()
+            esperas.reiniciar()
+            inicio = time.perf_counter()
+            if args.inicio == "sobreposto":
+                driver = robo.iniciar_sessao_sobreposta(ctx, lambda: robo.descriptografar_segredos(ctx))
+            else:
+                with metricas.span("inicializacao.credenciais"):
+                    robo.descriptografar_segredos(ctx)
+                with metricas.span("inicializacao.login"):
+                    driver = robo.abrir_sessao(ctx)
+            fim_inicializacao = time.perf_counter()
+            caminho = robo.baixar_planilha(
+                driver, pasta_download, robo.XPATHS["botao_baixar_planilha"], download_direto=args.download_direto
+            )
+            dados = helpers.ler_planilha_stream(caminho)
+
+            inicio_cadastro = time.perf_counter()
+            if args.http:
+                # Motor HTTP (com volta para o navegador, se o contrato mudar)
+                ctx.update({
+                    "http_concorrencia": args.http_concorrencia, "http_timeout": 15,
+                    "disjuntor": robo.DisjuntorSite(),
+                })
+                sucessos, falhas = robo.cadastrar_funcionarios_http(
+                    driver, dados, robo.XPATHS, ctx, None,
+                    lambda restantes: robo.cadastrar_funcionarios(driver, restantes, robo.XPATHS)
+                )
+            elif args.workers > 1:
+                sucessos, falhas = robo.cadastrar_funcionarios_paralelo(
+                    driver, dados, robo.XPATHS, args.workers,
+                    lambda: robo.iniciar_e_logar(
+                        pasta_download, url, site_local.USUARIO_PADRAO, site_local.SENHA_PADRAO,
+                        robo.XPATHS, perfil_enxuto=perfil_enxuto
+                    ),
+                    preenchimento_rapido=args.preenchimento_rapido
+                )
+            elif args.abas > 1:
+                sucessos, falhas = robo.cadastrar_funcionarios_abas(
+                    driver, dados, robo.XPATHS, args.abas, preenchimento_rapido=args.preenchimento_rapido
+                )
+            elif args.verificar:
+                # Envio sem confirmação por registro + conferência em lote pela API de cadastros
+                ctx.update({
+                    "url_verificacao": "/challenger/api/funcionarios", "verificacao_campo_email": "email",
+                    "verificacao_lote": args.verificacao_lote, "verificacao_reenvios": 2,
+                    "verificacao_parametro_offset": "offset",
+                    "http_timeout": 15, "vigia": saude.VigiaNavegador(None),
+                })
+                journal = JournalCadastro(os.path.join(pasta, "journal_cadastro.txt"))
+                sucessos, falhas = robo.cadastrar_com_conferencia(
+                    driver, dados, ctx, journal,
+                    lambda pendentes, journal_envio=None, confirmar=True: robo.cadastrar_funcionarios(
+                        driver, pendentes, robo.XPATHS, journal=journal_envio,
+                        preenchimento_rapido=args.preenchimento_rapido, confirmar=confirmar
+                    )
+                )
+                journal.fechar()
+            else:
+                sucessos, falhas = robo.cadastrar_funcionarios(
+                    driver, dados, robo.XPATHS, preenchimento_rapido=args.preenchimento_rapido
+                )
+            fim = time.perf_counter()
+
+            robo.logout(driver, robo.XPATHS)
+    finally:
+        robo.cadastrar_registro = original
+        if driver:
+            robo.encerrar_driver(driver)
+        servidor.shutdown()
+        servidor.server_close()
+
+    resumo = metricas.resumo()
+    ordenadas = sorted(latencias)
+    percentis = {p: round(percentil(ordenadas, p), 1) for p in (50, 95, 99)}
+    if not latencias and (args.http or args.abas > 1):
+        # No motor HTTP e no modo abas o cadastrar_registro não é chamado:
+        # os percentis vêm direto do histograma do span de cada registro
+        span_registro = resumo["spans"].get("registro.total", {})
+        percentis = {p: span_registro.get(f"p{p}_ms", 0.0) for p in (50, 95, 99)}
+    duracao_cadastro = fim - inicio_cadastro
+    return {
+        "linhas": linhas,
+        "workers": args.workers,
+        "abas": args.abas,
+        "preenchimento_rapido": args.preenchimento_rapido,
+        "motor_http": args.http,
+        "verificacao_em_lote": args.verificar,
+        "perfil_enxuto": args.enxuto,
+        "latencia_servidor_ms": args.latencia_ms,
+        "taxa_falha": args.taxa_falha,
+        "sucessos": sucessos,
+        "falhas": falhas,
+        "cadastros_no_servidor": len(estado.cadastros),
+        "duracao_total_s": round(fim - inicio, 3),
+        "duracao_cadastro_s": round(duracao_cadastro, 3),
+        "registros_por_s": round(linhas / duracao_cadastro, 2) if duracao_cadastro else 0.0,
+        "latencia_p50_ms": percentis[50],
+        "latencia_p95_ms": percentis[95],
+        "latencia_p99_ms": percentis[99],
+        "inicio": args.inicio,
+        "inicializacao_s": round(fim_inicializacao - inicio, 3),
+        "tempo_ate_primeiro_registro_s": resumo["marcos"].get("primeiro_registro"),
+        "pico_rss_mb": round(medidor.pico_bytes / 1024 / 1024, 1),
+    }
+
+
+def comparar(resultados, baseline):
+    """Imprime a variação de cada cenário em relação ao baseline (mesmo número de linhas)."""
+    por_linhas = {r["linhas"]: r for r in baseline.get("resultados", [])}
+    for atual in resultados:
+        base = por_linhas.get(atual["linhas"])
+        if not base:
+            continue
+        print(f"\nComparação com baseline ({atual['linhas']} linhas):")
+        for chave in ("registros_por_s", "tempo_ate_primeiro_registro_s", "latencia_p50_ms", "latencia_p95_ms", "latencia_p99_ms", "pico_rss_mb"):
+            if base.get(chave) and atual.get(chave) is not None:
+                variacao = (atual[chave] - base[chave]) / base[chave] * 100
+                print(f"  {chave:<30} {base[chave]:>10} -> {atual[chave]:>10} ({variacao:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100], help="Tamanhos de planilha (100 a 100000).")
+    parser.add_argument("--latencia-ms", type=float, default=0, help="Latência injetada no servidor.")
+    parser.add_argument("--taxa-falha", type=float, default=0.0, help="Probabilidade de falha por cadastro.")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--abas", type=int, default=1, help="Abas do mesmo navegador cadastrando intercaladas.")
+    parser.add_argument("--preenchimento-rapido", action="store_true")
+    parser.add_argument("--http", action="store_true", help="Cadastra pelo motor HTTP em vez do navegador.")
+    parser.add_argument("--http-concorrencia", type=int, default=8)
+    parser.add_argument(
+        "--inicio", choices=("sobreposto", "sequencial"), default="sobreposto",
+        help="Inicialização: navegador em paralelo com a descriptografia (padrão) ou uma etapa após a outra."
+    )
+    parser.add_argument("--download-direto", action="store_true", help="Baixa a planilha pelo link (HTTP) em vez do navegador.")
+    parser.add_argument(
+        "--verificar", action="store_true",
+        help="Envia sem esperar cada confirmação e confere em lote o que o servidor gravou (reenvia os ausentes)."
+    )
+    parser.add_argument("--verificacao-lote", type=int, default=5000, help="Registros por conferência (0 = uma só no fim).")
+    parser.add_argument("--enxuto", action="store_true", help="Usa o perfil enxuto (headless) do navegador.")
+    parser.add_argument("--saida", help="Grava o resultado em JSON (para servir de baseline).")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação.")
+    args = parser.parse_args()
+
+    # Mesmo logging assíncrono do robô (sem config.ini: valores padrão)
+    logs.configurar_logging(None)
+
+    resultados = []
+    for linhas in args.linhas:
+        print(f"\n=== Cenário: {linhas} linhas ===")
+        resultado = executar_cenario(linhas, args)
+        resultados.append(resultado)
+        for chave, valor in resultado.items():
+            print(f"  {chave:<24} {valor}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            comparar(resultados, json.load(f))
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"), "resultados": resultados}, f, indent=2)
+        print(f"\nResultado salvo em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
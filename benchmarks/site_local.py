@@ -0,0 +1,284 @@
+"""
+Réplica local (offline) do site do desafio, para benchmarks e testes do robô.
+
+Reproduz o que o main.py usa: tela de login, dashboard com "Baixar Planilha",
+"Cadastrar" (página com o iframe 'registerIframe' e o formulário) e "Sair".
+Latência e falhas podem ser injetadas para simular um servidor real.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.site_local --porta 8765 --linhas 1000 --latencia-ms 20 --taxa-falha 0.01
+"""
+import os
+import json
+import time
+import hashlib
+import random
+import secrets
+import argparse
+import threading
+import urllib.parse
+from html import escape
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+USUARIO_PADRAO = "usuario_app"
+SENHA_PADRAO = "senha_app"
+
+CAMPOS = [
+    ("nome", "Nome"), ("sobrenome", "Sobrenome"), ("email", "Email"), ("cargo", "Cargo"),
+    ("empresa", "Empresa"), ("endereco", "Endereço"), ("telefone", "Telefone"),
+]
+
+_PAGINA = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>{titulo}</title></head>
+<body>{corpo}</body></html>"""
+
+_NAV = """<nav>
+<a href="/challenger/dashboard/download" download>Baixar Planilha</a>
+<a href="/challenger/cadastro">Cadastrar</a>
+<a href="/logout">Sair</a>
+</nav>"""
+
+# O formulário é um <form> de verdade (action + CSRF), enviado via fetch pelo JS;
+# após o sucesso, o JS limpa os campos e mostra o toast (como o site real).
+_JS_FORMULARIO = """
+<div id="toast" style="display:none">Funcionário cadastrado com sucesso!</div>
+<script>
+document.getElementById('registerForm').addEventListener('submit', function (ev) {
+    ev.preventDefault();
+    var form = ev.target, toast = document.getElementById('toast');
+    toast.style.display = 'none';
+    fetch(form.action, {method: 'POST', body: new URLSearchParams(new FormData(form)), credentials: 'same-origin'})
+        .then(function (r) { return r.json().then(function (j) { return [r.ok, j]; }); })
+        .then(function (res) {
+            if (!res[0]) { return; }
+            form.querySelectorAll('input[type=text]').forEach(function (i) { i.value = ''; });
+            toast.style.display = 'block';
+        });
+});
+</script>
+"""
+
+
+class EstadoSite:
+    """Estado compartilhado do site: sessões, planilha servida e cadastros recebidos."""
+
+    def __init__(self, planilha=None, usuario=USUARIO_PADRAO, senha=SENHA_PADRAO,
+                 latencia_ms=0, taxa_falha=0.0, semente=None):
+        self.planilha = planilha          # caminho do .xlsx servido em "Baixar Planilha"
+        self.usuario = usuario
+        self.senha = senha
+        self.latencia_ms = latencia_ms    # atraso aplicado a cada requisição
+        self.taxa_falha = taxa_falha      # probabilidade de o cadastro responder 500
+        self.sessoes = set()
+        self.csrf = {}                    # {sessao: token}
+        self.cadastros = []               # registros aceitos, na ordem de chegada
+        self.falhas_injetadas = 0
+        self.lock = threading.Lock()
+        self.aleatorio = random.Random(semente)
+
+
+class ManipuladorSite(BaseHTTPRequestHandler):
+    estado = None  # EstadoSite, definido por 'criar_servidor'
+    protocol_version = "HTTP/1.1"  # Keep-alive (toda resposta tem Content-Length)
+
+    # --- utilitários ---
+
+    def log_message(self, formato, *args):
+        pass  # Silencioso: o benchmark não pode ser afetado por I/O de log
+
+    def _sessao(self):
+        cookies = self.headers.get("Cookie", "")
+        for parte in cookies.split(";"):
+            nome, _, valor = parte.strip().partition("=")
+            if nome == "sessao" and valor in self.estado.sessoes:
+                return valor
+        return None
+
+    def _responder(self, status, corpo, tipo="text/html; charset=utf-8", cabecalhos=None):
+        dados = corpo if isinstance(corpo, bytes) else corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _redirecionar(self, destino, cabecalhos=None):
+        cab = {"Location": destino}
+        cab.update(cabecalhos or {})
+        self._responder(303, "", cabecalhos=cab)
+
+    def _pagina(self, titulo, corpo):
+        self._responder(200, _PAGINA.format(titulo=titulo, corpo=corpo))
+
+    def _atrasar(self):
+        if self.estado.latencia_ms:
+            time.sleep(self.estado.latencia_ms / 1000)
+
+    def _ler_formulario(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        return dict(urllib.parse.parse_qsl(self.rfile.read(tamanho).decode("utf-8")))
+
+    # --- rotas ---
+
+    def do_GET(self):
+        self._atrasar()
+        caminho = urllib.parse.urlsplit(self.path).path
+        sessao = self._sessao()
+
+        if caminho in ("/", "/login"):
+            return self._pagina("Login", """<form method="post" action="/login">
+<input id="username" name="username" type="text"><input id="password" name="password" type="password">
+<button type="submit">Entrar</button></form>""")
+
+        if caminho == "/logout":
+            with self.estado.lock:
+                self.estado.sessoes.discard(sessao)
+            return self._redirecionar("/", {"Set-Cookie": "sessao=; Max-Age=0; Path=/"})
+
+        if not sessao:
+            return self._redirecionar("/")
+
+        if caminho == "/challenger/dashboard":
+            return self._pagina("Dashboard", _NAV + "<h1>Dashboard</h1>")
+
+        if caminho == "/challenger/cadastro":
+            return self._pagina("Cadastro", _NAV + '<iframe id="registerIframe" src="/challenger/form"></iframe>')
+
+        if caminho == "/challenger/form":
+            return self._pagina("Formulário", self._html_formulario(sessao))
+
+        if caminho == "/challenger/dashboard/download":
+            if not self.estado.planilha:
+                return self._responder(404, "Nenhuma planilha configurada.")
+            with open(self.estado.planilha, "rb") as f:
+                dados = f.read()
+            # ETag/Last-Modified como num servidor real: requisição condicional recebe 304
+            etag = '"%s"' % hashlib.sha256(dados).hexdigest()[:32]
+            modificado = formatdate(os.path.getmtime(self.estado.planilha), usegmt=True)
+            if self.headers.get("If-None-Match") == etag:
+                return self._responder(304, b"", cabecalhos={"ETag": etag, "Last-Modified": modificado})
+            return self._responder(
+                200, dados,
+                tipo="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                cabecalhos={
+                    "Content-Disposition": 'attachment; filename="funcionarios.xlsx"',
+                    "ETag": etag,
+                    "Last-Modified": modificado,
+                }
+            )
+
+        if caminho == "/challenger/api/funcionarios":
+            # ?offset=N devolve só os cadastros a partir do N-ésimo (lista só de inclusão)
+            consulta = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+            inicio = int(consulta.get("offset", 0) or 0)
+            with self.estado.lock:
+                corpo = json.dumps(self.estado.cadastros[inicio:], ensure_ascii=False)
+            return self._responder(200, corpo, tipo="application/json")
+
+        self._responder(404, "Não encontrado.")
+
+    def do_POST(self):
+        self._atrasar()
+        caminho = urllib.parse.urlsplit(self.path).path
+        dados = self._ler_formulario()
+
+        if caminho == "/login":
+            if dados.get("username") == self.estado.usuario and dados.get("password") == self.estado.senha:
+                sessao = secrets.token_hex(16)
+                with self.estado.lock:
+                    self.estado.sessoes.add(sessao)
+                return self._redirecionar("/challenger/dashboard", {"Set-Cookie": f"sessao={sessao}; Path=/"})
+            return self._redirecionar("/")
+
+        sessao = self._sessao()
+        if not sessao:
+            return self._responder(401, json.dumps({"erro": "sessão expirada"}), tipo="application/json")
+
+        if caminho == "/challenger/api/funcionarios":
+            if dados.pop("csrf_token", None) != self.estado.csrf.get(sessao):
+                return self._responder(403, json.dumps({"erro": "csrf inválido"}), tipo="application/json")
+            with self.estado.lock:
+                if self.estado.aleatorio.random() < self.estado.taxa_falha:
+                    self.estado.falhas_injetadas += 1
+                    falhar = True
+                else:
+                    falhar = False
+                    self.estado.cadastros.append(dados)
+            if falhar:
+                return self._responder(500, json.dumps({"erro": "falha injetada"}), tipo="application/json")
+            return self._responder(201, json.dumps({"ok": True}), tipo="application/json")
+
+        self._responder(404, "Não encontrado.")
+
+    def _html_formulario(self, sessao):
+        # Ids aleatórios a cada carregamento (o robô precisa achar os campos pelo label)
+        with self.estado.lock:
+            token = self.estado.csrf.setdefault(sessao, secrets.token_hex(16))
+        linhas = []
+        for nome, label in CAMPOS:
+            id_ = f"f-{secrets.token_hex(4)}"
+            linhas.append(f'<div><label for="{id_}">{escape(label)}</label>'
+                          f'<input type="text" id="{id_}" name="{nome}"></div>')
+        return (f'<form id="registerForm" method="post" action="/challenger/api/funcionarios">'
+                f'<input type="hidden" name="csrf_token" value="{token}">{"".join(linhas)}'
+                f'<button type="submit">Cadastrar Funcionário</button></form>{_JS_FORMULARIO}')
+
+
+def criar_servidor(estado, host="127.0.0.1", porta=0):
+    """Cria (sem iniciar) o servidor HTTP. Com porta=0 o sistema escolhe uma porta livre."""
+    manipulador = type("Manipulador", (ManipuladorSite,), {"estado": estado})
+    return ThreadingHTTPServer((host, porta), manipulador)
+
+
+def iniciar_em_thread(estado, host="127.0.0.1", porta=0):
+    """Sobe o servidor numa thread daemon e retorna (servidor, url_base)."""
+    servidor = criar_servidor(estado, host, porta)
+    threading.Thread(target=servidor.serve_forever, name="site-local", daemon=True).start()
+    return servidor, f"http://{host}:{servidor.server_address[1]}"
+
+
+def gerar_planilha(caminho, linhas, semente=42):
+    """Gera uma planilha de funcionários fictícios (openpyxl em modo write-only)."""
+    from openpyxl import Workbook
+
+    aleatorio = random.Random(semente)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([label for _, label in CAMPOS])
+    for n in range(1, linhas + 1):
+        ws.append([
+            f"Nome{n}", f"Sobrenome{n}", f"funcionario{n}@empresa.com",
+            aleatorio.choice(["Analista", "Gerente", "Desenvolvedor", "Assistente"]),
+            aleatorio.choice(["ACME", "Globex", "Initech"]),
+            f"Rua {n}, {aleatorio.randint(1, 999)}", f"11{aleatorio.randint(900000000, 999999999)}",
+        ])
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    wb.save(caminho)
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--linhas", type=int, default=100, help="Linhas da planilha gerada.")
+    parser.add_argument("--planilha", help="Usa esta planilha em vez de gerar uma.")
+    parser.add_argument("--latencia-ms", type=float, default=0)
+    parser.add_argument("--taxa-falha", type=float, default=0.0)
+    args = parser.parse_args()
+
+    planilha = args.planilha or gerar_planilha(os.path.join("bench_dados", f"funcionarios_{args.linhas}.xlsx"), args.linhas)
+    estado = EstadoSite(planilha, latencia_ms=args.latencia_ms, taxa_falha=args.taxa_falha)
+    servidor = criar_servidor(estado, porta=args.porta)
+    print(f"Site local em http://127.0.0.1:{args.porta} (usuário '{USUARIO_PADRAO}', senha '{SENHA_PADRAO}')")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
+import sys
 import base64
 import os
-import getpass
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
+import time
+import argparse
+
+from utils.credenciais import Credenciais, ITERACOES_PADRAO, medir_kdf, sugerir_iteracoes
 
 # A chave mestra que você forneceu
 CHAVE_MESTRA = "TESTERPA"
@@ -12,47 +12,94 @@ SENHA_APP = 'SENHA_APP'
 SENHA_EMAIL = 'SENHA_EMAIL'
 
 
-def derivar_chave(salt, chave_mestra):
-    """Deriva uma chave Fernet segura a partir da chave mestra e do salt."""
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-        backend=default_backend()
-    )
-    # Retorna a chave no formato que o Fernet espera
-    return base64.urlsafe_b64encode(kdf.derive(chave_mestra.encode()))
+def criptografar_senha(credenciais, senha, iteracoes=ITERACOES_PADRAO):
+    """Criptografa a senha (a chave é derivada uma única vez e reaproveitada)."""
+    return credenciais.criptografar(senha, iteracoes)
+
+
+def ler_segredos_lote(arquivo):
+    """
+    Lê linhas 'nome = segredo' de um arquivo (ou do stdin, se arquivo for '-').
+    Linhas vazias e comentários (#, ;) são ignorados.
+    """
+    entrada = sys.stdin if arquivo == '-' else open(arquivo, encoding='utf-8')
+    try:
+        segredos = []
+        for numero, linha in enumerate(entrada, start=1):
+            linha = linha.strip()
+            if not linha or linha.startswith(('#', ';')):
+                continue
+            if '=' not in linha:
+                raise ValueError(f"Linha {numero} inválida (esperado 'nome = segredo'): {linha}")
+            nome, segredo = linha.split('=', 1)
+            segredos.append((nome.strip(), segredo.strip()))
+        return segredos
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+
 
+def modo_lote(arquivo, salt_b64, iteracoes):
+    """Criptografa todos os segredos do lote com UMA derivação da chave."""
+    segredos = ler_segredos_lote(arquivo)
+    credenciais = Credenciais(CHAVE_MESTRA, salt_b64)
+
+    inicio = time.perf_counter()
+    linhas = [f"{nome} = {criptografar_senha(credenciais, segredo, iteracoes)}" for nome, segredo in segredos]
+    duracao = time.perf_counter() - inicio
+
+    print(f"salt = {salt_b64}")
+    for linha in linhas:
+        print(linha)
+    print(f"\n# {len(linhas)} segredos criptografados em {duracao:.2f}s ({iteracoes} iterações)", file=sys.stderr)
 
-def criptografar_senha(chave_fernet, senha):
-    """Pede uma senha e a criptografa."""
-    senha_plana = senha
-    f = Fernet(chave_fernet)
-    token = f.encrypt(senha_plana.encode())
-    return token.decode()
+
+def modo_benchmark(alvo_ms):
+    """Mede o custo do PBKDF2 nesta máquina e sugere o número de iterações."""
+    print("--- Benchmark da derivação de chave (PBKDF2-SHA256) ---")
+    medicoes = medir_kdf()
+    for iteracoes, ms in medicoes.items():
+        print(f"  {iteracoes:>8} iterações: {ms:8.1f} ms")
+    print(f"\nSugestão para ~{alvo_ms:.0f} ms por derivação: --iteracoes {sugerir_iteracoes(alvo_ms, medicoes)}")
 
 
 def main():
-    print("--- Gerador de Configuração Criptografada ---")
+    parser = argparse.ArgumentParser(description="Gerador de configuração criptografada.")
+    parser.add_argument('--lote', metavar='ARQUIVO',
+                        help="Criptografa vários segredos ('nome = segredo' por linha). Use '-' para ler do stdin.")
+    parser.add_argument('--salt', help="Reaproveita um salt existente (o do config.ini) em vez de gerar outro.")
+    parser.add_argument('--iteracoes', type=int, default=ITERACOES_PADRAO,
+                        help=f"Iterações do PBKDF2 (padrão: {ITERACOES_PADRAO}). Ficam gravadas junto de cada segredo.")
+    parser.add_argument('--benchmark-kdf', nargs='?', type=float, const=250.0, metavar='ALVO_MS',
+                        help="Mede o custo da derivação e sugere as iterações para o alvo (padrão: 250 ms).")
+    args = parser.parse_args()
+
+    if args.benchmark_kdf is not None:
+        modo_benchmark(args.benchmark_kdf)
+        return
 
     # 1. Gerar um Salt
     # O salt é usado para tornar a derivação da chave única.
     # Deve ser o MESMO para criptografar e descriptografar.
-    salt = os.urandom(16)
-    salt_b64 = base64.b64encode(salt).decode()
+    salt_b64 = args.salt or base64.b64encode(os.urandom(16)).decode()
+
+    if args.lote:
+        modo_lote(args.lote, salt_b64, args.iteracoes)
+        return
+
+    print("--- Gerador de Configuração Criptografada ---")
 
     print("\nPASSO 1: Copie este 'salt' para o seu config.ini [Credentials]")
     print("=" * 50)
     print(f"salt = {salt_b64}")
     print("=" * 50)
 
-    # 2. Derivar a chave Fernet
-    chave_fernet = derivar_chave(salt, CHAVE_MESTRA)
+    # 2. Derivar a chave Fernet (uma única vez para as duas senhas)
+    credenciais = Credenciais(CHAVE_MESTRA, salt_b64)
 
     # 3. Criptografar a senha do APP
     print("\nPASSO 2: Digite a senha da APLICAÇÃO")
-    senha_app_enc = criptografar_senha(chave_fernet, SENHA_APP)
+    senha_app_enc = criptografar_senha(credenciais, SENHA_APP, args.iteracoes)
     print("\nCopie a senha da APLICAÇÃO para o config.ini [Credentials]")
     print("=" * 50)
     print(f"senha_criptografada = {senha_app_enc}")
@@ -60,7 +107,7 @@ def main():
 
     # 4. Criptografar a senha do EMAIL
     print("\nPASSO 3: Digite a senha do EMAIL (rpa@seuemail.com)...")
-    senha_email_enc = criptografar_senha(chave_fernet, SENHA_EMAIL)
+    senha_email_enc = criptografar_senha(credenciais, SENHA_EMAIL, args.iteracoes)
     print("\nCopie a senha do EMAIL para o config.ini [Email]")
     print("=" * 50)
     print(f"email_senha_criptografada = {senha_email_enc}")
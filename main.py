@@ -1,28 +1,45 @@
-import os
 import time
+
+# Marca o início do processo para medir o custo das importações (fase 'inicializacao.importacoes')
+_INICIO_PROCESSO = time.perf_counter()
+
+import os
 import logging
 import glob
+import queue
+import itertools
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from utils import helpers as utils
+from utils.checkpoint import JournalCadastro, IndiceSincronizacao
+from utils.cache_planilha import CachePlanilhas
+from utils.localizadores import LocalizadorCampos
+from utils.recuperacao import RecuperadorFalhas, DisjuntorSite, CircuitoAberto
+from utils.preenchimento import preencher_e_enviar_rapido
+from utils import esperas
+from utils.download import ObservadorDownload
+from utils import sessao
+from utils import metricas
+from utils import lote
+from utils import logs
+from utils import saude
 
 # Importações do Selenium
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-
-# --- Configuração do Logging ---
-# Define o logging para arquivo e console
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("log_rpa_cadastro.log", mode='w', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+from selenium.common.exceptions import InvalidSessionIdException, SessionNotCreatedException
+
+# Importações tardias (só quando a etapa roda, para não atrasar a inicialização):
+# utils.credenciais (cryptography), utils.validacao (pandas) e utils.envio_http (requests).
+
+# --- Logging ---
+# Configurado em 'logs.configurar_logging()' no início de main()/executar_lote() (não na importação).
+# As mensagens por registro usam um logger próprio, com nível ajustável no [LOG].
+log_registro = logging.getLogger(logs.NOME_LOGGER_REGISTRO)
 
 # --- Constantes de XPaths ---
 # Centraliza todos os seletores da aplicação em um único local
@@ -48,19 +65,52 @@ XPATHS = {
     "botao_cadastrar_funcionario": "//button[contains(normalize-space(), 'Cadastrar Funcionário')]"
 }
 
+# --- Perfil "enxuto" do navegador (produção) ---
+# Padrões de URL bloqueados via CDP (Network.setBlockedURLs) quando o config.ini não define 'bloquear_urls'
+PADROES_BLOQUEADOS_PADRAO = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*", "*hotjar.com*",
+]
+
+# --- Constantes do Cadastro ---
+ID_IFRAME = "registerIframe"
+MAX_TENTATIVAS_CADASTRO = 3
+
+# Coluna da planilha que preenche cada campo do formulário
+COLUNAS_FORMULARIO = {
+    "campo_nome": "Nome",
+    "campo_sobrenome": "Sobrenome",
+    "campo_email": "Email",
+    "campo_cargo": "Cargo",
+    "campo_empresa": "Empresa",
+    "campo_endereco": "Endereço",
+    "campo_telefone": "Telefone",
+}
+
+# Subpasta (dentro da pasta de download) do cache de planilhas já lidas
+PASTA_CACHE_PLANILHAS = ".cache_planilhas"
+
 
 # --- Funções do WebDriver (Lógica de Automação) ---
 
-def setup_driver(diretorio_download):
-    """Configura e inicializa o WebDriver do Chrome."""
+def setup_driver(diretorio_download, chromedriver_path=None, perfil_chrome=None, perfil_enxuto=None):
+    """
+    Configura e inicializa o WebDriver do Chrome.
+
+    'chromedriver_path' fixa o binário (senão é resolvido uma vez e guardado em
+    cache) e 'perfil_chrome' usa um user-data-dir persistente, que mantém a
+    sessão logada entre execuções. 'perfil_enxuto' (lista de padrões de URL)
+    liga o modo de produção: headless, sem imagens e com recursos bloqueados.
+    """
     logging.info(f"Configurando WebDriver. Pasta de download: {diretorio_download}")
 
     # Garante que o diretório de download exista
     os.makedirs(diretorio_download, exist_ok=True)
 
     chrome_options = Options()
-    # Descomentar para rodar em background (produção)
-    # chrome_options.add_argument("--headless")
+    # Para rodar em background (produção), use 'perfil_enxuto = true' no config.ini
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
@@ -73,21 +123,107 @@ def setup_driver(diretorio_download):
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True
     }
+
+    if perfil_enxuto is not None:
+        # Produção: sem janela, sem imagens e sem serviços de fundo do Chrome
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-component-update")
+        chrome_options.add_argument("--disable-default-apps")
+        chrome_options.add_argument("--disable-sync")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--disable-features=Translate,OptimizationHints,MediaRouter")
+        prefs["profile.managed_default_content_settings.images"] = 2
+
     chrome_options.add_experimental_option("prefs", prefs)
 
-    # Instala ou atualiza o chromedriver automaticamente
-    servico = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=servico, options=chrome_options)
+    # Perfil persistente: só uma instância do Chrome pode usar cada user-data-dir
+    perfil_reservado = None
+    if perfil_chrome:
+        if sessao.reservar_perfil(perfil_chrome):
+            chrome_options.add_argument(f"--user-data-dir={os.path.abspath(perfil_chrome)}")
+            perfil_reservado = perfil_chrome
+        else:
+            logging.info("Perfil persistente já em uso por outra sessão. Usando perfil temporário.")
+
+    # Resolve o chromedriver (webdriver-manager só na primeira vez; depois, cache)
+    try:
+        servico = Service(sessao.resolver_chromedriver(chromedriver_path))
+        try:
+            driver = webdriver.Chrome(service=servico, options=chrome_options)
+        except SessionNotCreatedException as e:
+            if chromedriver_path:
+                raise  # Caminho fixo do config.ini: quem configurou é que precisa atualizar
+            # O Chrome se atualizou e o chromedriver em cache ficou para trás: resolve de novo (uma vez)
+            logging.warning(f"Chromedriver em cache incompatível com o Chrome ({e}). Resolvendo novamente...")
+            sessao.invalidar_chromedriver()
+            servico = Service(sessao.resolver_chromedriver())
+            driver = webdriver.Chrome(service=servico, options=chrome_options)
+    except Exception:
+        if perfil_reservado:
+            sessao.liberar_perfil(perfil_reservado)
+        raise
+
+    driver.perfil_reservado = perfil_reservado
+    # Abas abertas depois (modo abas) precisam receber o mesmo bloqueio
+    driver.urls_bloqueadas = perfil_enxuto or []
+
+    if perfil_enxuto is not None:
+        bloquear_recursos(driver, perfil_enxuto, diretorio_download)
+
     logging.info("WebDriver pronto.")
     return driver
 
 
-def esperar_elemento(driver, by, valor, timeout=10):
+def bloquear_recursos(driver, padroes_url, diretorio_download):
+    """
+    Usa o Chrome DevTools Protocol para bloquear as URLs que casam com 'padroes_url'
+    (vale para todas as navegações e refreshes desta aba) e garante que o modo
+    headless continue salvando downloads na pasta do robô.
+    """
+    try:
+        driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+            "behavior": "allow",
+            "downloadPath": os.path.abspath(diretorio_download)
+        })
+    except Exception as e:
+        logging.warning(f"Não foi possível configurar a pasta de downloads via CDP: {e}")
+    if padroes_url:
+        bloquear_urls_aba(driver, padroes_url)
+        logging.info(f"Perfil enxuto: {len(padroes_url)} padrões de URL bloqueados via CDP.")
+
+
+def bloquear_urls_aba(driver, padroes_url):
+    """
+    Network.setBlockedURLs na aba ATUAL: o comando CDP vale só para o alvo
+    (aba) em que é enviado, então cada aba nova precisa recebê-lo de novo.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(padroes_url)})
+    except Exception as e:
+        # O bloqueio é só otimização: sem ele o robô continua funcionando
+        logging.warning(f"Não foi possível configurar o bloqueio de recursos via CDP: {e}")
+
+
+def encerrar_driver(driver):
+    """Fecha o navegador e libera o perfil persistente (se havia um reservado)."""
+    try:
+        driver.quit()
+    finally:
+        perfil = getattr(driver, "perfil_reservado", None)
+        if perfil:
+            sessao.liberar_perfil(perfil)
+
+
+def esperar_elemento(driver, by, valor, timeout=None):
     """Função reusável para esperar por um elemento ficar clicável."""
+    timeout = esperas.CONFIG["timeout_padrao"] if timeout is None else timeout
     try:
-        wait = WebDriverWait(driver, timeout)
         # Espera o elemento ser clicável (mais robusto que apenas visível)
-        return wait.until(EC.element_to_be_clickable((by, valor)))
+        return esperas.esperar(driver, EC.element_to_be_clickable((by, valor)), "elemento", timeout=timeout)
     except Exception as e:
         logging.error(f"Elemento não encontrado ou não clicável: {by}={valor} (Timeout: {timeout}s)")
         raise
@@ -97,12 +233,20 @@ def login(driver, url, usuario, senha, xpaths):
     """Acessa a URL, preenche login e senha, e clica em Entrar."""
     # Esta função SÓ tenta logar. A lógica de retentativa fica fora.
     try:
-        logging.info(f"Acessando URL: {url}")
-        driver.get(url)
+        # A inicialização sobreposta já deixa a página de login carregada
+        if driver.current_url.rstrip('/') != url.rstrip('/'):
+            logging.info(f"Acessando URL: {url}")
+            driver.get(url)
 
         logging.info("Preenchendo credenciais...")
-        esperar_elemento(driver, By.XPATH, xpaths["campo_usuario"]).send_keys(usuario)
-        driver.find_element(By.XPATH, xpaths["campo_senha"]).send_keys(senha)
+        # Sem recarregar, a página pode vir de uma tentativa anterior com os campos
+        # preenchidos: limpa antes de digitar para não concatenar usuário/senha
+        campo_usuario = esperar_elemento(driver, By.XPATH, xpaths["campo_usuario"])
+        campo_usuario.clear()
+        campo_usuario.send_keys(usuario)
+        campo_senha = driver.find_element(By.XPATH, xpaths["campo_senha"])
+        campo_senha.clear()
+        campo_senha.send_keys(senha)
         driver.find_element(By.XPATH, xpaths["botao_entrar"]).click()
 
         # Espera o botão de download (confirmação de login)
@@ -115,16 +259,57 @@ def login(driver, url, usuario, senha, xpaths):
         raise
 
 
-def iniciar_e_logar(diretorio_rpa, url, usuario, senha, xpaths, max_tentativas=3):
+def sessao_ativa(driver, url, xpaths, arquivo_sessao=None, timeout=3):
+    """
+    Confere se o navegador já está logado (perfil persistente ou cookies salvos),
+    abrindo o dashboard e procurando o botão 'Baixar Planilha'.
+    """
+    estado = sessao.carregar_sessao(arquivo_sessao)
+    try:
+        if estado:
+            sessao.aplicar_cookies(driver, url, estado)
+            driver.get(estado.get("url_dashboard") or url)
+        else:
+            driver.get(url)
+        esperas.esperar(
+            driver,
+            EC.element_to_be_clickable((By.XPATH, xpaths["botao_baixar_planilha"])),
+            "sessao_reaproveitada",
+            timeout=timeout
+        )
+        return True
+    except Exception:
+        logging.info("Sessão anterior não está mais válida. Será feito login.")
+        return False
+
+
+def iniciar_e_logar(diretorio_rpa, url, usuario, senha, xpaths, max_tentativas=3,
+                    chromedriver_path=None, perfil_chrome=None, arquivo_sessao=None, perfil_enxuto=None,
+                    driver_inicial=None):
     """
     Orquestrador de login: abre, loga e, se falhar, fecha e tenta de novo.
+
+    Com 'perfil_chrome' e/ou 'arquivo_sessao', primeiro tenta reaproveitar a
+    sessão já autenticada; o login só é feito se o dashboard não abrir.
+    'driver_inicial' (navegador já aberto, ex.: na inicialização sobreposta)
+    é usado na primeira tentativa no lugar de abrir outro.
     """
     driver = None
     for tentativa in range(1, max_tentativas + 1):
         logging.info(f"--- Tentativa de Login [{tentativa}/{max_tentativas}] ---")
         try:
-            driver = setup_driver(diretorio_rpa)
+            if tentativa == 1 and driver_inicial is not None:
+                driver = driver_inicial
+            else:
+                driver = setup_driver(diretorio_rpa, chromedriver_path, perfil_chrome, perfil_enxuto)
+
+            if (perfil_chrome or arquivo_sessao) and sessao_ativa(driver, url, xpaths, arquivo_sessao):
+                logging.info("Sessão reaproveitada. Login dispensado.")
+                return driver
+
             login(driver, url, usuario, senha, xpaths)
+            if arquivo_sessao:
+                sessao.salvar_sessao(driver, arquivo_sessao)
             
             # Sucesso
             logging.info("Login realizado com sucesso.")
@@ -135,23 +320,35 @@ def iniciar_e_logar(diretorio_rpa, url, usuario, senha, xpaths, max_tentativas=3
             
             # Garante que o driver antigo seja fechado antes de tentar de novo
             if driver:
-                driver.quit()
+                encerrar_driver(driver)
                 logging.info("Navegador fechado para retentativa.")
             
             if tentativa == max_tentativas:
                 logging.error("Não foi possível fazer login após 3 tentativas.")
                 raise Exception("Falha fatal no login após 3 tentativas.")
-            
-            time.sleep(3) # Pausa antes de tentar de novo
     
     raise Exception("Loop de login concluído sem sucesso.")
 
 
-def baixar_planilha(driver, diretorio_download, xpath_botao_baixar):
+def baixar_planilha(driver, diretorio_download, xpath_botao_baixar, url_dashboard=None, download_direto=False):
     """
     Limpa a pasta, baixa a planilha e espera um novo arquivo .xlsx aparecer.
     Retorna o caminho completo do arquivo encontrado.
+    'url_dashboard' é recarregada entre as tentativas (padrão: a URL atual, logo após o login).
+    Com 'download_direto', tenta antes baixar pelo link com os cookies da sessão
+    (utils.download_direto); o clique no navegador fica como plano B.
     """
+    url_dashboard = url_dashboard or driver.current_url
+
+    if download_direto:
+        from utils import download_direto as direto
+        try:
+            with metricas.span("download.direto"):
+                return direto.baixar(driver, xpath_botao_baixar, diretorio_download, esperas.CONFIG["timeout_download"])
+        except Exception as e:
+            metricas.contar("download.fallback")
+            logging.warning(f"Download direto falhou ({e}). Baixando pelo navegador.")
+
     max_tentativas = 3
     for tentativa in range(1, max_tentativas + 1):
         try:
@@ -170,27 +367,16 @@ def baixar_planilha(driver, diretorio_download, xpath_botao_baixar):
                         os.remove(f)
                         logging.info(f"Arquivo antigo removido: {f}")
                     except OSError as e:
+                        # O observador ignora arquivos que já existiam, então não é fatal
                         logging.error(f"Não foi possível remover o arquivo antigo {f}: {e}")
-                        raise
 
-            # Clica para baixar
-            esperar_elemento(driver, By.XPATH, xpath_botao_baixar).click()
+            # Observa a pasta (inotify no Linux) desde ANTES do clique
+            with ObservadorDownload(diretorio_download) as observador:
+                # Clica para baixar
+                esperar_elemento(driver, By.XPATH, xpath_botao_baixar).click()
 
-            # Espera o arquivo aparecer no disco (estratégia dinâmica)
-            timeout_download = 30  # segundos
-            tempo_inicial = time.time()
-            caminho_planilha_encontrado = None
-
-            while not caminho_planilha_encontrado:
-                time.sleep(1) 
-
-                if time.time() - tempo_inicial > timeout_download:
-                    raise Exception(f"Timeout de {timeout_download}s esperando por um novo arquivo .xlsx.")
-
-                # Procura por QUALQUER arquivo .xlsx na pasta
-                arquivos_novos = glob.glob(padrao_busca)
-                if arquivos_novos:
-                    caminho_planilha_encontrado = arquivos_novos[0]
+                # Espera o .crdownload virar .xlsx, com tamanho estável e zip válido
+                caminho_planilha_encontrado = observador.esperar_planilha(esperas.CONFIG["timeout_download"])
 
             logging.info(f"Planilha baixada com sucesso: {caminho_planilha_encontrado}")
             return caminho_planilha_encontrado
@@ -200,26 +386,16 @@ def baixar_planilha(driver, diretorio_download, xpath_botao_baixar):
             if tentativa < max_tentativas:
                 logging.warning("Atualizando a página (via URL direta) e tentando novamente...")
                 # Usar driver.get() é mais estável que refresh()
-                driver.get("https://desafio-rpa-946177071851.us-central1.run.app/challenger/dashboard")
-                time.sleep(2)
+                driver.get(url_dashboard)
                 esperar_elemento(driver, By.XPATH, xpath_botao_baixar, timeout=15)
             else:
                 logging.error("Downloads falharam após todas as tentativas.")
                 raise Exception(f"Falha crítica no download após {max_tentativas} tentativas.")
 
 
-def cadastrar_funcionarios(driver, dados_planilha, xpaths):
-    """Itera sobre os dados da planilha e cadastra cada funcionário DENTRO de um iframe."""
-    sucessos = 0
-    falhas = 0
-    total = len(dados_planilha)
-    logging.info(f"Iniciando cadastro de {total} funcionários...")
-
-    ID_IFRAME = "registerIframe"
-    MAX_TENTATIVAS_CADASTRO = 3
-
+def abrir_tela_cadastro(driver, xpaths):
+    """Navega do dashboard para a tela de cadastro (uma vez por sessão)."""
     try:
-        # Navega para a tela de cadastro (só uma vez)
         esperar_elemento(driver, By.XPATH, xpaths["botao_ir_cadastro"]).click()
         logging.info("Página de cadastro carregada.")
 
@@ -227,81 +403,659 @@ def cadastrar_funcionarios(driver, dados_planilha, xpaths):
         logging.error(f"Não foi possível acessar a página de cadastro. Abortando. Erro: {e}")
         raise
 
+
+def valores_formulario(funcionario):
+    """Texto de cada campo do formulário (chaves do XPATHS) para uma linha da planilha."""
+    # (str() garante que valores None ou numéricos sejam enviados)
+    return {
+        campo: str(funcionario.get(coluna) or '')
+        for campo, coluna in COLUNAS_FORMULARIO.items()
+    }
+
+
+def enviar_formulario(driver, funcionario, xpaths, localizador, preenchimento_rapido=False, esperar_livre=False):
+    """
+    Entra no iframe, preenche o formulário com 'funcionario' e clica em
+    Cadastrar, SEM esperar a confirmação (ver 'condicao_confirmacao').
+    Com 'esperar_livre', antes de preencher espera o JS limpar o formulário
+    do envio anterior (quando a confirmação dele não foi esperada).
+    """
+    # 1. ENTRAR NO IFRAME
+    # (Precisamos entrar a CADA tentativa, pois o refresh nos tira dele)
+    log_registro.debug("Entrando no iframe '%s'...", ID_IFRAME)
+    with metricas.span("registro.iframe"):
+        esperas.esperar(driver, EC.frame_to_be_available_and_switch_to_it((By.ID, ID_IFRAME)), "iframe")
+
+    # 2. PREENCHER O FORMULÁRIO (DENTRO DO IFRAME)
+    with metricas.span("registro.preenchimento"):
+        # O primeiro campo clicável garante que o formulário carregou;
+        # então os ids dos campos são resolvidos (uma vez por carregamento).
+        campo_nome = esperas.esperar(
+            driver, localizador.clicavel("campo_nome"), "elemento",
+            mensagem="Campo nome do formulário não encontrado ou não clicável."
+        )
+        if not localizador.resolvido:
+            localizador.resolver(driver)
+        if esperar_livre:
+            with metricas.span("registro.formulario_livre"):
+                esperar_formulario_livre(driver, localizador)
+
+        valores = valores_formulario(funcionario)
+
+        # (no preenchimento rápido o envio acontece na mesma chamada)
+        enviado = preenchimento_rapido and preencher_e_enviar_rapido(
+            driver, localizador, valores, xpaths["botao_cadastrar_funcionario"]
+        )
+        if not enviado:
+            # Caminho tradicional: um send_keys por campo
+            campo_nome.send_keys(valores["campo_nome"])
+            for campo in ("campo_sobrenome", "campo_email", "campo_cargo",
+                          "campo_empresa", "campo_endereco", "campo_telefone"):
+                localizador.encontrar(driver, campo).send_keys(valores[campo])
+
+    if not enviado:
+        with metricas.span("registro.envio"):
+            driver.find_element(By.XPATH, xpaths["botao_cadastrar_funcionario"]).click()
+
+
+def esperar_formulario_livre(driver, localizador):
+    """Espera (já dentro do iframe) o JS limpar os campos, sinal de que o envio anterior terminou."""
+    esperas.esperar(
+        driver,
+        esperas.campos_limpos(*localizador.localizar("campo_nome")),
+        "formulario_livre",
+        timeout=esperas.CONFIG["timeout_confirmacao_cadastro"],
+        mensagem="O formulário não foi limpo após o envio anterior."
+    )
+
+
+def aguardar_ultimo_envio(driver, localizador):
+    """
+    Sem confirmação por registro, o último envio ainda pode estar a caminho:
+    espera ele terminar antes da conferência. Se não terminar, o registro
+    simplesmente não aparece como gravado e volta para a fila.
+    """
+    try:
+        esperas.esperar(driver, EC.frame_to_be_available_and_switch_to_it((By.ID, ID_IFRAME)), "iframe")
+        esperar_formulario_livre(driver, localizador)
+    except Exception as e:
+        log_registro.warning("Último envio não confirmado pelo formulário: %s", e)
+    finally:
+        driver.switch_to.default_content()
+
+
+def condicao_confirmacao(localizador):
+    """Cadastro confirmado pelo JS: campos limpos (ou toast de sucesso, se configurado)."""
+    confirmacao = esperas.campos_limpos(*localizador.localizar("campo_nome"))
+    if esperas.CONFIG["xpath_mensagem_sucesso"]:
+        confirmacao = esperas.qualquer_uma(
+            confirmacao,
+            esperas.elemento_visivel(By.XPATH, esperas.CONFIG["xpath_mensagem_sucesso"])
+        )
+    return confirmacao
+
+
+def cadastrar_registro(driver, i, funcionario, xpaths, localizador=None, preenchimento_rapido=False, recuperador=None,
+                       confirmar=True):
+    """
+    Cadastra UM funcionário dentro do iframe, com retentativas.
+    Retorna True se o cadastro deu certo e False caso contrário.
+
+    'localizador' (LocalizadorCampos) guarda os ids dos campos resolvidos no
+    carregamento do formulário; deve ser um por driver.
+    Com 'preenchimento_rapido', o formulário é preenchido e enviado num único
+    execute_script (com volta automática para o send_keys se falhar).
+    'recuperador' (RecuperadorFalhas) classifica cada falha e aplica a
+    recuperação mais barata; também deve ser um por driver.
+    Com 'confirmar=False' não espera a confirmação do envio (a conferência em
+    lote confere depois o que o servidor gravou): retorna True assim que clica,
+    e o próximo registro só é preenchido com o formulário limpo.
+    """
+    if localizador is None:
+        localizador = LocalizadorCampos(xpaths)
+    if recuperador is None:
+        recuperador = RecuperadorFalhas(xpaths, ID_IFRAME)
+
+    nome = funcionario.get('Nome')
+    sobrenome = funcionario.get('Sobrenome')
+    email = funcionario.get('Email')
+    cargo = funcionario.get('Cargo')
+
+    # Validação básica
+    if not all([nome, email, cargo]):
+        log_registro.warning("Registro %s pulado: Nome, Email ou Cargo estão faltando.", i)
+        return False
+
+    # --- Bloco de Retentativa por Funcionário ---
+    for tentativa in range(1, MAX_TENTATIVAS_CADASTRO + 1):
+        try:
+            log_registro.info("Tentativa de cadastro [%s/%s] para: %s %s", tentativa, MAX_TENTATIVAS_CADASTRO, nome, sobrenome)
+
+            enviar_formulario(driver, funcionario, xpaths, localizador, preenchimento_rapido, esperar_livre=not confirmar)
+
+            if not confirmar:
+                log_registro.info("ENVIADO: Funcionário %s (Email: %s), confirmação na conferência em lote.", i, email)
+                recuperador.registrar_sucesso()
+                driver.switch_to.default_content()
+                return True
+
+            # Espera o JS confirmar o cadastro
+            with metricas.span("registro.confirmacao"):
+                esperas.esperar(
+                    driver,
+                    condicao_confirmacao(localizador),
+                    "confirmacao_cadastro",
+                    timeout=esperas.CONFIG["timeout_confirmacao_cadastro"],
+                    mensagem="O formulário não foi limpo após o envio (cadastro não confirmado)."
+                )
+
+            log_registro.info("OK: Funcionário %s (Email: %s) cadastrado.", i, email)
+            recuperador.registrar_sucesso()
+            metricas.marco("primeiro_registro")
+
+            # 3. SAIR DO IFRAME (APÓS SUCESSO)
+            driver.switch_to.default_content()
+
+            # Se deu certo, encerra as retentativas
+            return True
+
+        except Exception as e:
+            log_registro.error("FALHA [Tentativa %s] ao cadastrar funcionário %s (Email: %s): %s", tentativa, i, email, e)
+            if saude.navegador_morto(e):
+                raise  # Sem navegador não há recuperação dentro do registro (quem chamou pode reciclá-lo)
+
+            # 4. CLASSIFICAR A FALHA (pode pausar ou abortar a execução pelo disjuntor)
+            tipo_falha = recuperador.registrar_falha(driver, e)
+
+            if tentativa < MAX_TENTATIVAS_CADASTRO:
+                metricas.contar("registro.retentativas")
+                with metricas.span("registro.recuperacao"):
+                    try:
+                        recuperador.recuperar(driver, tipo_falha, localizador)
+                    except (CircuitoAberto, InvalidSessionIdException):
+                        raise
+                    except Exception as erro_recuperacao:
+                        # A próxima tentativa vai falhar e ser classificada de novo
+                        logging.error("Recuperação '%s' falhou: %s", tipo_falha, erro_recuperacao)
+                log_registro.info("Próxima tentativa para o MESMO funcionário.")
+            else:
+                driver.switch_to.default_content()
+                log_registro.error("FALHA PERMANENTE: Funcionário %s (Email: %s) falhou após %s tentativas.", i, email, MAX_TENTATIVAS_CADASTRO)
+
+    # --- Fim do Bloco de Retentativa ---
+    return False
+
+
+def cadastrar_funcionarios(driver, dados_planilha, xpaths, journal=None, preenchimento_rapido=False,
+                           relogar=None, disjuntor=None, vigia=None, confirmar=True):
+    """
+    Itera sobre os dados da planilha e cadastra cada funcionário DENTRO de um iframe.
+    Se 'journal' for informado, cada sucesso é gravado nele (checkpoint).
+    'relogar(driver)' é usado quando a sessão expira; 'disjuntor' (DisjuntorSite)
+    interrompe a execução se o site ficar fora do ar.
+    'vigia' (VigiaNavegador) troca o navegador por um novo quando ele passa dos
+    limites de memória/latência ou morre; o cadastro segue da linha atual.
+    'confirmar=False': só envia (ver 'cadastrar_registro'); sucesso = enviado.
+    """
+    sucessos = 0
+    falhas = 0
+    # 'dados_planilha' pode ser uma lista ou um gerador (leitura em streaming)
+    total = len(dados_planilha) if hasattr(dados_planilha, '__len__') else '?'
+    logging.info(f"Iniciando cadastro de {total} funcionários...")
+
+    # Navega para a tela de cadastro (só uma vez)
+    abrir_tela_cadastro(driver, xpaths)
+    localizador = LocalizadorCampos(xpaths)
+    recuperador = RecuperadorFalhas(xpaths, ID_IFRAME, disjuntor, relogar)
+
     # Itera sobre cada linha (funcionário) lido da planilha
     for i, funcionario in enumerate(dados_planilha, start=1):
-        logging.info(f"--- Processando funcionário {i}/{total} ---")
-        
-        nome = funcionario.get('Nome')
-        sobrenome = funcionario.get('Sobrenome')
-        email = funcionario.get('Email')
-        cargo = funcionario.get('Cargo')
-        empresa = funcionario.get('Empresa')
-        endereco = funcionario.get('Endereço')
-        telefone = funcionario.get('Telefone')
-
-        # Validação básica
-        if not all([nome, email, cargo]):
-            logging.warning(f"Registro {i} pulado: Nome, Email ou Cargo estão faltando.")
-            falhas += 1
-            continue
+        log_registro.info("--- Processando funcionário %s/%s ---", i, total)
 
-        # --- Bloco de Retentativa por Funcionário ---
-        sucesso_neste_registro = False
-        for tentativa in range(1, MAX_TENTATIVAS_CADASTRO + 1):
+        inicio = time.perf_counter()
+        falhas_antes = recuperador.falhas
+        with metricas.span("registro.total"), logs.contexto_registro(i, funcionario.get('Email')):
             try:
-                logging.info(f"Tentativa de cadastro [{tentativa}/{MAX_TENTATIVAS_CADASTRO}] para: {nome} {sobrenome}")
-                
-                # 1. ENTRAR NO IFRAME
-                # (Precisamos entrar a CADA tentativa, pois o refresh nos tira dele)
-                logging.debug(f"Entrando no iframe '{ID_IFRAME}'...")
-                wait = WebDriverWait(driver, 10)
-                wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, ID_IFRAME)))
-
-                # 2. PREENCHER O FORMULÁRIO (DENTRO DO IFRAME)
-                # (str() garante que valores None ou numéricos sejam enviados)
-                esperar_elemento(driver, By.XPATH, xpaths["campo_nome"]).send_keys(str(nome or ''))
-                driver.find_element(By.XPATH, xpaths["campo_sobrenome"]).send_keys(str(sobrenome or ''))
-                driver.find_element(By.XPATH, xpaths["campo_email"]).send_keys(str(email or ''))
-                driver.find_element(By.XPATH, xpaths["campo_cargo"]).send_keys(str(cargo or ''))
-                driver.find_element(By.XPATH, xpaths["campo_empresa"]).send_keys(str(empresa or ''))
-                driver.find_element(By.XPATH, xpaths["campo_endereco"]).send_keys(str(endereco or ''))
-                driver.find_element(By.XPATH, xpaths["campo_telefone"]).send_keys(str(telefone or ''))
-
-                driver.find_element(By.XPATH, xpaths["botao_cadastrar_funcionario"]).click()
-
-                time.sleep(0.5)  # Pausa breve para o JS limpar os campos
-
-                logging.info(f"OK: Funcionário {i} (Email: {email}) cadastrado.")
-                sucessos += 1
-                sucesso_neste_registro = True
-
-                # 3. SAIR DO IFRAME (APÓS SUCESSO)
-                driver.switch_to.default_content()
-                
-                # Se deu certo, quebra o loop de retentativas
-                break 
-
+                sucesso = cadastrar_registro(
+                    driver, i, funcionario, xpaths, localizador, preenchimento_rapido, recuperador, confirmar
+                )
             except Exception as e:
-                logging.error(f"FALHA [Tentativa {tentativa}] ao cadastrar funcionário {i} (Email: {email}): {e}")
+                if not (vigia and saude.navegador_morto(e)):
+                    raise
+                # O navegador morreu: abre outro e refaz a MESMA linha
+                logging.error("Navegador parou de responder no registro %s: %s", i, e)
+                driver = vigia.reciclar(driver, "navegador não responde", recuperador.disjuntor)
+                falhas_antes = None
+                localizador = LocalizadorCampos(xpaths)
+                recuperador = RecuperadorFalhas(xpaths, ID_IFRAME, disjuntor, relogar)
+                sucesso = cadastrar_registro(
+                    driver, i, funcionario, xpaths, localizador, preenchimento_rapido, recuperador, confirmar
+                )
+        if sucesso:
+            sucessos += 1
+            if journal:
+                journal.registrar(funcionario)
+        else:
+            falhas += 1 # Contabiliza a falha (registro inválido ou tentativas esgotadas)
+
+        # Navegador pesado ou lento demais: troca por um novo antes da próxima linha.
+        # Só os registros feitos de primeira, com o site estável, entram na amostra de latência
+        # (backoffs e pausas do disjuntor não são lentidão do navegador)
+        limpo = sucesso and recuperador.falhas == falhas_antes and recuperador.disjuntor.estavel()
+        if vigia and vigia.registrar(driver, time.perf_counter() - inicio, amostrar_latencia=limpo):
+            driver = vigia.reciclar(driver, disjuntor=recuperador.disjuntor)
+            localizador = LocalizadorCampos(xpaths)
+            recuperador = RecuperadorFalhas(xpaths, ID_IFRAME, disjuntor, relogar)
+
+    if not confirmar:
+        aguardar_ultimo_envio(driver, localizador)
+    logging.info(f"Cadastro finalizado. Sucessos: {sucessos}, Falhas: {falhas}")
+    return sucessos, falhas
 
-                # 4. SAIR DO IFRAME (APÓS FALHA)
-                # Garantia de que o refresh() funcionará no contexto certo
-                driver.switch_to.default_content()
 
-                if tentativa < MAX_TENTATIVAS_CADASTRO:
-                    logging.warning("Recarregando a página de cadastro (Refresh) para tentar destravar...")
-                    driver.refresh()
-                    time.sleep(2) # Pausa para o refresh
-                    logging.info("Página recarregada. Próxima tentativa para o MESMO funcionário.")
+def cadastrar_funcionarios_paralelo(driver, dados_planilha, xpaths, workers, criar_sessao, journal=None,
+                                    preenchimento_rapido=False, fazer_logout=True, relogar=None, disjuntor=None,
+                                    confirmar=True):
+    """
+    Cadastra os funcionários usando N sessões do navegador em paralelo.
+
+    O 'driver' já logado é usado como primeiro worker; os demais (workers - 1)
+    são criados chamando 'criar_sessao()' (normalmente 'iniciar_e_logar').
+    Todos consomem a mesma fila de registros e as contagens de cada worker
+    são somadas no final. 'fazer_logout=False' mantém as sessões vivas (quando
+    elas compartilham cookies reaproveitados). O 'disjuntor' é compartilhado
+    entre os workers: o site fora do ar é um problema de todos.
+    """
+    disjuntor = disjuntor or DisjuntorSite()
+    total = len(dados_planilha) if hasattr(dados_planilha, '__len__') else '?'
+    logging.info(f"Iniciando cadastro PARALELO de {total} funcionários com {workers} workers...")
+
+    # Fila limitada: a leitura da planilha anda só um pouco à frente dos workers,
+    # mantendo a memória constante mesmo com a leitura em streaming.
+    fila = queue.Queue(maxsize=workers * 4)
+    FIM = None  # Sentinela: um por worker, indica que não há mais registros
+
+    resultados = {}  # {id_worker: (sucessos, falhas)}
+    erros_workers = {}
+
+    def executar_worker(id_worker, driver_worker):
+        sucessos, falhas = 0, 0
+        proprio = driver_worker is None  # Sessões criadas aqui são fechadas aqui
+        try:
+            if proprio:
+                driver_worker = criar_sessao()
+            abrir_tela_cadastro(driver_worker, xpaths)
+            localizador = LocalizadorCampos(xpaths)  # Cache de ids próprio de cada sessão
+            recuperador = RecuperadorFalhas(xpaths, ID_IFRAME, disjuntor, relogar)
+
+            while True:
+                item = fila.get()
+                if item is FIM:
+                    break
+                i, funcionario = item
+
+                log_registro.info("--- [Worker %s] Processando funcionário %s/%s ---", id_worker, i, total)
+                with metricas.span("registro.total"), logs.contexto_registro(i, funcionario.get('Email')):
+                    sucesso = cadastrar_registro(
+                        driver_worker, i, funcionario, xpaths, localizador, preenchimento_rapido, recuperador, confirmar
+                    )
+                if sucesso:
+                    sucessos += 1
+                    if journal:
+                        journal.registrar(funcionario)
                 else:
-                    logging.error(f"FALHA PERMANENTE: Funcionário {i} (Email: {email}) falhou após {MAX_TENTATIVAS_CADASTRO} tentativas.")
-        
-        # --- Fim do Bloco de Retentativa ---
-        
-        if not sucesso_neste_registro:
-            falhas += 1 # Contabiliza a falha se esgotou as tentativas
+                    falhas += 1
 
-    logging.info(f"Cadastro finalizado. Sucessos: {sucessos}, Falhas: {falhas}")
+            if not confirmar:
+                aguardar_ultimo_envio(driver_worker, localizador)
+            if proprio and fazer_logout:
+                logout(driver_worker, xpaths)
+
+        except Exception as e:
+            # Os registros que sobraram na fila ficam para os outros workers
+            logging.error(f"[Worker {id_worker}] Encerrado por erro: {e}")
+            erros_workers[id_worker] = e
+
+        finally:
+            resultados[id_worker] = (sucessos, falhas)
+            if proprio and driver_worker:
+                encerrar_driver(driver_worker)
+                logging.info(f"[Worker {id_worker}] WebDriver encerrado.")
+
+    threads = [
+        threading.Thread(
+            target=executar_worker,
+            args=(id_worker, driver if id_worker == 1 else None),
+            name=f"worker-{id_worker}"
+        )
+        for id_worker in range(1, workers + 1)
+    ]
+    for t in threads:
+        t.start()
+
+    # Alimenta a fila enquanto os workers cadastram (produtor)
+    def entregar(item):
+        """Coloca o item na fila; retorna False se nenhum worker está vivo para consumir."""
+        while any(t.is_alive() for t in threads):
+            try:
+                fila.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    nao_entregues = 0
+    for item in enumerate(dados_planilha, start=1):
+        if not entregar(item):
+            nao_entregues += 1
+    for _ in threads:
+        entregar(FIM)
+
+    for t in threads:
+        t.join()
+
+    sucessos = sum(s for s, _ in resultados.values())
+    falhas = sum(f for _, f in resultados.values())
+
+    # Se todos os workers morreram, os registros restantes não foram processados
+    restantes = nao_entregues + sum(1 for item in list(fila.queue) if item is not FIM)
+    if restantes:
+        falhas += restantes
+        logging.error(f"{restantes} registros não foram processados (todos os workers falharam).")
+        if len(erros_workers) == workers:
+            raise Exception(f"Todos os {workers} workers falharam. Último erro: {list(erros_workers.values())[-1]}")
+
+    logging.info(f"Cadastro paralelo finalizado. Sucessos: {sucessos}, Falhas: {falhas}")
+    return sucessos, falhas
+
+
+def cadastrar_funcionarios_abas(driver, dados_planilha, xpaths, abas, journal=None, preenchimento_rapido=False,
+                                relogar=None, disjuntor=None):
+    """
+    Cadastra os funcionários usando K abas do MESMO navegador (um único login).
+
+    Cada aba fica na tela de cadastro com o seu 'registerIframe'. Os registros
+    são intercalados entre as abas: preenche e envia numa aba e passa para a
+    próxima sem esperar; a confirmação de cada aba é conferida nas voltas
+    seguintes. Enquanto o servidor responde a um envio, o navegador já
+    preenche outro, sem o custo de memória de abrir mais navegadores.
+
+    Cada aba tem o seu registro em andamento, tentativa atual, localizador e
+    recuperador (as retentativas são por aba); o disjuntor é compartilhado.
+    """
+    disjuntor = disjuntor or DisjuntorSite()
+    total = len(dados_planilha) if hasattr(dados_planilha, '__len__') else '?'
+    logging.info(f"Iniciando cadastro de {total} funcionários em {abas} abas...")
+
+    # A primeira aba é a janela atual; as outras abrem no dashboard (mesmos cookies) e vão para o cadastro
+    url_dashboard = driver.current_url
+    janela_principal = driver.current_window_handle
+    abrir_tela_cadastro(driver, xpaths)
+    janelas = [janela_principal]
+    for _ in range(abas - 1):
+        driver.switch_to.new_window('tab')
+        if getattr(driver, "urls_bloqueadas", None):
+            bloquear_urls_aba(driver, driver.urls_bloqueadas)  # Antes do get: já vale no primeiro carregamento
+        driver.get(url_dashboard)
+        abrir_tela_cadastro(driver, xpaths)
+        janelas.append(driver.current_window_handle)
+
+    estados = [
+        {
+            "janela": janela,
+            "localizador": LocalizadorCampos(xpaths),
+            "recuperador": RecuperadorFalhas(xpaths, ID_IFRAME, disjuntor, relogar),
+            "item": None,         # (i, funcionario) em andamento nesta aba
+            "tentativa": 0,
+            "enviado_em": None,   # perf_counter do envio; None = falta (re)enviar
+            "inicio": 0.0,
+        }
+        for janela in janelas
+    ]
+    sucessos, falhas = 0, 0
+
+    def concluir(aba, sucesso):
+        nonlocal sucessos, falhas
+        _, funcionario = aba["item"]
+        metricas.registrar("registro.total", time.perf_counter() - aba["inicio"])
+        if sucesso:
+            sucessos += 1
+            if journal:
+                journal.registrar(funcionario)
+        else:
+            falhas += 1
+        aba["item"] = None
+
+    def tratar_falha(aba, erro):
+        i, funcionario = aba["item"]
+        email = funcionario.get('Email')
+        log_registro.error("FALHA [Tentativa %s] ao cadastrar funcionário %s (Email: %s): %s", aba["tentativa"], i, email, erro)
+
+        # Pode pausar ou abortar a execução pelo disjuntor
+        tipo_falha = aba["recuperador"].registrar_falha(driver, erro)
+
+        if aba["tentativa"] < MAX_TENTATIVAS_CADASTRO:
+            metricas.contar("registro.retentativas")
+            with metricas.span("registro.recuperacao"):
+                try:
+                    aba["recuperador"].recuperar(driver, tipo_falha, aba["localizador"])
+                except (CircuitoAberto, InvalidSessionIdException):
+                    raise
+                except Exception as erro_recuperacao:
+                    # A próxima tentativa vai falhar e ser classificada de novo
+                    logging.error("Recuperação '%s' falhou: %s", tipo_falha, erro_recuperacao)
+            aba["enviado_em"] = None
+        else:
+            driver.switch_to.default_content()
+            log_registro.error("FALHA PERMANENTE: Funcionário %s (Email: %s) falhou após %s tentativas.", i, email, MAX_TENTATIVAS_CADASTRO)
+            concluir(aba, False)
+
+    def enviar(aba):
+        i, funcionario = aba["item"]
+        aba["tentativa"] += 1
+        log_registro.info(
+            "Tentativa de cadastro [%s/%s] para: %s %s", aba["tentativa"], MAX_TENTATIVAS_CADASTRO,
+            funcionario.get('Nome'), funcionario.get('Sobrenome')
+        )
+        try:
+            enviar_formulario(driver, funcionario, xpaths, aba["localizador"], preenchimento_rapido)
+            aba["enviado_em"] = time.perf_counter()
+        except Exception as e:
+            tratar_falha(aba, e)
+
+    def conferir(aba):
+        """Confere (sem esperar) se o envio da aba foi confirmado. Retorna True se a aba andou."""
+        i, funcionario = aba["item"]
+        try:
+            driver.switch_to.frame(ID_IFRAME)
+            if condicao_confirmacao(aba["localizador"])(driver):
+                log_registro.info("OK: Funcionário %s (Email: %s) cadastrado.", i, funcionario.get('Email'))
+                aba["recuperador"].registrar_sucesso()
+                metricas.marco("primeiro_registro")
+                metricas.registrar("registro.confirmacao", time.perf_counter() - aba["enviado_em"])
+                driver.switch_to.default_content()
+                concluir(aba, True)
+                return True
+            if time.perf_counter() - aba["enviado_em"] < esperas.CONFIG["timeout_confirmacao_cadastro"]:
+                return False
+            raise Exception("O formulário não foi limpo após o envio (cadastro não confirmado).")
+        except Exception as e:
+            tratar_falha(aba, e)
+            return True
+
+    registros = enumerate(dados_planilha, start=1)
+    esgotados = False
+    try:
+        while True:
+            andou = False
+            for aba in estados:
+                if aba["item"] is None:
+                    if esgotados:
+                        continue
+                    proximo = next(registros, None)
+                    if proximo is None:
+                        esgotados = True
+                        continue
+                    i, funcionario = proximo
+                    log_registro.info("--- Processando funcionário %s/%s ---", i, total)
+                    if not all([funcionario.get('Nome'), funcionario.get('Email'), funcionario.get('Cargo')]):
+                        log_registro.warning("Registro %s pulado: Nome, Email ou Cargo estão faltando.", i)
+                        falhas += 1
+                        andou = True
+                        continue
+                    aba.update(item=proximo, tentativa=0, enviado_em=None, inicio=time.perf_counter())
+
+                # Trocar de aba tira o driver do iframe: cada passo entra de novo
+                driver.switch_to.window(aba["janela"])
+                i, funcionario = aba["item"]
+                with logs.contexto_registro(i, funcionario.get('Email')):
+                    if aba["enviado_em"] is None:
+                        enviar(aba)
+                        andou = True
+                    elif conferir(aba):
+                        andou = True
+
+            if esgotados and all(aba["item"] is None for aba in estados):
+                break
+            if not andou:
+                # Todas as abas esperando o servidor: mesmo intervalo de polling do motor de esperas
+                time.sleep(esperas.CONFIG["intervalo_polling"])
+    finally:
+        # Fecha as abas extras e devolve o driver na aba principal
+        try:
+            for janela in janelas[1:]:
+                driver.switch_to.window(janela)
+                driver.close()
+            driver.switch_to.window(janela_principal)
+            driver.switch_to.default_content()
+        except Exception as e:
+            logging.warning(f"Não foi possível fechar as abas extras: {e}")
+
+    logging.info(f"Cadastro em abas finalizado. Sucessos: {sucessos}, Falhas: {falhas}")
+    return sucessos, falhas
+
+
+def voltar_ao_dashboard(driver, ctx, url_dashboard):
+    """Volta ao dashboard com a sessão atual; refaz o login se ela expirou."""
+    driver.switch_to.default_content()
+    if not sessao_ativa(driver, url_dashboard, XPATHS):
+        login(driver, ctx["url_login"], ctx["usuario"], ctx["senha_app"], XPATHS)
+
+
+def cadastrar_funcionarios_http(driver, dados_planilha, xpaths, ctx, journal, cadastrar_no_navegador):
+    """
+    Cadastra pelo motor HTTP: descobre o contrato do formulário no navegador
+    logado e envia os registros direto para o servidor, com os cookies da sessão.
+
+    Se o contrato não puder ser descoberto, ou mudar no meio do caminho, os
+    registros restantes seguem por 'cadastrar_no_navegador(dados)' (o caminho
+    de sempre, com o Selenium).
+    """
+    from utils import envio_http
+
+    url_dashboard = driver.current_url
+    motor = None
+    try:
+        abrir_tela_cadastro(driver, xpaths)
+        contrato = envio_http.descobrir_contrato(driver, xpaths, ID_IFRAME)
+        motor = envio_http.MotorHttp(
+            contrato, driver, ctx["url_login"],
+            concorrencia=ctx["http_concorrencia"], timeout=ctx["http_timeout"], disjuntor=ctx["disjuntor"],
+            marcador_sucesso=ctx.get("http_marcador_sucesso"), destino_sucesso=ctx.get("http_destino_sucesso")
+        )
+        motor.verificar_contrato()
+    except envio_http.ContratoAlterado as e:
+        if motor:
+            motor.fechar()
+        metricas.contar("http.fallback")
+        logging.warning(f"Motor HTTP indisponível ({e}). Cadastrando pelo navegador.")
+        voltar_ao_dashboard(driver, ctx, url_dashboard)
+        return cadastrar_no_navegador(dados_planilha)
+
+    try:
+        sucessos, falhas, restantes = motor.cadastrar(dados_planilha, valores_formulario, journal)
+    finally:
+        motor.fechar()
+
+    if motor.incertos:
+        # Podem ter sido gravados: reenviar (por HTTP ou pelo navegador) arriscaria duplicar
+        falhas += len(motor.incertos)
+        logging.error(
+            f"{len(motor.incertos)} registros com resultado desconhecido no envio HTTP (não reenviados e fora "
+            f"do journal; confira no site): {', '.join(str(f.get('Email')) for f in motor.incertos[:20])}"
+        )
+
+    if restantes is not None:
+        metricas.contar("http.fallback")
+        logging.warning("Continuando os registros restantes pelo navegador...")
+        voltar_ao_dashboard(driver, ctx, url_dashboard)
+        sucessos_navegador, falhas_navegador = cadastrar_no_navegador(restantes)
+        sucessos += sucessos_navegador
+        falhas += falhas_navegador
+
+    return sucessos, falhas
+
+
+def cadastrar_com_conferencia(driver, dados_planilha, ctx, journal, cadastrar_no_navegador):
+    """
+    Cadastro com conferência em lote: os registros vão em lotes de
+    'verificacao_lote' (0 = um lote só), enviados pelo navegador SEM esperar a confirmação de
+    cada um. Ao fim de cada lote, a lista de cadastros do servidor é buscada
+    uma vez e comparada pelos emails (ver ConferenciaCadastros); os ausentes
+    são reenviados, até 'verificacao_reenvios' vezes.
+
+    Antes do primeiro envio, os cadastros que já existem no servidor são
+    fotografados: eles não contam como confirmação de um registro enviado.
+    Só os confirmados vão para o journal. Retorna (sucessos, falhas), com
+    sucessos = confirmados no servidor e falhas = ainda ausentes no fim.
+    """
+    from utils.conferencia import ConferenciaCadastros
+
+    conferencia = ConferenciaCadastros(
+        ctx["url_verificacao"], ctx["url_login"], ctx["verificacao_campo_email"], ctx["http_timeout"] * 4,
+        parametro_offset=ctx.get("verificacao_parametro_offset")
+    )
+    url_dashboard = driver.current_url
+    with metricas.span("verificacao"):
+        conferencia.fotografar(driver)
+    sucessos, falhas = 0, 0
+    registros = iter(dados_planilha)
+    numero_lote = 0
+
+    while True:
+        # (lote 0 = a planilha inteira, conferida uma única vez depois do loop)
+        pendentes = list(itertools.islice(registros, ctx["verificacao_lote"] or None))
+        if not pendentes:
+            break
+        numero_lote += 1
+
+        for rodada in range(ctx["verificacao_reenvios"] + 1):
+            if numero_lote > 1 or rodada:
+                # Cada envio começa do dashboard, como o primeiro (abrir_tela_cadastro)
+                voltar_ao_dashboard(ctx["vigia"].atual(driver), ctx, url_dashboard)
+            if rodada:
+                metricas.contar("verificacao.reenfileirados", len(pendentes))
+                logging.warning(f"Lote {numero_lote}: reenviando {len(pendentes)} registros ausentes no servidor (rodada {rodada}).")
+
+            cadastrar_no_navegador(pendentes, journal_envio=None, confirmar=False)
+            with metricas.span("verificacao"):
+                confirmados, pendentes = conferencia.conferir(ctx["vigia"].atual(driver), pendentes)
+
+            for funcionario in confirmados:
+                journal.registrar(funcionario)
+            sucessos += len(confirmados)
+            logging.info(f"Lote {numero_lote}: {len(confirmados)} confirmados no servidor, {len(pendentes)} ausentes.")
+            if not pendentes:
+                break
+
+        if pendentes:
+            falhas += len(pendentes)
+            logging.error(
+                f"Lote {numero_lote}: {len(pendentes)} registros continuam ausentes após "
+                f"{ctx['verificacao_reenvios']} reenvios: {', '.join(str(f.get('Email')) for f in pendentes[:20])}"
+            )
+
+    logging.info(f"Cadastro com conferência finalizado. Sucessos: {sucessos}, Falhas: {falhas}")
     return sucessos, falhas
 
 
@@ -320,70 +1074,415 @@ def logout(driver, xpaths):
         logging.warning(f"Problema ao fazer logout (pode já ter deslogado): {e}")
 
 
-# --- Função Principal (Orquestrador) ---
+def ler_perfil_enxuto(cfg_geral):
+    """
+    Lê 'perfil_enxuto' e 'bloquear_urls' do [GERAL]. Retorna None (perfil
+    normal) ou a lista de padrões de URL a bloquear.
+    """
+    if not cfg_geral.getboolean('perfil_enxuto', False):
+        return None
+    padroes = cfg_geral.get('bloquear_urls')
+    if padroes is None:
+        return list(PADROES_BLOQUEADOS_PADRAO)
+    return [p.strip() for p in padroes.split(',') if p.strip()]
 
-def main():
-    """Função principal que orquestra a execução do RPA."""
-    logging.info("--- Iniciando execução do RPA de Cadastro ---")
-    driver = None
-    status_sucesso = False
-    erro_execucao = ""
-    sucessos, falhas = 0, 0
 
-    # Guarda a config de email para usar no 'finally'
-    cfg_email = None
-    senha_email = None
+# --- Configuração e etapas comuns (execução única e modo lote) ---
+
+def carregar_contexto(arquivo_config='config.ini', descriptografar=True):
+    """
+    Lê o config.ini e descriptografa os segredos. Retorna um dict com tudo o
+    que as etapas precisam; no modo lote ele é carregado uma única vez e vale
+    para todos os jobs. Com 'descriptografar=False' os segredos ficam para
+    'descriptografar_segredos' (a inicialização sobreposta faz isso em paralelo
+    com a abertura do navegador).
+    """
+    # --- 1. Ler Configurações ---
+    config = utils.ler_configuracao(arquivo_config)
+
+    cfg_geral = config['GERAL']
+    cfg_creds = config['CREDENCIAS_APP']
+    cfg_email = config['EMAIL']
+
+    esperas.configurar(config['ESPERAS'] if config.has_section('ESPERAS') else None)
 
+    # Inicialização rápida do navegador (todos opcionais)
+    opcoes_navegador = {
+        "chromedriver_path": cfg_geral.get('chromedriver_path') or None,
+        "perfil_chrome": cfg_geral.get('perfil_chrome') or None,
+        "arquivo_sessao": cfg_geral.get('arquivo_sessao') or None,
+        "perfil_enxuto": ler_perfil_enxuto(cfg_geral),
+    }
+
+    ctx = {
+        "cfg_email": cfg_email,
+        "url_login": cfg_geral['url_login'],
+        "usuario": cfg_creds['usuario'],
+        "diretorio_rpa": cfg_geral.get('diretorio_download', 'C:\\RPA'),
+        "workers": cfg_geral.getint('workers', 1),
+        "abas": cfg_geral.getint('abas', 1),
+        "download_direto": cfg_geral.getboolean('download_direto', True),
+        "url_verificacao": cfg_geral.get('url_verificacao', '').strip(),
+        "verificacao_campo_email": cfg_geral.get('verificacao_campo_email', 'email'),
+        "verificacao_lote": cfg_geral.getint('verificacao_lote', 5000),
+        "verificacao_reenvios": cfg_geral.getint('verificacao_reenvios', 2),
+        "verificacao_parametro_offset": cfg_geral.get('verificacao_parametro_offset', '').strip() or None,
+        "arquivo_journal": cfg_geral.get('arquivo_journal', 'journal_cadastro.txt'),
+        "preenchimento_rapido": cfg_geral.getboolean('preenchimento_rapido', False),
+        "motor_cadastro": cfg_geral.get('motor_cadastro', 'navegador').strip().lower(),
+        "http_concorrencia": cfg_geral.getint('http_concorrencia', 8),
+        "http_timeout": cfg_geral.getfloat('http_timeout', 15),
+        "http_marcador_sucesso": cfg_geral.get('http_marcador_sucesso', '').strip() or None,
+        "http_destino_sucesso": cfg_geral.get('http_destino_sucesso', '').strip() or None,
+        "arquivo_metricas": cfg_geral.get('arquivo_metricas', 'metricas_execucao'),
+        "validar_planilha": cfg_geral.getboolean('validar_planilha', True),
+        "arquivo_rejeitados": cfg_geral.get('arquivo_rejeitados', 'registros_rejeitados.csv'),
+        "arquivo_status_lote": cfg_geral.get('arquivo_status_lote', 'lote_status.jsonl'),
+        "sincronizacao_incremental": cfg_geral.getboolean('sincronizacao_incremental', False),
+        "arquivo_indice_sincronizacao": cfg_geral.get('arquivo_indice_sincronizacao', 'indice_sincronizacao.tsv'),
+        "cache_planilhas": cfg_geral.getboolean('cache_planilhas', True),
+        "cache_planilhas_mb": cfg_geral.getfloat('cache_planilhas_mb', 200),
+        "cache_planilhas_max": cfg_geral.getint('cache_planilhas_max', 20),
+        "opcoes_navegador": opcoes_navegador,
+        "reaproveitar_sessao": bool(opcoes_navegador["perfil_chrome"] or opcoes_navegador["arquivo_sessao"]),
+        # Disjuntor: pausa/aborta se o site cair, em vez de gastar as retentativas de todas as linhas
+        "disjuntor": DisjuntorSite(
+            limite_falhas=cfg_geral.getint('disjuntor_limite_falhas', 5),
+            pausa=cfg_geral.getfloat('disjuntor_pausa', 30),
+            max_pausas=cfg_geral.getint('disjuntor_max_pausas', 3)
+        ),
+    }
+
+    # Vigia do navegador: recicla a sessão em execuções longas (memória, latência ou a cada N registros)
+    ctx["vigia"] = saude.VigiaNavegador(
+        lambda driver_antigo: reabrir_sessao(ctx, driver_antigo),
+        reciclar_a_cada=cfg_geral.getint('vigia_reciclar_a_cada', 0),
+        limite_rss_mb=cfg_geral.getfloat('vigia_rss_mb', 2048),
+        fator_latencia=cfg_geral.getfloat('vigia_fator_latencia', 3.0),
+    )
+
+    ctx["config"] = config
+    if descriptografar:
+        descriptografar_segredos(ctx)
+    return ctx
+
+
+def descriptografar_segredos(ctx):
+    """Descriptografa os segredos do config.ini e guarda 'senha_app'/'senha_email' no contexto."""
+    from utils.credenciais import Credenciais
+
+    # --- 2. Descriptografar Senhas ---
+    # Uma única derivação da chave (PBKDF2) para todos os segredos do config.ini
+    logging.info("Lendo credenciais criptografadas...")
+    cfg_creds = ctx["config"]['CREDENCIAS_APP']
+    with metricas.span("descriptografar_credenciais"):
+        segredos = Credenciais(cfg_creds['chave_mestra'], cfg_creds['salt']).descriptografar_config(ctx["config"])
+    ctx["senha_app"] = segredos[('CREDENCIAS_APP', 'senha_criptografada')]
+    ctx["senha_email"] = segredos[('EMAIL', 'email_senha_criptografada')]
+    logging.info("Senhas carregadas na memória.")
+
+
+def abrir_sessao(ctx, driver_inicial=None):
+    """Abre o navegador e faz o login (com retentativas) usando o contexto carregado."""
+    return iniciar_e_logar(
+        ctx["diretorio_rpa"],
+        ctx["url_login"],
+        ctx["usuario"],
+        ctx["senha_app"],
+        XPATHS,
+        driver_inicial=driver_inicial,
+        **ctx["opcoes_navegador"]
+    )
+
+
+def reabrir_sessao(ctx, driver_antigo):
+    """Fecha o navegador (vivo ou morto), abre outro com login e volta para a tela de cadastro."""
     try:
-        # --- 1. Ler Configurações ---
-        config = utils.ler_configuracao('config.ini')
+        encerrar_driver(driver_antigo)
+    except Exception as e:
+        logging.warning(f"Não foi possível fechar o navegador antigo: {e}")
+    driver = abrir_sessao(ctx)
+    try:
+        abrir_tela_cadastro(driver, XPATHS)
+    except Exception:
+        encerrar_driver(driver)
+        raise
+    return driver
+
+
+def iniciar_sessao_sobreposta(ctx, preparar_segredos):
+    """
+    Inicialização sobreposta: abre o Chrome e carrega a página de login numa
+    thread enquanto 'preparar_segredos()' (a descriptografia, limitada pela
+    CPU do PBKDF2) roda na thread atual. Depois faz o login no navegador já
+    aberto. Cada fase vai para um span 'inicializacao.*'.
+    """
+    opcoes = ctx["opcoes_navegador"]
+
+    def abrir_navegador():
+        with metricas.span("inicializacao.navegador"):
+            driver = setup_driver(
+                ctx["diretorio_rpa"], opcoes["chromedriver_path"], opcoes["perfil_chrome"], opcoes["perfil_enxuto"]
+            )
+            try:
+                driver.get(ctx["url_login"])
+            except Exception:
+                encerrar_driver(driver)
+                raise
+            return driver
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="inicializacao") as executor:
+        futuro_navegador = executor.submit(abrir_navegador)
+        try:
+            with metricas.span("inicializacao.credenciais"):
+                preparar_segredos()
+        except Exception:
+            # Sem credenciais não há login: fecha o navegador que estava abrindo
+            try:
+                encerrar_driver(futuro_navegador.result())
+            except Exception:
+                pass
+            raise
 
-        cfg_geral = config['GERAL']
-        cfg_creds = config['CREDENCIAS_APP']
-        cfg_email = config['EMAIL']
+        try:
+            driver_inicial = futuro_navegador.result()
+        except Exception as e:
+            # O login com retentativas abre outro navegador
+            logging.warning(f"Abertura antecipada do navegador falhou: {e}")
+            driver_inicial = None
+
+    with metricas.span("inicializacao.login"):
+        return abrir_sessao(ctx, driver_inicial)
+
+
+def logar_inicializacao():
+    """Loga o tempo de cada fase da inicialização (as fases em paralelo se sobrepõem)."""
+    spans = metricas.resumo()["spans"]
+    fases = [
+        f"{fase.split('.', 1)[1]} {spans[fase]['total_s']:.2f}s"
+        for fase in ("inicializacao.importacoes", "inicializacao.config", "inicializacao.navegador",
+                     "inicializacao.credenciais", "inicializacao.login")
+        if fase in spans
+    ]
+    logging.info(f"Inicialização: {' | '.join(fases)} (navegador e credenciais em paralelo).")
 
-        diretorio_rpa = cfg_geral.get('diretorio_download', 'C:\\RPA')
 
-        # --- 2. Descriptografar Senhas ---
-        logging.info("Lendo credenciais criptografadas...")
-        senha_app = utils.descriptografar(
-            cfg_creds['senha_criptografada'],
-            cfg_creds['chave_mestra'],
-            cfg_creds['salt']
+def processar_planilha(driver, caminho_planilha, ctx, journal, arquivo_rejeitados=None):
+    """
+    Lê (em streaming), valida, filtra pelo journal e cadastra uma planilha.
+    Retorna (sucessos, falhas, pulados): os rejeitados na validação contam
+    como falha; 'pulados' soma as linhas inalteradas (sincronização
+    incremental) e as que já estavam no journal (--resume).
+    """
+    arquivo_rejeitados = arquivo_rejeitados or ctx["arquivo_rejeitados"]
+
+    # Cache pelo SHA-256 do arquivo: a mesma planilha (retentativa, --resume, rerun)
+    # não é lida nem validada de novo
+    cache, chave_cache, leitura_cache = None, None, None
+    if ctx["cache_planilhas"]:
+        cache = CachePlanilhas(
+            os.path.join(ctx["diretorio_rpa"], PASTA_CACHE_PLANILHAS),
+            limite_mb=ctx["cache_planilhas_mb"],
+            max_entradas=ctx["cache_planilhas_max"]
         )
-        senha_email = utils.descriptografar(
-            cfg_email['email_senha_criptografada'],
-            cfg_creds['chave_mestra'],
-            cfg_creds['salt']
+        chave_cache = cache.chave(caminho_planilha, "validada" if ctx["validar_planilha"] else "bruta")
+        leitura_cache = cache.abrir(chave_cache, arquivo_rejeitados)
+
+    validador = None
+    if leitura_cache:
+        metricas.contar("cache_planilha.acertos")
+        validador = leitura_cache  # Também informa os rejeitados (ao fim da leitura)
+        dados = metricas.medir_iteracao(leitura_cache, "ler_planilha")
+    else:
+        # Leitura da planilha (streaming: as linhas são lidas conforme o cadastro avança,
+        # então o span 'ler_planilha' soma só o tempo gasto lendo cada linha)
+        dados = metricas.medir_iteracao(utils.ler_planilha_stream(caminho_planilha), "ler_planilha")
+
+        # Validação vetorizada (em lotes): só registros limpos chegam ao navegador
+        if ctx["validar_planilha"]:
+            from utils.validacao import ValidadorPlanilha
+            validador = ValidadorPlanilha(arquivo_rejeitados)
+            # (o span 'validar_planilha' inclui a leitura das linhas que cada lote consome)
+            dados = metricas.medir_iteracao(validador.filtrar(dados), "validar_planilha")
+
+        if cache:
+            metricas.contar("cache_planilha.faltas")
+            dados = cache.gravar(chave_cache, dados, validador)
+
+    # Sessão expirada no meio do cadastro: refaz o login e volta para a tela de cadastro
+    def relogar(driver_sessao):
+        login(driver_sessao, ctx["url_login"], ctx["usuario"], ctx["senha_app"], XPATHS)
+        abrir_tela_cadastro(driver_sessao, XPATHS)
+
+    # Sincronização incremental: só linhas novas ou alteradas desde as execuções anteriores
+    indice = None
+    if ctx["sincronizacao_incremental"]:
+        indice = IndiceSincronizacao(ctx["arquivo_indice_sincronizacao"])
+        dados = indice.filtrar(dados)
+
+    # Checkpoint: grava cada sucesso e pula o que já foi feito
+    dados = journal.filtrar(dados)
+
+    # Cadastro pelo navegador (com retentativas por registro)
+    # ('journal_envio=None, confirmar=False' quando a conferência em lote confirma depois)
+    def cadastrar_no_navegador(dados_navegador, journal_envio=journal, confirmar=True):
+        driver_atual = ctx["vigia"].atual(driver)  # Reciclado num lote anterior?
+        if ctx["workers"] > 1:
+            # Cada worker extra abre e loga a sua própria sessão
+            return cadastrar_funcionarios_paralelo(
+                driver_atual,
+                dados_navegador,
+                XPATHS,
+                ctx["workers"],
+                lambda: abrir_sessao(ctx),
+                journal=journal_envio,
+                preenchimento_rapido=ctx["preenchimento_rapido"],
+                fazer_logout=not ctx["reaproveitar_sessao"],
+                relogar=relogar,
+                disjuntor=ctx["disjuntor"],
+                confirmar=confirmar
+            )
+        if ctx["abas"] > 1:
+            # Várias abas no mesmo navegador (um login só), com os registros intercalados
+            # (as abas já conferem cada envio sem bloquear, então confirmam sempre)
+            return cadastrar_funcionarios_abas(
+                driver_atual, dados_navegador, XPATHS, ctx["abas"], journal=journal_envio,
+                preenchimento_rapido=ctx["preenchimento_rapido"], relogar=relogar, disjuntor=ctx["disjuntor"]
+            )
+        return cadastrar_funcionarios(
+            driver_atual, dados_navegador, XPATHS, journal=journal_envio, preenchimento_rapido=ctx["preenchimento_rapido"],
+            relogar=relogar, disjuntor=ctx["disjuntor"], vigia=ctx["vigia"], confirmar=confirmar
         )
-        logging.info("Senhas carregadas na memória.")
 
-        # --- 3. Executar RPA ---
-        
-        # Login (com retentativas)
-        driver = iniciar_e_logar(
-            diretorio_rpa,
-            cfg_geral['url_login'],
-            cfg_creds['usuario'],
-            senha_app,
-            XPATHS
+    try:
+        with metricas.span("cadastrar_funcionarios"):
+            if ctx["motor_cadastro"] == "http":
+                # POST direto ao servidor; volta sozinho para o navegador se o formulário mudar
+                sucessos, falhas = cadastrar_funcionarios_http(
+                    driver, dados, XPATHS, ctx, journal, cadastrar_no_navegador
+                )
+            elif ctx["url_verificacao"]:
+                # Envia sem esperar cada confirmação e confere em lote o que o servidor gravou
+                sucessos, falhas = cadastrar_com_conferencia(driver, dados, ctx, journal, cadastrar_no_navegador)
+            else:
+                sucessos, falhas = cadastrar_no_navegador(dados)
+    finally:
+        # Mesmo numa execução interrompida, o que foi cadastrado (journal) entra no índice
+        if indice:
+            indice.incorporar(journal.concluidos)
+            indice.salvar()
+
+    # Registros rejeitados na validação também contam como falha no resumo
+    if validador and validador.rejeitados:
+        falhas += validador.rejeitados
+        metricas.contar("validacao.rejeitados", validador.rejeitados)
+
+    if journal.pulados:
+        logging.info(f"{journal.pulados} registros pulados (já cadastrados em execução anterior).")
+
+    pulados = journal.pulados
+    if indice:
+        pulados += indice.inalterados
+        metricas.contar("sincronizacao.inalterados", indice.inalterados)
+        logging.info(f"Sincronização incremental: {indice.inalterados} registros inalterados pulados.")
+
+    return sucessos, falhas, pulados
+
+
+def relatar_execucao(ctx, arquivo_metricas, status_sucesso, erro_execucao, sucessos, falhas, pulados=0, extras=None):
+    """Grava o relatório de métricas (JSON/CSV) e envia o email de status (mesmo se deu erro)."""
+    esperas.logar_resumo_esperas()
+
+    resumo_desempenho = metricas.texto_resumo(sucessos, falhas)
+    dados_extras = {
+        "status_sucesso": status_sucesso,
+        "sucessos": sucessos,
+        "falhas": falhas,
+        "pulados": pulados,
+        "esperas": esperas.resumo_esperas(),
+    }
+    dados_extras.update(extras or {})
+    try:
+        metricas.salvar(arquivo_metricas, extras=dados_extras)
+    except OSError as e:
+        logging.error(f"Não foi possível salvar o arquivo de métricas: {e}")
+
+    if ctx and ctx.get("senha_email"):
+        logging.info("Preparando email de status...")
+        utils.enviar_email_status(
+            ctx["cfg_email"],
+            ctx["senha_email"],
+            status_sucesso,
+            erro_execucao,
+            sucessos,
+            falhas,
+            resumo_desempenho,
+            registros_pulados=pulados
         )
+    else:
+        logging.error("Não foi possível enviar email. Configurações de email ou senha não foram carregadas.")
 
-        # Download (com retentativas)
-        caminho_planilha_real = baixar_planilha(driver, diretorio_rpa, XPATHS["botao_baixar_planilha"])
 
-        # Leitura da planilha
-        dados = utils.ler_planilha(caminho_planilha_real)
+# --- Função Principal (Orquestrador) ---
+
+def main(retomar=False):
+    """
+    Função principal que orquestra a execução do RPA.
+    Com 'retomar=True' (--resume), pula os registros que já constam no journal.
+    """
+    # Também quando main() é chamada por outro script (sem passar pelo __main__)
+    logs.configurar_logging('config.ini')
+    logging.info("--- Iniciando execução do RPA de Cadastro ---")
+    driver = None
+    journal = None
+    ctx = None
+    status_sucesso = False
+    erro_execucao = ""
+    sucessos, falhas, pulados = 0, 0, 0
+    arquivo_metricas = 'metricas_execucao'
+    metricas.reiniciar()
+    esperas.reiniciar()
+    metricas.registrar("inicializacao.importacoes", time.perf_counter() - _INICIO_PROCESSO)
+
+    try:
+        with metricas.span("inicializacao.config"):
+            ctx = carregar_contexto('config.ini', descriptografar=False)
+        arquivo_metricas = ctx["arquivo_metricas"]
+
+        # --- 3. Executar RPA ---
+
+        # Chrome + página de login em paralelo com a descriptografia; depois o login (com retentativas)
+        driver = iniciar_sessao_sobreposta(ctx, lambda: descriptografar_segredos(ctx))
+        ctx["vigia"].adotar(driver)
+        logar_inicializacao()
+
+        # Download (com retentativas)
+        with metricas.span("baixar_planilha"):
+            caminho_planilha_real = baixar_planilha(
+                driver, ctx["diretorio_rpa"], XPATHS["botao_baixar_planilha"], download_direto=ctx["download_direto"]
+            )
 
-        # Cadastro (com retentativas por registro)
-        sucessos, falhas = cadastrar_funcionarios(driver, dados, XPATHS)
+        # Checkpoint: com --resume, pula o que já foi feito
+        journal = JournalCadastro(ctx["arquivo_journal"], retomar=retomar)
+        sucessos, falhas, pulados = processar_planilha(driver, caminho_planilha_real, ctx, journal)
+        driver = ctx["vigia"].atual(driver)  # O vigia pode ter trocado o navegador no meio do cadastro
 
-        # Logout
-        logout(driver, XPATHS)
+        # Logout (com reaproveitamento de sessão, a sessão fica viva para a próxima execução)
+        if ctx["reaproveitar_sessao"]:
+            logging.info("Reaproveitamento de sessão ativo: logout não realizado.")
+        else:
+            with metricas.span("logout"):
+                logout(driver, XPATHS)
 
         logging.info("Processo concluído com sucesso.")
         status_sucesso = True
 
+        # Execução completa: o journal pode ser compactado (falhar aqui não desfaz o cadastro)
+        try:
+            journal.compactar()
+        except OSError as e:
+            logging.warning(f"Não foi possível compactar o journal (segue válido, só maior): {e}")
+
     except Exception as e:
         logging.error(f"ERRO FATAL. Processo interrompido: {e}", exc_info=True)
         erro_execucao = str(e)
@@ -391,26 +1490,203 @@ def main():
 
     finally:
         # --- 4. Encerrar Driver e Enviar Email ---
+        if journal:
+            journal.fechar()
+
+        if ctx and driver:
+            driver = ctx["vigia"].atual(driver)
         if driver:
-            driver.quit()
+            encerrar_driver(driver)
             logging.info("WebDriver encerrado.")
 
-        # Envia email de status (mesmo se der erro)
-        if cfg_email and senha_email:
-            logging.info("Preparando email de status...")
-            utils.enviar_email_status(
-                cfg_email,
-                senha_email,
-                status_sucesso,
-                erro_execucao,
-                sucessos,
-                falhas
-            )
-        elif cfg_email:
-            logging.error("Não foi possível enviar email. Configurações de email ou senha não foram carregadas.")
+        relatar_execucao(ctx, arquivo_metricas, status_sucesso, erro_execucao, sucessos, falhas, pulados)
 
         logging.info("--- Execução terminada ---")
 
 
+# --- Modo Lote (sessão aquecida para várias planilhas) ---
+
+def preparar_sessao(driver, ctx, url_dashboard):
+    """
+    Deixa o driver do modo lote pronto para o próximo job: volta ao dashboard
+    (uma navegação) e só refaz o login se a sessão expirou. Se o navegador
+    morreu, abre outro. Retorna (driver, url_dashboard).
+    """
+    if driver is not None:
+        try:
+            voltar_ao_dashboard(driver, ctx, url_dashboard)
+            return driver, driver.current_url
+        except Exception as e:
+            logging.warning(f"Sessão do modo lote inutilizável ({e}). Abrindo um novo navegador...")
+            try:
+                encerrar_driver(driver)
+            except Exception:
+                pass
+
+    driver = abrir_sessao(ctx)
+    return driver, driver.current_url
+
+
+def executar_job(driver, caminho_planilha, ctx, segundos_preparo=0.0):
+    """
+    Processa UMA planilha do modo lote no driver já logado. Cada job tem
+    journal, métricas, rejeitados e email próprios. O journal só existe
+    enquanto o job não termina: um job interrompido é retomado de onde parou,
+    e um concluído apaga o seu, então a próxima planilha com o mesmo nome é
+    cadastrada por inteiro (pular o que não mudou é papel da sincronização incremental).
+    Retorna o registro de status do job.
+    """
+    nome = lote.nome_job(caminho_planilha)
+    arquivo_metricas = lote.com_sufixo(ctx["arquivo_metricas"], nome)
+    status_sucesso, erro_execucao = False, ""
+    sucessos, falhas, pulados = 0, 0, 0
+    inicio = time.time()
+    logs.definir_contexto(job=nome)
+    logging.info(f"=== Job '{nome}': {caminho_planilha} ===")
+
+    # Retoma só o journal deixado por uma execução interrompida deste job
+    journal = JournalCadastro(lote.com_sufixo(ctx["arquivo_journal"], nome), retomar=True)
+    try:
+        sucessos, falhas, pulados = processar_planilha(
+            driver, caminho_planilha, ctx, journal,
+            arquivo_rejeitados=lote.com_sufixo(ctx["arquivo_rejeitados"], nome)
+        )
+        status_sucesso = True
+        journal.descartar()
+    except Exception as e:
+        logging.error(f"Job '{nome}' falhou: {e}", exc_info=True)
+        erro_execucao = str(e)
+    finally:
+        journal.fechar()
+
+    registro = {
+        "job": nome,
+        "planilha": os.path.abspath(caminho_planilha),
+        "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(inicio)),
+        "duracao_s": round(time.time() - inicio, 3),
+        "preparo_sessao_s": round(segundos_preparo, 3),
+        "status": "sucesso" if status_sucesso else "erro",
+        "sucessos": sucessos,
+        "falhas": falhas,
+        "pulados": pulados,
+        "registros_por_s": metricas.vazao(sucessos, falhas),
+        "erro": erro_execucao,
+        "metricas": f"{arquivo_metricas}.json",
+    }
+    relatar_execucao(ctx, arquivo_metricas, status_sucesso, erro_execucao, sucessos, falhas, pulados, extras={"job": nome})
+    return registro
+
+
+def executar_lote(planilhas=None, inbox=None):
+    """
+    Processa várias planilhas em sequência com UMA leitura do config, UMA
+    descriptografia e UM navegador logado. 'planilhas' é uma lista fixa de
+    jobs; 'inbox' é uma pasta observada indefinidamente (Ctrl+C encerra).
+    O status de cada job vai para 'arquivo_status_lote' (JSON Lines).
+    """
+    logs.configurar_logging('config.ini')  # Sem efeito se o __main__ já configurou
+    logging.info("--- Iniciando RPA de Cadastro em modo lote ---")
+    ctx = carregar_contexto('config.ini')
+    caixa = lote.CaixaEntrada(inbox) if inbox else None
+    driver, url_dashboard = None, None
+    jobs_processados = 0
+
+    try:
+        for caminho_planilha in (caixa.jobs() if caixa else planilhas):
+            metricas.reiniciar()
+            esperas.reiniciar()  # Cada job tem os seus tempos de espera
+            inicio_preparo = time.perf_counter()
+            try:
+                with metricas.span("preparar_sessao"):
+                    driver, url_dashboard = preparar_sessao(driver, ctx, url_dashboard)
+                ctx["vigia"].adotar(driver)
+                registro = executar_job(driver, caminho_planilha, ctx, time.perf_counter() - inicio_preparo)
+                driver = ctx["vigia"].atual(driver)  # Reciclado durante o job?
+            except Exception as e:
+                # Sem sessão não há como processar: o job falha e o próximo tenta abrir outra
+                logging.error(f"Não foi possível preparar a sessão para {caminho_planilha}: {e}")
+                driver = None
+                registro = {
+                    "job": lote.nome_job(caminho_planilha),
+                    "planilha": os.path.abspath(caminho_planilha),
+                    "status": "erro",
+                    "erro": str(e),
+                }
+
+            if caixa:
+                registro["planilha"] = os.path.abspath(caixa.concluir(caminho_planilha, registro["status"] == "sucesso"))
+            lote.registrar_status(ctx["arquivo_status_lote"], registro)
+            jobs_processados += 1
+
+    except KeyboardInterrupt:
+        logging.info("Modo lote interrompido pelo usuário.")
+
+    finally:
+        if driver:
+            driver = ctx["vigia"].atual(driver)
+            if not ctx["reaproveitar_sessao"]:
+                logout(driver, XPATHS)
+            encerrar_driver(driver)
+            logging.info("WebDriver encerrado.")
+        logging.info(f"--- Modo lote terminado: {jobs_processados} jobs. Status em {ctx['arquivo_status_lote']} ---")
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="RPA de Cadastro de Funcionários")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument(
+        "--resume",
+        action="store_true",
+        help="Retoma a execução anterior, pulando os registros que já constam no journal."
+    )
+    modo.add_argument(
+        "--jobs",
+        nargs="+",
+        metavar="PLANILHA",
+        help="Modo lote: cadastra as planilhas informadas, em sequência, na mesma sessão logada."
+    )
+    modo.add_argument(
+        "--inbox",
+        metavar="PASTA",
+        help="Modo lote contínuo: observa a pasta e cadastra cada planilha .xlsx que chegar."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Perfila a execução (cProfile, pilhas para flame graph e tracemalloc); resultados ao lado do log."
+    )
+    parser.add_argument(
+        "--profile-etapas",
+        metavar="ETAPA[,ETAPA]",
+        help="Com --profile, perfila só estas etapas (spans), ex.: ler_planilha,validar_planilha,cadastrar_funcionarios."
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=25,
+        metavar="N",
+        help="Com --profile, quantas linhas entram no relatório de alocações (padrão: 25)."
+    )
+    args = parser.parse_args()
+
+    logs.configurar_logging('config.ini')
+
+    # Sem --profile nada do perfilador é importado nem ligado
+    perfilador = None
+    if args.profile:
+        from utils.perfilador import Perfilador
+        perfilador = Perfilador(
+            os.path.dirname(logs.ler_config_log('config.ini')["arquivo"]),
+            etapas=[e.strip() for e in args.profile_etapas.split(",") if e.strip()] if args.profile_etapas else None,
+            top=args.profile_top
+        )
+        perfilador.iniciar()
+
+    try:
+        if args.jobs or args.inbox:
+            executar_lote(planilhas=args.jobs, inbox=args.inbox)
+        else:
+            main(retomar=args.resume)
+    finally:
+        if perfilador:
+            perfilador.finalizar()
@@ -0,0 +1,201 @@
+import os
+import json
+import base64
+import hashlib
+import logging
+import datetime
+
+# Mudar quando a leitura/validação (ou o formato do arquivo) mudar: entradas antigas deixam de ser encontradas
+VERSAO = 2
+
+EXTENSAO = ".lotes"
+TAMANHO_LOTE = 5000
+
+
+# Hashes já conhecidos (ex.: calculados durante o download), pela identidade do arquivo
+_hashes_conhecidos = {}
+
+
+def _identidade(caminho):
+    st = os.stat(caminho)
+    return (os.path.realpath(caminho), st.st_size, st.st_mtime_ns)
+
+
+def registrar_sha256(caminho, sha256):
+    """Informa o SHA-256 de um arquivo que acabou de ser gravado (evita lê-lo de novo)."""
+    _hashes_conhecidos[_identidade(caminho)] = sha256
+
+
+def _codificar_valor(valor):
+    """'default' do json.dumps: datas/horas viram {"$tipo": iso}; escalares numpy, o valor Python."""
+    for tipo in (datetime.datetime, datetime.date, datetime.time):
+        if isinstance(valor, tipo):
+            return {f"${tipo.__name__}": valor.isoformat()}
+    if hasattr(valor, "item"):
+        return valor.item()
+    return str(valor)
+
+
+def _decodificar_valor(objeto):
+    """'object_hook' do json.loads: o inverso de '_codificar_valor'."""
+    if len(objeto) == 1:
+        (chave, valor), = objeto.items()
+        for tipo in (datetime.datetime, datetime.date, datetime.time):
+            if chave == f"${tipo.__name__}":
+                return tipo.fromisoformat(valor)
+    return objeto
+
+
+def _linha_json(quadro):
+    return json.dumps(quadro, ensure_ascii=False, default=_codificar_valor) + "\n"
+
+
+def sha256_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """SHA-256 do conteúdo do arquivo (lido em blocos), ou o já registrado se o arquivo não mudou."""
+    conhecido = _hashes_conhecidos.get(_identidade(caminho))
+    if conhecido:
+        return conhecido
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class LeituraCache:
+    """
+    Registros de uma planilha já lida e validada, vindos do cache.
+
+    O arquivo é uma sequência de lotes colunares em JSON Lines (uma linha por
+    lote, com os nomes das colunas e uma lista de valores por coluna); JSON e
+    não pickle, porque a pasta de download pode ser compartilhada e ler o
+    cache não pode executar código. O último quadro
+    guarda quantos registros a validação rejeitou e o CSV dos rejeitados,
+    que é regravado para o relatório ficar igual ao da leitura original.
+    'rejeitados' só é conhecido depois que todos os registros foram lidos.
+    """
+
+    def __init__(self, caminho, arquivo_rejeitados=None):
+        self.caminho = caminho
+        self.arquivo_rejeitados = arquivo_rejeitados
+        self.rejeitados = 0
+
+    def __iter__(self):
+        logging.info(f"Lendo planilha do cache: {self.caminho}")
+        total = 0
+        with open(self.caminho, encoding="utf-8") as f:
+            for linha_arquivo in f:
+                quadro = json.loads(linha_arquivo, object_hook=_decodificar_valor)
+                if quadro["tipo"] == "fim":
+                    break
+                colunas = quadro["colunas"]
+                for linha in zip(*quadro["valores"]):
+                    total += 1
+                    yield dict(zip(colunas, linha))
+            else:
+                raise ValueError(f"Entrada de cache incompleta: {self.caminho}")
+
+        self.rejeitados = quadro["rejeitados"]
+        if self.arquivo_rejeitados and quadro["csv_rejeitados"] is not None:
+            with open(self.arquivo_rejeitados, "wb") as saida:
+                saida.write(base64.b64decode(quadro["csv_rejeitados"]))
+        logging.info(f"Planilha lida do cache. {total} registros ({self.rejeitados} rejeitados na validação).")
+
+
+class CachePlanilhas:
+    """
+    Cache das planilhas já lidas (e validadas), endereçado pelo SHA-256 do
+    arquivo baixado: uma nova execução com a MESMA planilha (retentativa,
+    --resume, rerun) pula o parse do XLSX.
+
+    Fica numa subpasta da pasta de download. Cada acerto atualiza o mtime da
+    entrada; ao gravar uma nova, as menos usadas recentemente são apagadas até
+    o total caber em 'limite_mb' e em 'max_entradas'.
+    """
+
+    def __init__(self, diretorio, limite_mb=200, max_entradas=20):
+        self.diretorio = diretorio
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        self.max_entradas = max_entradas
+        os.makedirs(diretorio, exist_ok=True)
+
+    def chave(self, caminho_planilha, variante):
+        """'variante' separa leituras diferentes do mesmo arquivo (ex.: validada ou bruta)."""
+        return f"{sha256_arquivo(caminho_planilha)}-{variante}-v{VERSAO}"
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + EXTENSAO)
+
+    def abrir(self, chave, arquivo_rejeitados=None):
+        """Retorna uma LeituraCache se a planilha já está no cache, senão None."""
+        caminho = self._caminho(chave)
+        if not os.path.exists(caminho):
+            return None
+        os.utime(caminho)  # LRU: marca como usada agora
+        return LeituraCache(caminho, arquivo_rejeitados)
+
+    def gravar(self, chave, dados_planilha, validador=None):
+        """
+        Repassa os registros de 'dados_planilha' e, ao mesmo tempo, grava-os
+        no cache em lotes (memória constante). A entrada só passa a valer se
+        TODOS os registros foram lidos; uma leitura interrompida é descartada.
+        """
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        colunas, lote = None, []
+        completo = False
+
+        with open(temporario, "w", encoding="utf-8") as f:
+            def gravar_lote():
+                valores = [list(coluna) for coluna in zip(*(tuple(r.values()) for r in lote))]
+                f.write(_linha_json({"tipo": "lote", "colunas": list(colunas), "valores": valores}))
+                lote.clear()
+
+            try:
+                for registro in dados_planilha:
+                    chaves = tuple(registro.keys())
+                    if lote and chaves != colunas:
+                        gravar_lote()
+                    colunas = chaves
+                    lote.append(registro)
+                    if len(lote) >= TAMANHO_LOTE:
+                        gravar_lote()
+                    yield registro
+                if lote:
+                    gravar_lote()
+
+                csv_rejeitados = None
+                if validador and validador.rejeitados and os.path.exists(validador.arquivo_rejeitados):
+                    with open(validador.arquivo_rejeitados, "rb") as rejeitados:
+                        csv_rejeitados = base64.b64encode(rejeitados.read()).decode("ascii")
+                f.write(_linha_json({
+                    "tipo": "fim",
+                    "rejeitados": validador.rejeitados if validador else 0,
+                    "csv_rejeitados": csv_rejeitados,
+                }))
+                completo = True
+            finally:
+                f.close()
+                if completo:
+                    os.replace(temporario, caminho)
+                    logging.info(f"Planilha guardada no cache: {caminho}")
+                    self.despejar()
+                else:
+                    os.remove(temporario)
+
+    def despejar(self):
+        """Apaga as entradas menos usadas recentemente até caber nos limites."""
+        entradas = []
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(EXTENSAO):
+                st = os.stat(os.path.join(self.diretorio, nome))
+                entradas.append((st.st_mtime, st.st_size, nome))
+        entradas.sort(reverse=True)  # Mais recentes primeiro
+
+        total = 0
+        for posicao, (_, tamanho, nome) in enumerate(entradas):
+            total += tamanho
+            # A entrada mais recente (a que acabou de ser gravada) sempre fica
+            if posicao and (total > self.limite_bytes or posicao >= self.max_entradas):
+                os.remove(os.path.join(self.diretorio, nome))
+                logging.info(f"Cache de planilhas: entrada antiga removida ({nome}).")
@@ -0,0 +1,170 @@
+import os
+import hashlib
+import logging
+import threading
+
+# Colunas da planilha que identificam o conteúdo de um registro
+CAMPOS_REGISTRO = ('Nome', 'Sobrenome', 'Email', 'Cargo', 'Empresa', 'Endereço', 'Telefone')
+
+
+def hash_registro(funcionario):
+    """Gera um hash SHA-256 (hex) do conteúdo de uma linha da planilha."""
+    valores = []
+    for campo in CAMPOS_REGISTRO:
+        valor = funcionario.get(campo)
+        # None e NaN (pandas) valem como "vazio", igual ao preenchimento do formulário
+        if valor is None or valor != valor:
+            valor = ''
+        valores.append(str(valor).strip())
+    return hashlib.sha256('\x1f'.join(valores).encode('utf-8')).hexdigest()
+
+
+def chave_registro(funcionario):
+    """Chave do journal: (email normalizado, hash do conteúdo da linha)."""
+    email = str(funcionario.get('Email') or '').strip().lower()
+    return email, hash_registro(funcionario)
+
+
+class JournalCadastro:
+    """
+    Journal append-only dos registros já cadastrados.
+
+    Cada cadastro bem-sucedido vira uma linha 'email<TAB>hash' gravada com
+    fsync, então um crash no meio da execução perde no máximo a linha em
+    andamento. Em modo 'retomar', as chaves do journal são carregadas num set
+    e os registros já feitos são pulados com custo O(1) por linha.
+    """
+
+    def __init__(self, caminho, retomar=False):
+        self.caminho = caminho
+        self.concluidos = set()
+        self.pulados = 0
+        self._lock = threading.Lock()  # Os workers paralelos gravam no mesmo arquivo
+
+        if retomar:
+            self._carregar()
+        elif os.path.exists(caminho):
+            logging.info(f"Nova execução (sem --resume): journal anterior descartado: {caminho}")
+
+        # 'a' quando retomando (mantém o histórico), 'w' quando é uma execução nova
+        self._arquivo = open(caminho, 'a' if retomar else 'w', encoding='utf-8')
+
+    def _carregar(self):
+        if not os.path.exists(self.caminho):
+            logging.info(f"Nenhum journal encontrado em {self.caminho}. Começando do zero.")
+            return
+
+        with open(self.caminho, encoding='utf-8') as f:
+            for linha in f:
+                # Linha sem '\n' = escrita interrompida pelo crash; é ignorada
+                if not linha.endswith('\n'):
+                    continue
+                partes = linha.rstrip('\n').split('\t')
+                if len(partes) == 2:
+                    self.concluidos.add((partes[0], partes[1]))
+
+        logging.info(f"Journal carregado: {len(self.concluidos)} registros já cadastrados serão pulados.")
+
+    def ja_cadastrado(self, funcionario):
+        return chave_registro(funcionario) in self.concluidos
+
+    def filtrar(self, dados_planilha):
+        """Gera apenas os registros que ainda não constam no journal."""
+        for funcionario in dados_planilha:
+            if self.ja_cadastrado(funcionario):
+                self.pulados += 1
+                continue
+            yield funcionario
+
+    def registrar(self, funcionario):
+        """Grava (com fsync) que o registro foi cadastrado com sucesso."""
+        chave = chave_registro(funcionario)
+        with self._lock:
+            self._arquivo.write(f"{chave[0]}\t{chave[1]}\n")
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self.concluidos.add(chave)
+
+    def compactar(self):
+        """
+        Reescreve o journal sem linhas duplicadas ou truncadas.
+        A troca é atômica (arquivo temporário + os.replace).
+        """
+        with self._lock:
+            self._arquivo.close()
+            temporario = self.caminho + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                for email, hash_linha in sorted(self.concluidos):
+                    f.write(f"{email}\t{hash_linha}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.caminho)
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        logging.info(f"Journal compactado: {len(self.concluidos)} registros em {self.caminho}")
+
+    def fechar(self):
+        with self._lock:
+            if not self._arquivo.closed:
+                self._arquivo.close()
+
+    def descartar(self):
+        """Fecha e apaga o journal (trabalho concluído: não há o que retomar)."""
+        self.fechar()
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+        logging.info(f"Journal descartado (job concluído): {self.caminho}")
+
+
+class IndiceSincronizacao:
+    """
+    Índice persistente 'email -> hash do conteúdo' dos registros já
+    cadastrados com sucesso em execuções ANTERIORES (sincronização incremental).
+
+    Com ele, só linhas novas (email desconhecido) ou alteradas (hash
+    diferente) seguem para o cadastro; as inalteradas são puladas. O hash é
+    guardado truncado ('tamanho_hash' caracteres hex) para o arquivo ficar
+    compacto: basta para detectar mudança na linha do mesmo email.
+    """
+
+    def __init__(self, caminho, tamanho_hash=16):
+        self.caminho = caminho
+        self.tamanho_hash = tamanho_hash
+        self.hashes = {}
+        self.inalterados = 0
+        self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.caminho):
+            logging.info(f"Índice de sincronização não encontrado em {self.caminho}. Todas as linhas serão cadastradas.")
+            return
+        with open(self.caminho, encoding='utf-8') as f:
+            for linha in f:
+                partes = linha.rstrip('\n').split('\t')
+                if len(partes) == 2:
+                    self.hashes[partes[0]] = partes[1]
+        logging.info(f"Índice de sincronização carregado: {len(self.hashes)} registros conhecidos.")
+
+    def filtrar(self, dados_planilha):
+        """Gera apenas os registros novos ou alterados desde a última sincronização."""
+        for funcionario in dados_planilha:
+            email, hash_linha = chave_registro(funcionario)
+            if self.hashes.get(email) == hash_linha[:self.tamanho_hash]:
+                self.inalterados += 1
+                continue
+            yield funcionario
+
+    def incorporar(self, chaves):
+        """Acrescenta/atualiza o índice com chaves (email, hash) cadastradas com sucesso."""
+        for email, hash_linha in chaves:
+            self.hashes[email] = hash_linha[:self.tamanho_hash]
+
+    def salvar(self):
+        """Grava o índice (troca atômica: arquivo temporário + os.replace)."""
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            for email, hash_linha in sorted(self.hashes.items()):
+                f.write(f"{email}\t{hash_linha}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+        logging.info(f"Índice de sincronização salvo: {len(self.hashes)} registros em {self.caminho}")
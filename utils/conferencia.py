@@ -0,0 +1,119 @@
+import io
+import csv
+import time
+import logging
+import urllib.parse
+from collections import Counter
+
+import requests
+
+from utils import metricas
+from utils.download_direto import sessao_do_navegador
+
+
+def normalizar_email(valor):
+    """Email como chave de comparação: sem espaços nas pontas e em minúsculas."""
+    return str(valor or '').strip().lower()
+
+
+def _registros_da_resposta(resposta):
+    """Lista de registros (dicts) de uma resposta JSON (lista, ou dict com uma lista dentro) ou CSV."""
+    tipo = resposta.headers.get("Content-Type", "").lower()
+    if "json" in tipo:
+        corpo = resposta.json()
+        if isinstance(corpo, dict):
+            # Ex.: {"dados": [...]} / {"items": [...], "total": N}
+            corpo = next((v for v in corpo.values() if isinstance(v, list)), [])
+        return [r for r in corpo if isinstance(r, dict)]
+    if "csv" in tipo or "text/plain" in tipo:
+        return list(csv.DictReader(io.StringIO(resposta.text)))
+    raise ValueError(f"formato não suportado para a conferência ({tipo or 'sem Content-Type'})")
+
+
+def _coluna_email(registro, campo):
+    """Nome da chave de email no registro do servidor (sem diferenciar maiúsculas)."""
+    campo = campo.lower()
+    return next((chave for chave in registro if str(chave).strip().lower() == campo), None)
+
+
+class ConferenciaCadastros:
+    """
+    Conferência em lote do que o servidor realmente gravou.
+
+    Em vez de esperar a confirmação de cada envio no formulário, o cadastro
+    envia um lote inteiro e depois busca UMA vez a lista de cadastros do site
+    ('url', uma página/exportação/API em JSON ou CSV, com a sessão do navegador).
+    Os emails gravados vão para um Counter e cada registro enviado é conferido
+    com um lookup O(1) (junção por hash): o que não está lá volta para a fila.
+
+    'fotografar' (antes do primeiro envio) reserva os cadastros que já existiam:
+    um registro só é confirmado quando o servidor tem MAIS ocorrências do email
+    do que as já reservadas (as de antes da execução e as já confirmadas).
+    Com 'parametro_offset' (ex.: 'offset'), cada busca pede só os cadastros a
+    partir do último já lido (a lista do servidor precisa ser só de inclusão,
+    em ordem de gravação); sem ele, a lista inteira é buscada a cada lote.
+    """
+
+    def __init__(self, url, url_base=None, campo_email="email", timeout=60, parametro_offset=None):
+        self.url = urllib.parse.urljoin(url_base, url) if url_base else url
+        self.campo_email = campo_email
+        self.timeout = timeout
+        self.parametro_offset = parametro_offset
+        self._gravados = Counter()    # Ocorrências de cada email no servidor
+        self._reservados = Counter()  # Ocorrências já atribuídas (pré-existentes + confirmadas)
+        self._lidos = 0               # Registros já lidos (com 'parametro_offset')
+
+    def _buscar(self, driver):
+        """Registros (dicts) devolvidos pelo servidor; com 'parametro_offset', só os ainda não lidos."""
+        parametros = {self.parametro_offset: self._lidos} if self.parametro_offset else None
+        with metricas.span("verificacao.busca"), sessao_do_navegador(driver) as sessao:
+            try:
+                resposta = sessao.get(self.url, params=parametros, timeout=self.timeout)
+            except requests.RequestException as e:
+                raise RuntimeError(f"Não foi possível buscar os cadastros em {self.url}: {e}") from e
+            if resposta.status_code != 200 or "text/html" in resposta.headers.get("Content-Type", "").lower():
+                # Redirect para o login, página de erro, etc.
+                raise RuntimeError(f"Resposta inesperada da conferência (HTTP {resposta.status_code}, {resposta.url})")
+            return _registros_da_resposta(resposta)
+
+    def atualizar(self, driver):
+        """Atualiza a contagem dos emails (normalizados) gravados no servidor."""
+        inicio = time.perf_counter()
+        registros = self._buscar(driver)
+
+        coluna = _coluna_email(registros[0], self.campo_email) if registros else None
+        if registros and coluna is None:
+            raise RuntimeError(f"Os cadastros devolvidos por {self.url} não têm o campo '{self.campo_email}'.")
+        emails = Counter(normalizar_email(r.get(coluna)) for r in registros)
+        del emails['']
+
+        if self.parametro_offset:
+            self._gravados.update(emails)
+            self._lidos += len(registros)
+        else:
+            self._gravados = emails
+        logging.info(
+            f"Conferência: {len(registros)} registros lidos do servidor "
+            f"({sum(self._gravados.values())} emails no total, {time.perf_counter() - inicio:.2f}s)."
+        )
+
+    def fotografar(self, driver):
+        """Reserva os cadastros que já existem no servidor (chamar antes do primeiro envio)."""
+        self.atualizar(driver)
+        self._reservados = Counter(self._gravados)
+        logging.info(f"Conferência: {sum(self._reservados.values())} cadastros já existiam antes do envio.")
+
+    def conferir(self, driver, enviados):
+        """Separa 'enviados' em (confirmados, ausentes) pelos emails gravados no servidor."""
+        self.atualizar(driver)
+        confirmados, ausentes = [], []
+        for funcionario in enviados:
+            email = normalizar_email(funcionario.get('Email'))
+            if self._gravados[email] > self._reservados[email]:
+                self._reservados[email] += 1
+                confirmados.append(funcionario)
+            else:
+                ausentes.append(funcionario)
+        metricas.contar("verificacao.confirmados", len(confirmados))
+        metricas.contar("verificacao.ausentes", len(ausentes))
+        return confirmados, ausentes
@@ -0,0 +1,117 @@
+import time
+import base64
+import logging
+import threading
+
+# Importações de Criptografia
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.backends import default_backend
+
+# Iterações usadas pelos segredos antigos (sem prefixo) e padrão para os novos
+ITERACOES_PADRAO = 100000
+
+# Segredos novos são gravados como 'pbkdf2_sha256$<iterações>$<token Fernet>',
+# para que o número de iterações possa mudar sem invalidar os segredos antigos.
+PREFIXO = "pbkdf2_sha256"
+
+# Chaves Fernet já derivadas nesta execução: {(chave_mestra, salt, iterações): chave}
+_chaves_derivadas = {}
+_lock = threading.Lock()
+
+
+def derivar_chave_fernet(salt, chave_mestra, iteracoes=ITERACOES_PADRAO):
+    """Deriva uma chave de criptografia segura a partir da chave mestra e do salt (PBKDF2-SHA256)."""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iteracoes,
+        backend=default_backend()
+    )
+    # Retorna a chave formatada para o Fernet
+    return base64.urlsafe_b64encode(kdf.derive(chave_mestra.encode()))
+
+
+def chave_fernet(salt, chave_mestra, iteracoes=ITERACOES_PADRAO):
+    """Como 'derivar_chave_fernet', mas deriva no máximo UMA vez por processo para cada combinação."""
+    chave_cache = (chave_mestra, salt, iteracoes)
+    with _lock:
+        if chave_cache not in _chaves_derivadas:
+            inicio = time.perf_counter()
+            _chaves_derivadas[chave_cache] = derivar_chave_fernet(salt, chave_mestra, iteracoes)
+            logging.info(f"Chave derivada ({iteracoes} iterações) em {(time.perf_counter() - inicio) * 1000:.0f} ms.")
+        return _chaves_derivadas[chave_cache]
+
+
+def decodificar_salt(salt_b64):
+    # Aceita tanto base64 padrão (gerar_senha.py) quanto urlsafe
+    return base64.urlsafe_b64decode(salt_b64)
+
+
+def separar_segredo(valor):
+    """Retorna (iterações, token) de um segredo armazenado (com ou sem prefixo)."""
+    partes = valor.strip().split("$")
+    if len(partes) == 3 and partes[0] == PREFIXO:
+        return int(partes[1]), partes[2]
+    return ITERACOES_PADRAO, valor.strip()
+
+
+class Credenciais:
+    """
+    Criptografa/descriptografa os segredos do config.ini com uma chave
+    derivada uma única vez por processo (por número de iterações).
+    """
+
+    def __init__(self, chave_mestra, salt_b64):
+        self.chave_mestra = chave_mestra
+        self.salt = decodificar_salt(salt_b64)
+
+    def _fernet(self, iteracoes):
+        return Fernet(chave_fernet(self.salt, self.chave_mestra, iteracoes))
+
+    def criptografar(self, texto, iteracoes=ITERACOES_PADRAO):
+        token = self._fernet(iteracoes).encrypt(texto.encode("utf-8")).decode()
+        return f"{PREFIXO}${iteracoes}${token}"
+
+    def descriptografar(self, valor):
+        try:
+            iteracoes, token = separar_segredo(valor)
+            return self._fernet(iteracoes).decrypt(token.encode("utf-8")).decode("utf-8")
+        except Exception as e:
+            logging.error(f"Falha na descriptografia. Verifique 'chave_mestra' e 'salt' no config.ini. Erro: {e}")
+            raise Exception("Falha na descriptografia. Verifique 'config.ini'.") from e
+
+    def descriptografar_config(self, config, sufixo="_criptografada"):
+        """
+        Descriptografa TODAS as opções do config terminadas em 'sufixo'.
+        Retorna {(seção, opção): valor}.
+        """
+        segredos = {}
+        for secao in config.sections():
+            for opcao, valor in config.items(secao):
+                if opcao.endswith(sufixo) and valor:
+                    segredos[(secao, opcao)] = self.descriptografar(valor)
+        logging.info(f"{len(segredos)} segredos descriptografados.")
+        return segredos
+
+
+def medir_kdf(iteracoes_lista=(50000, 100000, 200000, 400000, 600000), repeticoes=3):
+    """Benchmark do PBKDF2 nesta máquina: retorna {iterações: ms (melhor de 'repeticoes')}."""
+    salt = b"0" * 16
+    resultado = {}
+    for iteracoes in iteracoes_lista:
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            derivar_chave_fernet(salt, "benchmark", iteracoes)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        resultado[iteracoes] = min(tempos)
+    return resultado
+
+
+def sugerir_iteracoes(alvo_ms, medicoes):
+    """Número de iterações (múltiplo de 10.000) que custa ~'alvo_ms' nesta máquina."""
+    ms_por_iteracao = max(ms / it for it, ms in medicoes.items())
+    return max(10000, int(alvo_ms / ms_por_iteracao) // 10000 * 10000)
@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import select
+import struct
+import logging
+import zipfile
+import ctypes
+import ctypes.util
+
+from utils import esperas
+
+# --- inotify (Linux) via ctypes: sem dependência extra ---
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+_MASCARA = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_CABECALHO_EVENTO = struct.Struct('iIII')  # wd, mask, cookie, len
+
+EXTENSOES_TEMPORARIAS = ('.crdownload', '.tmp', '.part')
+
+
+def iniciar_inotify(diretorio):
+    """Retorna o fd do inotify observando 'diretorio', ou None se não for possível (ex.: Windows)."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(diretorio), _MASCARA) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError) as e:
+        logging.debug(f"inotify indisponível, usando polling: {e}")
+        return None
+
+
+def aguardar_evento(fd, segundos):
+    """Bloqueia até um evento do inotify em 'fd' ou até 'segundos'. Retorna True se houve evento."""
+    prontos, _, _ = select.select([fd], [], [], max(segundos, 0))
+    if not prontos:
+        return False
+    try:
+        # Os eventos só servem para acordar: o estado real é lido do disco
+        os.read(fd, 64 * _CABECALHO_EVENTO.size + 4096)
+    except BlockingIOError:
+        pass
+    return True
+
+
+def xlsx_valido(caminho):
+    """O arquivo abre como zip e tem a estrutura mínima de um XLSX."""
+    try:
+        with zipfile.ZipFile(caminho) as z:
+            return '[Content_Types].xml' in z.namelist()
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+class ObservadorDownload:
+    """
+    Observa a pasta de download e detecta quando uma NOVA planilha termina de baixar.
+
+    No Linux usa inotify (acorda a cada evento do sistema de arquivos); nos
+    outros sistemas cai para polling com o intervalo do motor de esperas.
+    Arquivos que já existiam antes do download são ignorados. Uma planilha só
+    é aceita depois que o '.crdownload' virou '.xlsx', o tamanho ficou estável
+    por 'janela_estabilidade' segundos e o arquivo abre como XLSX válido.
+
+    Uso:
+        with ObservadorDownload(pasta) as observador:
+            botao.click()
+            caminho = observador.esperar_planilha(timeout=30)
+    """
+
+    def __init__(self, diretorio, extensao='.xlsx', janela_estabilidade=0.2):
+        self.diretorio = diretorio
+        self.extensao = extensao
+        self.janela_estabilidade = janela_estabilidade
+        self._fd = None
+        self._existentes = {}
+        # Estatísticas do último download
+        self.segundos_espera = 0.0
+        self.tamanho_bytes = 0
+        self.bytes_por_segundo = 0.0
+
+    def __enter__(self):
+        # O watch é criado ANTES do clique, para não perder nenhum evento
+        self._fd = iniciar_inotify(self.diretorio)
+        self._existentes = {nome: self._assinatura(nome) for nome in os.listdir(self.diretorio)}
+        logging.info(f"Observando downloads em {self.diretorio} ({'inotify' if self._fd is not None else 'polling'}).")
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        return False
+
+    def _assinatura(self, nome):
+        try:
+            st = os.stat(os.path.join(self.diretorio, nome))
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def _aguardar(self, segundos):
+        """Bloqueia até um evento no diretório (inotify) ou até 'segundos' (polling)."""
+        segundos = max(segundos, 0)
+        if self._fd is None:
+            time.sleep(min(segundos, esperas.CONFIG["intervalo_polling"]))
+            return
+        aguardar_evento(self._fd, segundos)
+
+    def _novos(self):
+        """Arquivos criados ou alterados desde o início da observação."""
+        novos = {}
+        for nome in os.listdir(self.diretorio):
+            assinatura = self._assinatura(nome)
+            if assinatura and self._existentes.get(nome) != assinatura:
+                novos[nome] = assinatura
+        return novos
+
+    def esperar_planilha(self, timeout):
+        """Retorna o caminho da planilha baixada; levanta TimeoutError se não chegar a tempo."""
+        inicio = time.perf_counter()
+        primeiro_byte = None
+        candidato = None  # (nome, assinatura, instante em que ficou assim)
+
+        try:
+            while True:
+                agora = time.perf_counter()
+                restante = timeout - (agora - inicio)
+                if restante <= 0:
+                    raise TimeoutError(f"Timeout de {timeout}s esperando por um novo arquivo {self.extensao}.")
+
+                novos = self._novos()
+                if novos and primeiro_byte is None:
+                    primeiro_byte = agora
+
+                baixando = any(n.endswith(EXTENSOES_TEMPORARIAS) for n in novos)
+                finais = sorted(n for n in novos if n.lower().endswith(self.extensao))
+
+                if finais and not baixando:
+                    nome = finais[0]
+                    if candidato is None or candidato[:2] != (nome, novos[nome]):
+                        # Mudou de tamanho/mtime: recomeça a janela de estabilidade
+                        candidato = (nome, novos[nome], agora)
+                    elif agora - candidato[2] >= self.janela_estabilidade:
+                        caminho = os.path.join(self.diretorio, nome)
+                        if xlsx_valido(caminho):
+                            self._registrar(caminho, inicio, primeiro_byte)
+                            return caminho
+                        logging.debug(f"{nome} ainda não é um XLSX válido. Aguardando...")
+                        candidato = None
+                    self._aguardar(min(self.janela_estabilidade, restante))
+                else:
+                    candidato = None
+                    self._aguardar(restante)
+        finally:
+            esperas.registrar_duracao("download", time.perf_counter() - inicio)
+
+    def _registrar(self, caminho, inicio, primeiro_byte):
+        fim = time.perf_counter()
+        self.segundos_espera = fim - inicio
+        self.tamanho_bytes = os.path.getsize(caminho)
+        duracao_transferencia = fim - (primeiro_byte or inicio)
+        self.bytes_por_segundo = self.tamanho_bytes / duracao_transferencia if duracao_transferencia > 0 else 0.0
+        logging.info(
+            f"Download concluído em {self.segundos_espera:.2f}s: {self.tamanho_bytes} bytes "
+            f"({self.bytes_por_segundo / 1024:.1f} KiB/s)."
+        )
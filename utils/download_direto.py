@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.common.by import By
+
+from utils import cache_planilha
+from utils.download import xlsx_valido
+
+# Metadados do último download (URL, ETag, Last-Modified, arquivo e SHA-256), na pasta de download
+ARQUIVO_METADADOS = ".download_planilha.json"
+TAMANHO_BLOCO = 256 * 1024
+
+
+class DownloadIndisponivel(Exception):
+    """O download direto não é possível (link sem href, sessão recusada, resposta não é planilha)."""
+
+
+def sessao_do_navegador(driver):
+    """requests.Session com os cookies e o User-Agent do navegador logado, com pool keep-alive."""
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    sessao.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+    for cookie in driver.get_cookies():
+        sessao.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    return sessao
+
+
+def _ler_metadados(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_METADADOS), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_metadados(diretorio, metadados):
+    caminho = os.path.join(diretorio, ARQUIVO_METADADOS)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def _nome_arquivo(resposta, url):
+    """Nome do Content-Disposition (ou do fim da URL), sempre terminado em .xlsx."""
+    disposicao = resposta.headers.get("Content-Disposition", "")
+    encontrado = re.search(r"filename\*?=(?:UTF-8'')?\"?([^\";]+)\"?", disposicao, re.IGNORECASE)
+    nome = urllib.parse.unquote(encontrado.group(1)) if encontrado else os.path.basename(urllib.parse.urlsplit(url).path)
+    nome = os.path.basename(nome.strip()) or "planilha"
+    return nome if nome.lower().endswith(".xlsx") else f"{nome}.xlsx"
+
+
+def baixar(driver, xpath_botao_baixar, diretorio_download, timeout=30):
+    """
+    Baixa a planilha pelo link do botão "Baixar Planilha", sem o gerenciador
+    de downloads do Chrome: GET com os cookies da sessão do navegador, gravado
+    em streaming num arquivo temporário (com SHA-256 calculado durante a
+    gravação) e renomeado atomicamente para o nome final.
+
+    Com o ETag/Last-Modified do download anterior a requisição é condicional:
+    um 304 reaproveita o arquivo que já está na pasta.
+    Retorna o caminho da planilha; levanta DownloadIndisponivel se o caminho
+    direto não servir (o chamador usa o download pelo navegador).
+    """
+    href = driver.find_element(By.XPATH, xpath_botao_baixar).get_attribute("href")
+    if not href or not href.lower().startswith(("http://", "https://")):
+        raise DownloadIndisponivel(f"o botão não tem um link direto (href={href!r})")
+
+    os.makedirs(diretorio_download, exist_ok=True)
+    anterior = _ler_metadados(diretorio_download)
+    arquivo_anterior = anterior.get("arquivo")
+    cabecalhos = {}
+    if anterior.get("url") == href and arquivo_anterior and os.path.isfile(arquivo_anterior):
+        if os.path.getsize(arquivo_anterior) == anterior.get("tamanho"):
+            if anterior.get("etag"):
+                cabecalhos["If-None-Match"] = anterior["etag"]
+            if anterior.get("last_modified"):
+                cabecalhos["If-Modified-Since"] = anterior["last_modified"]
+
+    inicio = time.perf_counter()
+    with sessao_do_navegador(driver) as sessao:
+        try:
+            resposta = sessao.get(href, headers=cabecalhos, stream=True, timeout=timeout)
+        except requests.RequestException as e:
+            raise DownloadIndisponivel(f"erro de rede: {e}") from e
+
+        with resposta:
+            if resposta.status_code == 304:
+                logging.info(f"Planilha inalterada no servidor (304, ETag {anterior.get('etag')}): reaproveitando {arquivo_anterior}")
+                cache_planilha.registrar_sha256(arquivo_anterior, anterior["sha256"])
+                return arquivo_anterior
+
+            tipo = resposta.headers.get("Content-Type", "").lower()
+            if resposta.status_code != 200 or "text/html" in tipo:
+                # Redirect para o login, página de erro, etc.
+                raise DownloadIndisponivel(f"resposta inesperada (HTTP {resposta.status_code}, {tipo or 'sem tipo'}, {resposta.url})")
+
+            caminho = os.path.join(diretorio_download, _nome_arquivo(resposta, resposta.url))
+            temporario = os.path.join(diretorio_download, f".{os.path.basename(caminho)}.{os.getpid()}.part")
+            h = hashlib.sha256()
+            tamanho = 0
+            try:
+                with open(temporario, "wb") as f:
+                    for bloco in resposta.iter_content(TAMANHO_BLOCO):
+                        f.write(bloco)
+                        h.update(bloco)
+                        tamanho += len(bloco)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if not xlsx_valido(temporario):
+                    raise DownloadIndisponivel("o arquivo recebido não é um XLSX válido")
+                os.replace(temporario, caminho)
+            finally:
+                if os.path.exists(temporario):
+                    os.remove(temporario)
+
+    sha256 = h.hexdigest()
+    cache_planilha.registrar_sha256(caminho, sha256)
+    _gravar_metadados(diretorio_download, {
+        "url": href,
+        "etag": resposta.headers.get("ETag"),
+        "last_modified": resposta.headers.get("Last-Modified"),
+        "arquivo": caminho,
+        "tamanho": tamanho,
+        "sha256": sha256,
+    })
+
+    segundos = time.perf_counter() - inicio
+    logging.info(
+        f"Planilha baixada direto ({tamanho / 1024:.0f} KiB em {segundos:.2f}s, "
+        f"{tamanho / 1024 / 1024 / max(segundos, 1e-6):.1f} MB/s, SHA-256 {sha256[:12]}): {caminho}"
+    )
+    return caminho
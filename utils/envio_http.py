@@ -0,0 +1,382 @@
+import time
+import logging
+import itertools
+import threading
+import urllib.parse
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from utils import esperas
+from utils import logs
+from utils import metricas
+from utils.localizadores import eh_xpath_por_label
+
+log_registro = logging.getLogger(logs.NOME_LOGGER_REGISTRO)
+
+MAX_TENTATIVAS = 3
+
+# Respostas que indicam que o formulário (campos, rota, método) não é mais o mesmo
+STATUS_CONTRATO_ALTERADO = (400, 404, 405, 410, 415, 422)
+
+# Resultado de um envio que pode ter sido gravado (timeout de leitura, resposta
+# sem confirmação legível): o POST não é idempotente, então o registro NÃO é
+# reenviado nem devolvido ao navegador (ver MotorHttp.incertos)
+INCERTO = "incerto"
+
+# Descobre, DENTRO do iframe, o que o formulário envia: action, método, o 'name'
+# de cada campo (achado pelas mesmas XPaths do navegador), os campos ocultos
+# (CSRF) e uma assinatura dos campos para detectar mudanças de contrato.
+_JS_DESCOBRIR_FORMULARIO = """
+var campos = arguments[0], xpathBotao = arguments[1];
+function achar(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+var botao = achar(xpathBotao);
+var form = botao ? botao.form : null;
+if (!form) { return {erro: 'formulário do botão de cadastro não encontrado'}; }
+
+var nomes = {}, faltando = [];
+campos.forEach(function (c) {
+    var el = achar(c[1]);
+    if (el && el.name && el.form === form) { nomes[c[0]] = el.name; } else { faltando.push(c[0]); }
+});
+var ocultos = {}, itens = [];
+Array.prototype.forEach.call(form.elements, function (el) {
+    if (!el.name) { return; }
+    itens.push(el.name + ':' + el.type);
+    if (el.type === 'hidden') { ocultos[el.name] = el.value; }
+});
+return {
+    action: form.action, metodo: (form.getAttribute('method') || 'get').toLowerCase(),
+    nomes: nomes, ocultos: ocultos, faltando: faltando, itens: itens, url: location.href
+};
+"""
+
+
+def _falha_de_conexao(erro):
+    """True se a requisição nem chegou ao servidor (conexão recusada/timeout ao conectar): reenviar é seguro."""
+    if isinstance(erro, requests.ConnectTimeout):
+        return True
+    if isinstance(erro, requests.ConnectionError) and erro.args:
+        motivo = getattr(erro.args[0], "reason", erro.args[0])
+        return isinstance(motivo, (NewConnectionError, ConnectTimeoutError))
+    return False
+
+
+class ContratoAlterado(Exception):
+    """O formulário (ou a sessão) não é mais o que o motor HTTP conhece: os registros voltam para o navegador."""
+
+
+def assinatura_formulario(metodo, action, itens):
+    """Identifica o contrato do formulário: método, destino e os campos (name:type)."""
+    return f"{metodo.upper()} {action} | {','.join(sorted(itens))}"
+
+
+class ContratoFormulario:
+    """O que o formulário de cadastro envia, descoberto no navegador."""
+
+    def __init__(self, action, metodo, nomes, ocultos, url_formulario, assinatura):
+        self.action = action
+        self.metodo = metodo
+        self.nomes = nomes              # {campo do XPATHS: name do input}
+        self.ocultos = ocultos          # {name: valor} (ex.: csrf_token)
+        self.url_formulario = url_formulario
+        self.assinatura = assinatura
+
+
+def descobrir_contrato(driver, xpaths, id_iframe):
+    """
+    Entra no iframe e lê o contrato do formulário (um único execute_script).
+    Levanta ContratoAlterado se o formulário não puder ser enviado por HTTP.
+    """
+    campos = [[campo, xpath] for campo, xpath in xpaths.items() if eh_xpath_por_label(xpath)]
+    try:
+        esperas.esperar(driver, EC.frame_to_be_available_and_switch_to_it((By.ID, id_iframe)), "iframe")
+        info = driver.execute_script(_JS_DESCOBRIR_FORMULARIO, campos, xpaths["botao_cadastrar_funcionario"])
+    except Exception as e:
+        raise ContratoAlterado(f"não foi possível ler o formulário: {e}") from e
+    finally:
+        driver.switch_to.default_content()
+
+    if not info or info.get("erro"):
+        raise ContratoAlterado((info or {}).get("erro", "formulário não encontrado"))
+    if info["faltando"]:
+        raise ContratoAlterado(f"campos sem 'name' no formulário: {info['faltando']}")
+    if info["metodo"] != "post":
+        raise ContratoAlterado(f"método do formulário não suportado: {info['metodo']}")
+
+    contrato = ContratoFormulario(
+        info["action"], info["metodo"], info["nomes"], info["ocultos"], info["url"],
+        assinatura_formulario(info["metodo"], info["action"], info["itens"])
+    )
+    logging.info(f"Contrato do formulário descoberto: POST {contrato.action} ({len(contrato.nomes)} campos, "
+                 f"{len(contrato.ocultos)} ocultos).")
+    return contrato
+
+
+class _LeitorFormularios(HTMLParser):
+    """Extrai de um HTML os formulários: action, método, campos (name:type) e valores ocultos."""
+
+    def __init__(self, url_base):
+        super().__init__(convert_charrefs=True)
+        self.url_base = url_base
+        self.formularios = []
+        self._atual = None
+
+    def handle_starttag(self, tag, atributos):
+        atributos = dict(atributos)
+        if tag == "form":
+            self._atual = {
+                "action": urllib.parse.urljoin(self.url_base, atributos.get("action") or ""),
+                "metodo": (atributos.get("method") or "get").lower(),
+                "itens": [],
+                "ocultos": {},
+            }
+            self.formularios.append(self._atual)
+        elif self._atual is not None and tag in ("input", "select", "textarea", "button") and atributos.get("name"):
+            # Mesmos tipos que o 'el.type' do navegador
+            if tag == "input":
+                tipo = (atributos.get("type") or "text").lower()
+            elif tag == "select":
+                tipo = "select-multiple" if "multiple" in atributos else "select-one"
+            elif tag == "button":
+                tipo = (atributos.get("type") or "submit").lower()
+            else:
+                tipo = "textarea"
+            self._atual["itens"].append(f"{atributos['name']}:{tipo}")
+            if tipo == "hidden":
+                self._atual["ocultos"][atributos["name"]] = atributos.get("value") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._atual = None
+
+
+class MotorHttp:
+    """
+    Envia os cadastros direto para o 'action' do formulário, sem navegador.
+
+    Usa os cookies da sessão do Selenium (já logada) e o mesmo User-Agent,
+    com um pool de conexões keep-alive compartilhado por até 'concorrencia'
+    envios simultâneos. Cada resposta é conferida: JSON sem erro, 201/204,
+    redirect (Post/Redirect/Get) para a página esperada ('destino_sucesso';
+    sem ele, qualquer uma que não seja o login nem o próprio formulário) ou
+    uma página com o 'marcador_sucesso' é sucesso. Um 2xx em HTML sem o
+    marcador (ex.: formulário devolvido com erro de validação) é falha.
+    429/5xx/erro de conexão é retentado com backoff (e alimenta o disjuntor);
+    sessão perdida ou 4xx de contrato levantam ContratoAlterado. Um 403 (CSRF)
+    relê o formulário antes de desistir.
+
+    O POST não é idempotente: quando o servidor pode ter gravado o registro
+    (timeout de leitura, 2xx em HTML sem marcador configurado, redirect para
+    outra página que não 'destino_sucesso'), o resultado é INCERTO. Esses
+    registros não são reenviados e ficam em 'incertos' para quem chamou conferir.
+    """
+
+    def __init__(self, contrato, driver, url_login, concorrencia=8, timeout=15, disjuntor=None,
+                 marcador_sucesso=None, destino_sucesso=None):
+        self.contrato = contrato
+        self.url_login = urllib.parse.urlsplit(url_login).path
+        self.marcador_sucesso = marcador_sucesso
+        self.destino_sucesso = urllib.parse.urlsplit(destino_sucesso).path if destino_sucesso else None
+        self.concorrencia = concorrencia
+        self.timeout = timeout
+        self.disjuntor = disjuntor
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.incertos = []  # Registros com resultado desconhecido (não reenviados)
+
+        # Pool único (thread-safe) para todas as sessões das threads de envio
+        self._adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=concorrencia, max_retries=0)
+        self._cookies = requests.cookies.RequestsCookieJar()
+        for cookie in driver.get_cookies():
+            self._cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        self._cabecalhos = {
+            "User-Agent": driver.execute_script("return navigator.userAgent"),
+            "Referer": contrato.url_formulario,
+            "Origin": "{0.scheme}://{0.netloc}".format(urllib.parse.urlsplit(contrato.url_formulario)),
+        }
+
+    def _sessao(self):
+        """requests.Session por thread (Session não é thread-safe), todas no mesmo pool."""
+        sessao = getattr(self._local, "sessao", None)
+        if sessao is None:
+            sessao = requests.Session()
+            sessao.mount("http://", self._adaptador)
+            sessao.mount("https://", self._adaptador)
+            sessao.headers.update(self._cabecalhos)
+            sessao.cookies.update(self._cookies)
+            self._local.sessao = sessao
+        return sessao
+
+    def verificar_contrato(self):
+        """
+        Busca a página do formulário por HTTP e compara com o contrato
+        conhecido. Se só os valores ocultos mudaram (CSRF novo), atualiza-os;
+        se os campos/rota mudaram, levanta ContratoAlterado.
+        """
+        try:
+            resposta = self._sessao().get(self.contrato.url_formulario, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ContratoAlterado(f"não foi possível buscar o formulário: {e}") from e
+        if resposta.status_code != 200 or urllib.parse.urlsplit(resposta.url).path == self.url_login:
+            raise ContratoAlterado(f"página do formulário respondeu HTTP {resposta.status_code} ({resposta.url})")
+
+        leitor = _LeitorFormularios(resposta.url)
+        leitor.feed(resposta.text)
+        for formulario in leitor.formularios:
+            assinatura = assinatura_formulario(formulario["metodo"], formulario["action"], formulario["itens"])
+            if assinatura == self.contrato.assinatura:
+                with self._lock:
+                    self.contrato.ocultos = formulario["ocultos"]
+                return
+        raise ContratoAlterado("o formulário mudou (campos, método ou destino diferentes)")
+
+    def _enviar(self, dados):
+        """
+        Um POST. Retorna True (sucesso), False (não gravado: pode reenviar),
+        INCERTO (pode ter sido gravado: não reenviar) ou levanta ContratoAlterado.
+        """
+        with self._lock:
+            corpo = dict(self.contrato.ocultos)
+        corpo.update({self.contrato.nomes[campo]: valor for campo, valor in dados.items() if campo in self.contrato.nomes})
+
+        try:
+            with metricas.span("registro.http"):
+                resposta = self._sessao().post(self.contrato.action, data=corpo, timeout=self.timeout,
+                                               allow_redirects=False)
+        except requests.RequestException as e:
+            if _falha_de_conexao(e):
+                log_registro.warning("Erro de conexão no envio HTTP: %s", e)
+                return False
+            # O corpo pode ter chegado ao servidor (ex.: timeout esperando a resposta)
+            log_registro.warning("Envio HTTP sem resposta (resultado desconhecido): %s", e)
+            return INCERTO
+
+        status = resposta.status_code
+        if 300 <= status < 400:
+            destino = urllib.parse.urljoin(self.contrato.action, resposta.headers.get("Location", ""))
+            caminho = urllib.parse.urlsplit(destino).path
+            if caminho == self.url_login:
+                raise ContratoAlterado("sessão expirada (redirecionado para o login)")
+            if self.destino_sucesso and caminho != self.destino_sucesso:
+                log_registro.warning("Envio HTTP redirecionou para %s, que não é a página de sucesso.", destino)
+                return INCERTO
+            return True  # Post/Redirect/Get (em formulários de iframe, normalmente de volta ao próprio formulário)
+        if 200 <= status < 300:
+            if "json" in resposta.headers.get("Content-Type", ""):
+                try:
+                    corpo_resposta = resposta.json()
+                except ValueError:
+                    return False
+                if isinstance(corpo_resposta, dict) and (corpo_resposta.get("erro") or corpo_resposta.get("ok") is False):
+                    log_registro.warning("Servidor recusou o cadastro: %s", corpo_resposta)
+                    return False
+                return True
+            if status in (201, 204):
+                return True  # Created / No Content: o servidor afirma que aceitou
+            if not self.marcador_sucesso:
+                log_registro.warning("Resposta HTTP %s em HTML sem 'http_marcador_sucesso' configurado (resultado desconhecido).", status)
+                return INCERTO
+            if self.marcador_sucesso.lower() not in resposta.text.lower():
+                log_registro.warning("Resposta HTTP %s sem o marcador de sucesso (formulário devolvido com erro?).", status)
+                return False
+            return True
+        if status == 401:
+            raise ContratoAlterado("sessão expirada (HTTP 401)")
+        if status == 403:
+            # CSRF pode ter sido renovado: relê o formulário (levanta se o contrato mudou)
+            self.verificar_contrato()
+            return False
+        if status in STATUS_CONTRATO_ALTERADO:
+            raise ContratoAlterado(f"HTTP {status} ao enviar o formulário")
+
+        log_registro.warning("Envio HTTP respondeu %s.", status)
+        if self.disjuntor and (status == 429 or status >= 500):
+            self.disjuntor.registrar_falha()
+        return False
+
+    def _cadastrar_registro(self, i, funcionario, dados):
+        with metricas.span("registro.total"), logs.contexto_registro(i, funcionario.get('Email')):
+            for tentativa in range(1, MAX_TENTATIVAS + 1):
+                resultado = self._enviar(dados)
+                if resultado == INCERTO:
+                    metricas.contar("http.incertos")
+                    log_registro.error("INCERTO (HTTP): Funcionário %s (Email: %s) pode ter sido gravado; não será reenviado.",
+                                       i, funcionario.get('Email'))
+                    return INCERTO
+                if resultado:
+                    if self.disjuntor:
+                        self.disjuntor.registrar_sucesso()
+                    log_registro.info("OK (HTTP): Funcionário %s (Email: %s) cadastrado.", i, funcionario.get('Email'))
+                    metricas.marco("primeiro_registro")
+                    return True
+                if tentativa < MAX_TENTATIVAS:
+                    metricas.contar("registro.retentativas")
+                    time.sleep(0.5 * 2 ** (tentativa - 1))  # Backoff curto entre tentativas do mesmo registro
+            log_registro.error("FALHA PERMANENTE (HTTP): Funcionário %s (Email: %s) falhou após %s tentativas.",
+                               i, funcionario.get('Email'), MAX_TENTATIVAS)
+            return False
+
+    def cadastrar(self, dados_planilha, valores_formulario, journal=None):
+        """
+        Cadastra os registros com até 'concorrencia' envios em andamento.
+        'valores_formulario(funcionario)' devolve {campo do XPATHS: texto}.
+
+        Retorna (sucessos, falhas, restantes): 'restantes' é None se tudo foi
+        processado, ou um iterador com os registros ainda não cadastrados
+        quando o contrato mudou (para o navegador continuar). Os registros de
+        resultado INCERTO não entram em nenhuma das contagens: ficam em 'incertos'.
+        """
+        sucessos, falhas = 0, 0
+        devolvidos = []
+        alterado = None
+        iterador = iter(dados_planilha)
+        pendentes = {}
+
+        def colher(concluidos):
+            nonlocal sucessos, falhas, alterado
+            for futuro in concluidos:
+                funcionario = pendentes.pop(futuro)
+                try:
+                    sucesso = futuro.result()
+                except ContratoAlterado as e:
+                    alterado = alterado or e
+                    devolvidos.append(funcionario)
+                    continue
+                if sucesso == INCERTO:
+                    self.incertos.append(funcionario)
+                elif sucesso:
+                    sucessos += 1
+                    if journal:
+                        journal.registrar(funcionario)
+                else:
+                    falhas += 1
+
+        logging.info(f"Iniciando cadastro via HTTP ({self.concorrencia} envios simultâneos)...")
+        with ThreadPoolExecutor(max_workers=self.concorrencia, thread_name_prefix="http") as executor:
+            for i, funcionario in enumerate(iterador, start=1):
+                if alterado:
+                    devolvidos.append(funcionario)
+                    break
+                futuro = executor.submit(self._cadastrar_registro, i, funcionario, valores_formulario(funcionario))
+                pendentes[futuro] = funcionario
+                # Janela limitada: a leitura anda só um pouco à frente dos envios
+                if len(pendentes) >= self.concorrencia * 2:
+                    colher(wait(pendentes, return_when=FIRST_COMPLETED).done)
+            colher(wait(pendentes).done)
+
+        logging.info(f"Cadastro HTTP finalizado. Sucessos: {sucessos}, Falhas: {falhas}")
+        if alterado:
+            logging.warning(f"Contrato do formulário mudou durante o cadastro HTTP: {alterado}")
+            return sucessos, falhas, itertools.chain(devolvidos, iterador)
+        return sucessos, falhas, None
+
+    def fechar(self):
+        self._adaptador.close()
@@ -0,0 +1,161 @@
+import time
+import logging
+import threading
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import StaleElementReferenceException
+
+# --- Configuração do motor de esperas ---
+# Valores padrão; podem ser sobrescritos pela seção [ESPERAS] do config.ini
+CONFIG = {
+    "intervalo_polling": 0.1,           # segundos entre uma checagem e outra
+    "timeout_padrao": 10,               # esperas de elemento
+    "timeout_confirmacao_cadastro": 5,  # formulário limpo / mensagem de sucesso após o envio
+    "timeout_recarga": 15,              # refresh da página / iframe recarregado
+    "timeout_download": 30,             # arquivo aparecer na pasta de download
+    "xpath_mensagem_sucesso": "",       # opcional: toast de sucesso do cadastro
+}
+
+# Tempos realmente esperados, por tipo de espera: {nome: [quantidade, total_s, max_s]}
+# (agregados: memória constante mesmo no modo --inbox, que roda indefinidamente)
+_duracoes = {}
+_lock = threading.Lock()
+
+
+def configurar(cfg_esperas):
+    """Aplica os valores da seção [ESPERAS] (qualquer objeto com .get)."""
+    if not cfg_esperas:
+        return
+    for chave, padrao in CONFIG.items():
+        valor = cfg_esperas.get(chave)
+        if valor not in (None, ''):
+            CONFIG[chave] = valor if isinstance(padrao, str) else float(valor)
+    logging.info(f"Motor de esperas configurado: {CONFIG}")
+
+
+def reiniciar():
+    """Zera os tempos de espera (início de uma nova execução/job, junto com metricas.reiniciar)."""
+    with _lock:
+        _duracoes.clear()
+
+
+def registrar_duracao(nome, segundos):
+    with _lock:
+        agregado = _duracoes.setdefault(nome, [0, 0.0, 0.0])
+        agregado[0] += 1
+        agregado[1] += segundos
+        agregado[2] = max(agregado[2], segundos)
+
+
+def esperar(driver, condicao, nome, timeout=None, intervalo=None, mensagem=""):
+    """
+    Espera até 'condicao(driver)' retornar algo verdadeiro e devolve esse valor.
+
+    Todas as esperas do robô passam por aqui: o tempo gasto em cada uma fica
+    registrado sob 'nome' (mesmo quando dá timeout), para ver onde a execução
+    realmente fica parada.
+    """
+    timeout = CONFIG["timeout_padrao"] if timeout is None else timeout
+    intervalo = CONFIG["intervalo_polling"] if intervalo is None else intervalo
+
+    inicio = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=intervalo).until(condicao, mensagem)
+    finally:
+        registrar_duracao(nome, time.perf_counter() - inicio)
+
+
+def resumo_esperas():
+    """Retorna {nome: {"quantidade", "total_s", "media_ms", "max_ms"}} das esperas registradas."""
+    with _lock:
+        copia = {nome: tuple(agregado) for nome, agregado in _duracoes.items()}
+    return {
+        nome: {
+            "quantidade": quantidade,
+            "total_s": round(total, 3),
+            "media_ms": round(total / quantidade * 1000, 1),
+            "max_ms": round(maximo * 1000, 1),
+        }
+        for nome, (quantidade, total, maximo) in copia.items()
+    }
+
+
+def logar_resumo_esperas():
+    for nome, r in sorted(resumo_esperas().items()):
+        logging.info(
+            f"Espera '{nome}': {r['quantidade']}x | total {r['total_s']}s | "
+            f"média {r['media_ms']} ms | máx {r['max_ms']} ms"
+        )
+
+
+# --- Condições (mesmo formato dos expected_conditions do Selenium) ---
+
+def campos_limpos(by, valor):
+    """O campo indicado voltou a ficar vazio (o JS do formulário limpa tudo após o cadastro)."""
+    def _condicao(driver):
+        try:
+            return driver.find_element(by, valor).get_attribute("value") == ""
+        except StaleElementReferenceException:
+            return False
+    return _condicao
+
+
+def elemento_visivel(by, valor):
+    """Algum elemento do seletor está visível (ex.: mensagem/toast de sucesso)."""
+    def _condicao(driver):
+        try:
+            return any(el.is_displayed() for el in driver.find_elements(by, valor))
+        except StaleElementReferenceException:
+            return False
+    return _condicao
+
+
+def qualquer_uma(*condicoes):
+    """Verdadeira assim que QUALQUER das condições for verdadeira."""
+    def _condicao(driver):
+        for condicao in condicoes:
+            resultado = condicao(driver)
+            if resultado:
+                return resultado
+        return False
+    return _condicao
+
+
+def documento_pronto():
+    """document.readyState == 'complete'."""
+    def _condicao(driver):
+        return driver.execute_script("return document.readyState") == "complete"
+    return _condicao
+
+
+def elemento_obsoleto(elemento):
+    """O elemento saiu do DOM (a página/iframe foi realmente recarregada)."""
+    def _condicao(driver):
+        try:
+            elemento.is_enabled()
+            return False
+        except StaleElementReferenceException:
+            return True
+    return _condicao
+
+
+def recarregar_pagina(driver, by_iframe, valor_iframe):
+    """
+    driver.refresh() esperando pelo recarregamento real: o iframe antigo some
+    do DOM, o documento termina de carregar e o novo iframe aparece.
+    """
+    iframes = driver.find_elements(by_iframe, valor_iframe)
+    driver.refresh()
+
+    timeout = CONFIG["timeout_recarga"]
+    if iframes:
+        esperar(driver, elemento_obsoleto(iframes[0]), "refresh_iframe_antigo", timeout=timeout)
+    esperar(driver, documento_pronto(), "refresh_documento", timeout=timeout)
+    esperar(
+        driver,
+        lambda d: d.find_elements(by_iframe, valor_iframe),
+        "refresh_iframe_novo",
+        timeout=timeout,
+        mensagem=f"Iframe '{valor_iframe}' não reapareceu após o refresh."
+    )
+
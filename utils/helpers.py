@@ -1,17 +1,12 @@
 import os
-import base64
 import logging
 import configparser
 import smtplib
-import pandas as pd
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
-# Importações de Criptografia
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
+# pandas, openpyxl e cryptography são importados dentro das funções que os usam:
+# são os módulos mais pesados e não precisam atrasar a inicialização do robô.
 
 
 def ler_configuracao(arquivo_config='config.ini'):
@@ -32,34 +27,21 @@ def ler_configuracao(arquivo_config='config.ini'):
 
 def derivar_chave_fernet(salt, chave_mestra):
     """Deriva uma chave de criptografia segura a partir da chave mestra e do salt."""
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-        backend=default_backend()
-    )
-    # Retorna a chave formatada para o Fernet
-    return base64.urlsafe_b64encode(kdf.derive(chave_mestra.encode()))
+    # Derivação compartilhada (e memorizada por processo) em utils/credenciais.py
+    from utils import credenciais
+    return credenciais.chave_fernet(salt, chave_mestra)
 
 
 def descriptografar(senha_criptografada, chave_mestra, salt_b64):
     """Descriptografa uma string usando a chave mestra e o salt."""
-    try:
-        salt = base64.urlsafe_b64decode(salt_b64)
-        chave_fernet = derivar_chave_fernet(salt, chave_mestra)
-        f = Fernet(chave_fernet)
-
-        # Descriptografa e decodifica de bytes para string
-        senha_bytes = f.decrypt(senha_criptografada.encode('utf-8'))
-        return senha_bytes.decode('utf-8')
-    except Exception as e:
-        logging.error(f"Falha na descriptografia. Verifique 'chave_mestra' e 'salt' no config.ini. Erro: {e}")
-        raise Exception("Falha na descriptografia. Verifique 'config.ini'.") from e
+    from utils import credenciais
+    return credenciais.Credenciais(chave_mestra, salt_b64).descriptografar(senha_criptografada)
 
 
 def ler_planilha(caminho_arquivo):
     """Lê a planilha Excel/XLSX e retorna uma lista de dicionários (um por linha)."""
+    import pandas as pd
+
     try:
         logging.info(f"Lendo planilha: {caminho_arquivo}")
         # Converte a planilha para um DataFrame do Pandas
@@ -82,8 +64,65 @@ def ler_planilha(caminho_arquivo):
         raise
 
 
-def enviar_email_status(cfg_email, senha_email, sucesso=True, mensagem_erro="", registros_sucesso=0, registros_falha=0):
-    """Envia um email de status (sucesso ou falha) da execução do RPA."""
+def ler_planilha_stream(caminho_arquivo):
+    """
+    Lê a planilha XLSX em modo streaming (openpyxl read-only) e gera um
+    dicionário por linha, sob demanda.
+
+    Diferente de 'ler_planilha', nada é carregado inteiro na memória: a linha N
+    só é lida quando o consumidor pede por ela, então o cadastro da primeira
+    linha começa antes do restante da planilha ser processado.
+    """
+    from openpyxl import load_workbook
+
+    logging.info(f"Lendo planilha (streaming): {caminho_arquivo}")
+    try:
+        wb = load_workbook(caminho_arquivo, read_only=True, data_only=True)
+    except FileNotFoundError:
+        logging.error(f"Arquivo da planilha não encontrado em: {caminho_arquivo}")
+        raise
+    except Exception as e:
+        logging.error(f"Erro inesperado ao abrir o arquivo Excel: {e}")
+        raise
+
+    total = 0
+    try:
+        linhas = wb.active.iter_rows(values_only=True)
+
+        # A primeira linha é o cabeçalho (mesmo comportamento do pandas)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            logging.warning("Planilha lida, mas está vazia.")
+            return
+        cabecalho = tuple(str(c).strip() if c is not None else f"Unnamed: {n}" for n, c in enumerate(cabecalho))
+
+        for linha in linhas:
+            # Ignora linhas totalmente vazias (formatação residual do Excel)
+            if all(v is None for v in linha):
+                continue
+            total += 1
+            yield dict(zip(cabecalho, linha))
+
+        if not total:
+            logging.warning("Planilha lida, mas está vazia.")
+        logging.info(f"Planilha lida. {total} registros encontrados.")
+
+    except Exception as e:
+        logging.error(f"Erro inesperado ao ler o arquivo Excel (linha {total + 1}): {e}")
+        raise
+    finally:
+        # Em modo read-only o openpyxl mantém o arquivo aberto até o close()
+        wb.close()
+
+
+def enviar_email_status(cfg_email, senha_email, sucesso=True, mensagem_erro="", registros_sucesso=0, registros_falha=0,
+                        resumo_desempenho="", registros_pulados=0):
+    """
+    Envia um email de status (sucesso ou falha) da execução do RPA.
+    'resumo_desempenho' (texto com vazão/latência) é incluído quando informado.
+    'registros_pulados' são linhas que não precisaram ser cadastradas
+    (inalteradas desde a última sincronização ou já no journal).
+    """
 
     # Pega os dados do objeto de config
     remetente = cfg_email.get('email_remetente')
@@ -98,6 +137,12 @@ def enviar_email_status(cfg_email, senha_email, sucesso=True, mensagem_erro="",
 
     logging.info(f"Montando email de status para: {destinatario}")
 
+    bloco_desempenho = ""
+    if resumo_desempenho:
+        bloco_desempenho = "\n        Desempenho:\n" + "\n".join(
+            f"        {linha}" for linha in resumo_desempenho.splitlines()
+        ) + "\n"
+
     # --- Monta o Corpo do Email ---
     if sucesso:
         assunto = "Sucesso: RPA de Cadastro de Funcionários"
@@ -109,8 +154,9 @@ def enviar_email_status(cfg_email, senha_email, sucesso=True, mensagem_erro="",
         Resumo da Execução:
         - Registros cadastrados: {registros_sucesso}
         - Registros com falha: {registros_falha}
-        - Total processado: {registros_sucesso + registros_falha}
-
+        - Registros pulados (inalterados/já cadastrados): {registros_pulados}
+        - Total processado: {registros_sucesso + registros_falha + registros_pulados}
+{bloco_desempenho}
         Atenciosamente,
         RPA Bot
         """
@@ -124,7 +170,8 @@ def enviar_email_status(cfg_email, senha_email, sucesso=True, mensagem_erro="",
         Resumo da Execução:
         - Registros cadastrados antes da falha: {registros_sucesso}
         - Registros com falha: {registros_falha}
-
+        - Registros pulados (inalterados/já cadastrados): {registros_pulados}
+{bloco_desempenho}
         Erro principal:
         {mensagem_erro}
 
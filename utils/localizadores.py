@@ -0,0 +1,100 @@
+import logging
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+# Resolve várias XPaths numa única chamada ao navegador e devolve o 'id' de cada uma
+_JS_RESOLVER_IDS = """
+return arguments[0].map(function (xpath) {
+    var no = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return no && no.id ? no.id : null;
+});
+"""
+
+
+def eh_xpath_por_label(xpath):
+    """True para as XPaths do tipo //*[@id=//label[...]/@for] (campo achado pelo texto do label)."""
+    return '//label[' in xpath and '/@for' in xpath
+
+
+class LocalizadorCampos:
+    """
+    "Compila" as XPaths baseadas em label para seletores By.ID.
+
+    A XPath '//*[@id=//label[contains(...)]/@for]' faz uma varredura aninhada
+    no documento inteiro a cada busca. Aqui ela é avaliada UMA vez por
+    carregamento do formulário (todas as XPaths de uma vez, num único
+    execute_script) e o id resultante fica em cache. O cache só é invalidado
+    quando o DOM do formulário muda (refresh) ou quando um id em cache some.
+    """
+
+    def __init__(self, xpaths):
+        self.xpaths = xpaths
+        self.campos = [campo for campo, xpath in xpaths.items() if eh_xpath_por_label(xpath)]
+        self._ids = {}
+        # A resolução é tentada uma vez por carregamento, mesmo se não achar nenhum id
+        # (sem isso, uma página sem ids refaria a varredura a cada registro)
+        self._resolvido = False
+
+    @property
+    def resolvido(self):
+        return self._resolvido
+
+    def resolver(self, driver):
+        """Resolve os ids de todos os campos. Deve ser chamado já DENTRO do iframe."""
+        try:
+            ids = driver.execute_script(_JS_RESOLVER_IDS, [self.xpaths[c] for c in self.campos])
+        except Exception as e:
+            # Sem cache, 'localizar' continua usando as XPaths originais
+            logging.warning(f"Não foi possível resolver os ids dos campos do formulário: {e}")
+            self._ids = {}
+            self._resolvido = True
+            return
+
+        self._ids = {campo: id_ for campo, id_ in zip(self.campos, ids or []) if id_}
+        self._resolvido = True
+        logging.debug("Ids dos campos resolvidos: %s", self._ids)
+
+    def invalidar(self):
+        """Descarta o cache (ex.: após driver.refresh(), quando o formulário é recriado)."""
+        self._ids = {}
+        self._resolvido = False
+
+    def localizar(self, campo):
+        """Retorna o par (By, valor) mais barato disponível para o campo."""
+        id_ = self._ids.get(campo)
+        if id_:
+            return By.ID, id_
+        return By.XPATH, self.xpaths[campo]
+
+    def encontrar(self, driver, campo):
+        """find_element pelo id em cache; se o id sumiu do DOM, invalida e volta para a XPath."""
+        by, valor = self.localizar(campo)
+        try:
+            return driver.find_element(by, valor)
+        except NoSuchElementException:
+            if by == By.XPATH:
+                raise
+            logging.warning("Id em cache do campo '%s' não existe mais. Recompilando localizadores.", campo)
+            self.invalidar()
+            return driver.find_element(By.XPATH, self.xpaths[campo])
+
+    def clicavel(self, campo):
+        """
+        Condição de espera: o campo está clicável. Procura pelo id em cache e, se
+        ele não existe mais no DOM, invalida o cache e segue pela XPath na mesma
+        espera (em vez de esgotar o timeout num id velho).
+        """
+        def _condicao(driver):
+            by, valor = self.localizar(campo)
+            try:
+                elementos = driver.find_elements(by, valor)
+                if not elementos and by == By.ID:
+                    logging.warning("Id em cache do campo '%s' não existe mais. Recompilando localizadores.", campo)
+                    self.invalidar()
+                    elementos = driver.find_elements(By.XPATH, self.xpaths[campo])
+                elemento = elementos[0] if elementos else None
+                return elemento if elemento and elemento.is_displayed() and elemento.is_enabled() else False
+            except StaleElementReferenceException:
+                return False
+        return _condicao
@@ -0,0 +1,161 @@
+import sys
+import json
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import configparser
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+# Logger das mensagens POR REGISTRO (tentativa, sucesso, falha de cada linha).
+# Tem nível próprio ('nivel_registro' no [LOG]) para execuções grandes não ficarem
+# lentas por causa do próprio log: com WARNING, só as falhas são registradas.
+NOME_LOGGER_REGISTRO = "rpa.registro"
+
+CONFIG_PADRAO = {
+    "arquivo": "log_rpa_cadastro.log",
+    "nivel": "INFO",
+    "nivel_registro": "INFO",
+    "formato": "json",        # 'json' (uma linha JSON por evento) ou 'texto'
+    "rotacao_mb": "10",       # Rotaciona ao atingir o tamanho...
+    "rotacao_quando": "",     # ...ou por tempo (ex.: 'midnight'), se preenchido
+    "backups": "5",
+}
+
+FORMATO_TEXTO = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Campos da execução (run id, job) e do registro em andamento (por thread)
+_contexto_execucao = {"run_id": uuid.uuid4().hex[:12]}
+_contexto_registro = threading.local()
+_listener = None
+
+
+def definir_contexto(**campos):
+    """Acrescenta campos a todas as linhas de log seguintes (ex.: job='planilha_janeiro')."""
+    _contexto_execucao.update(campos)
+
+
+@contextmanager
+def contexto_registro(indice, email):
+    """Marca as linhas de log desta thread com o índice e o email do registro em andamento."""
+    _contexto_registro.indice = indice
+    _contexto_registro.email = email
+    try:
+        yield
+    finally:
+        _contexto_registro.indice = None
+        _contexto_registro.email = None
+
+
+class _FiltroContexto(logging.Filter):
+    """
+    Copia o contexto para o LogRecord. Roda na thread que gerou o log (antes da
+    fila), pois o contexto do registro é por thread.
+    """
+
+    def filter(self, record):
+        record.__dict__.update(_contexto_execucao)
+        record.registro = getattr(_contexto_registro, "indice", None)
+        record.email = getattr(_contexto_registro, "email", None)
+        return True
+
+
+class _QueueHandlerAdiado(QueueHandler):
+    """
+    QueueHandler que NÃO formata a mensagem na thread de origem (o padrão
+    formata em 'prepare'). A fila é em memória, então o LogRecord vai
+    intacto e o '%' só é aplicado na thread do QueueListener.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class FormatadorJson(logging.Formatter):
+    """Uma linha JSON por evento: horário, nível, thread, mensagem e o contexto (run id, registro, email)."""
+
+    def format(self, record):
+        evento = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "nivel": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "mensagem": record.getMessage(),
+        }
+        for campo in _contexto_execucao:
+            evento[campo] = getattr(record, campo, None)
+        if getattr(record, "registro", None) is not None:
+            evento["registro"] = record.registro
+            evento["email"] = record.email
+        if record.exc_info:
+            evento["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+def ler_config_log(arquivo_config='config.ini'):
+    """Lê a seção [LOG] do config.ini (opcional); sem ela, usa CONFIG_PADRAO."""
+    cfg = dict(CONFIG_PADRAO)
+    if arquivo_config:
+        parser = configparser.ConfigParser()
+        parser.read(arquivo_config, encoding='utf-8')
+        if parser.has_section('LOG'):
+            cfg.update({chave: valor for chave, valor in parser['LOG'].items() if chave in CONFIG_PADRAO})
+    return cfg
+
+
+def configurar_logging(arquivo_config='config.ini'):
+    """
+    Configura o logging assíncrono: os loggers só enfileiram o LogRecord e
+    uma thread (QueueListener) formata e grava no arquivo rotativo e no
+    console. Chamar uma vez, no início do processo.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    cfg = ler_config_log(arquivo_config)
+
+    if cfg["rotacao_quando"]:
+        manipulador_arquivo = TimedRotatingFileHandler(
+            cfg["arquivo"], when=cfg["rotacao_quando"], backupCount=int(cfg["backups"]), encoding='utf-8'
+        )
+    else:
+        manipulador_arquivo = RotatingFileHandler(
+            cfg["arquivo"], maxBytes=int(float(cfg["rotacao_mb"]) * 1024 * 1024),
+            backupCount=int(cfg["backups"]), encoding='utf-8'
+        )
+    manipulador_arquivo.setFormatter(
+        FormatadorJson() if cfg["formato"].lower() == "json" else logging.Formatter(FORMATO_TEXTO)
+    )
+
+    manipulador_console = logging.StreamHandler(sys.stderr)
+    manipulador_console.setFormatter(logging.Formatter(FORMATO_TEXTO))
+
+    fila = queue.SimpleQueue()
+    manipulador_fila = _QueueHandlerAdiado(fila)
+    manipulador_fila.addFilter(_FiltroContexto())
+
+    raiz = logging.getLogger()
+    for manipulador in list(raiz.handlers):
+        raiz.removeHandler(manipulador)
+    raiz.addHandler(manipulador_fila)
+    raiz.setLevel(cfg["nivel"].upper())
+    logging.getLogger(NOME_LOGGER_REGISTRO).setLevel(cfg["nivel_registro"].upper())
+
+    _listener = QueueListener(fila, manipulador_arquivo, manipulador_console, respect_handler_level=True)
+    _listener.start()
+    # Esvazia a fila antes de o processo terminar (as últimas linhas não se perdem)
+    atexit.register(encerrar_logging)
+
+    logging.info(f"Logging configurado (run id {_contexto_execucao['run_id']}, formato {cfg['formato']}, arquivo {cfg['arquivo']}).")
+    return _listener
+
+
+def encerrar_logging():
+    """Para a thread do log depois de gravar tudo o que está na fila."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,94 @@
+import os
+import json
+import time
+import shutil
+import logging
+
+from utils.download import iniciar_inotify, aguardar_evento, xlsx_valido, EXTENSOES_TEMPORARIAS
+
+PASTA_PROCESSADOS = "processados"
+PASTA_ERROS = "erros"
+
+
+def nome_job(caminho_planilha):
+    """Nome do job: o nome da planilha sem extensão (identifica journal, métricas e rejeitados)."""
+    return os.path.splitext(os.path.basename(caminho_planilha))[0]
+
+
+def com_sufixo(caminho, sufixo):
+    """'metricas.json' + 'job1' -> 'metricas_job1.json' (arquivos próprios de cada job)."""
+    base, extensao = os.path.splitext(caminho)
+    return f"{base}_{sufixo}{extensao}"
+
+
+def registrar_status(caminho, registro):
+    """Acrescenta o status de um job ao arquivo JSON Lines do lote (uma linha por job)."""
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class CaixaEntrada:
+    """
+    Pasta de entrada do modo lote: cada planilha .xlsx colocada nela vira um
+    job, na ordem de chegada. Depois de processada, a planilha é movida para
+    'processados/' ou 'erros/' (com data e hora no nome).
+
+    No Linux a pasta é observada via inotify (o robô dorme até chegar um
+    arquivo); nos outros sistemas é consultada a cada 'intervalo' segundos.
+    Arquivos ainda sendo copiados (temporários ou XLSX incompleto) esperam.
+    """
+
+    def __init__(self, diretorio, intervalo=2.0):
+        self.diretorio = diretorio
+        self.intervalo = intervalo
+        for pasta in (diretorio, os.path.join(diretorio, PASTA_PROCESSADOS), os.path.join(diretorio, PASTA_ERROS)):
+            os.makedirs(pasta, exist_ok=True)
+
+    def pendentes(self):
+        """Planilhas completas na pasta, da mais antiga para a mais nova."""
+        planilhas = []
+        for nome in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome)
+            # '~$' = arquivo de trava do Excel
+            if (not nome.lower().endswith(".xlsx") or nome.startswith(("~$", "."))
+                    or nome.endswith(EXTENSOES_TEMPORARIAS) or not os.path.isfile(caminho)):
+                continue
+            if xlsx_valido(caminho):
+                planilhas.append((os.path.getmtime(caminho), nome, caminho))
+        return [caminho for _, _, caminho in sorted(planilhas)]
+
+    def jobs(self):
+        """
+        Gera as planilhas pendentes indefinidamente (Ctrl+C encerra). Quem
+        consome deve chamar 'concluir' antes de pedir o próximo job.
+        """
+        logging.info(f"Modo lote: aguardando planilhas em {os.path.abspath(self.diretorio)}")
+        while True:
+            # O watch é criado ANTES de listar, para não perder um arquivo que chegue no meio
+            fd = iniciar_inotify(self.diretorio)
+            try:
+                pendentes = self.pendentes()
+                if not pendentes:
+                    if fd is None:
+                        time.sleep(self.intervalo)
+                    else:
+                        aguardar_evento(fd, 60)  # Relista de tempos em tempos, por segurança
+                    continue
+            finally:
+                if fd is not None:
+                    os.close(fd)
+
+            yield pendentes[0]
+
+    def concluir(self, caminho_planilha, sucesso):
+        """Move a planilha para 'processados/' ou 'erros/'. Retorna o novo caminho."""
+        destino = os.path.join(
+            self.diretorio,
+            PASTA_PROCESSADOS if sucesso else PASTA_ERROS,
+            f"{time.strftime('%Y%m%d-%H%M%S')}_{os.path.basename(caminho_planilha)}"
+        )
+        shutil.move(caminho_planilha, destino)
+        logging.info(f"Planilha movida para {destino}")
+        return destino
@@ -0,0 +1,219 @@
+import csv
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+
+# Limites superiores (ms) dos baldes dos histogramas; o último balde é "acima de 10 s"
+LIMITES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histograma:
+    """Histograma de durações com baldes fixos: memória constante, não importa o nº de amostras."""
+
+    def __init__(self):
+        self.baldes = [0] * (len(LIMITES_MS) + 1)
+        self.quantidade = 0
+        self.total = 0.0
+        self.minimo = None
+        self.maximo = 0.0
+
+    def adicionar(self, segundos):
+        ms = segundos * 1000
+        self.baldes[bisect.bisect_left(LIMITES_MS, ms)] += 1
+        self.quantidade += 1
+        self.total += segundos
+        self.minimo = ms if self.minimo is None else min(self.minimo, ms)
+        self.maximo = max(self.maximo, ms)
+
+    def percentil(self, p):
+        """Estimativa do percentil (ms): limite superior do balde onde ele cai (limitado ao máximo visto)."""
+        if not self.quantidade:
+            return 0.0
+        alvo = p / 100 * self.quantidade
+        acumulado = 0
+        for indice, contagem in enumerate(self.baldes):
+            acumulado += contagem
+            if acumulado >= alvo:
+                limite = LIMITES_MS[indice] if indice < len(LIMITES_MS) else self.maximo
+                return min(limite, self.maximo)
+        return self.maximo
+
+    def resumo(self):
+        return {
+            "quantidade": self.quantidade,
+            "total_s": round(self.total, 3),
+            "media_ms": round(self.total / self.quantidade * 1000, 1) if self.quantidade else 0.0,
+            "min_ms": round(self.minimo or 0.0, 1),
+            "max_ms": round(self.maximo, 1),
+            "p50_ms": round(self.percentil(50), 1),
+            "p95_ms": round(self.percentil(95), 1),
+            "p99_ms": round(self.percentil(99), 1),
+            "baldes": {
+                (f"<={limite}ms" if n < len(LIMITES_MS) else f">{LIMITES_MS[-1]}ms"): contagem
+                for n, (limite, contagem) in enumerate(zip(LIMITES_MS + (None,), self.baldes))
+                if contagem
+            },
+        }
+
+
+# --- Registro global da execução (thread-safe: os workers paralelos gravam aqui) ---
+_histogramas = {}
+_contadores = {}
+_marcos = {}
+_lock = threading.Lock()
+_inicio_execucao = time.perf_counter()
+
+# Gancho do perfilador (--profile). Desligado (None) não custa nada além de um 'is None'.
+_gancho = None
+
+
+def definir_gancho(gancho):
+    """
+    'gancho(nome, iteracao)' deve retornar um context manager; ele passa a
+    envolver cada span e cada item produzido em 'medir_iteracao'. None desliga.
+    """
+    global _gancho
+    _gancho = gancho
+
+
+def reiniciar():
+    """Zera todas as métricas (início de uma nova execução/job)."""
+    global _inicio_execucao
+    with _lock:
+        _histogramas.clear()
+        _contadores.clear()
+        _marcos.clear()
+        _inicio_execucao = time.perf_counter()
+
+
+def registrar(nome, segundos):
+    with _lock:
+        _histogramas.setdefault(nome, Histograma()).adicionar(segundos)
+
+
+def contar(nome, quantidade=1):
+    with _lock:
+        _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+
+def marco(nome):
+    """Registra (só na primeira chamada) os segundos desde o início da execução até agora."""
+    if nome in _marcos:
+        return
+    with _lock:
+        _marcos.setdefault(nome, round(time.perf_counter() - _inicio_execucao, 3))
+
+
+@contextmanager
+def span(nome):
+    """Mede o bloco 'with' e registra a duração sob 'nome' (mesmo se der exceção)."""
+    inicio = time.perf_counter()
+    try:
+        if _gancho is None:
+            yield
+        else:
+            with _gancho(nome, False):
+                yield
+    finally:
+        registrar(nome, time.perf_counter() - inicio)
+
+
+def medir_iteracao(iteravel, nome):
+    """
+    Repassa os itens de 'iteravel' medindo só o tempo gasto para PRODUZIR cada
+    um (útil na leitura em streaming, em que o parse fica intercalado com o cadastro).
+    O total vai para o span 'nome'.
+    """
+    iterador = iter(iteravel)
+    total = 0.0
+    try:
+        while True:
+            inicio = time.perf_counter()
+            try:
+                if _gancho is None:
+                    item = next(iterador)
+                else:
+                    with _gancho(nome, True):
+                        item = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                total += time.perf_counter() - inicio
+            yield item
+    finally:
+        registrar(nome, total)
+
+
+def resumo():
+    """Retorna {"duracao_execucao_s", "spans": {nome: resumo}, "contadores": {...}, "marcos": {...}}."""
+    with _lock:
+        return {
+            "duracao_execucao_s": round(time.perf_counter() - _inicio_execucao, 3),
+            "spans": {nome: h.resumo() for nome, h in sorted(_histogramas.items())},
+            "contadores": dict(sorted(_contadores.items())),
+            "marcos": dict(_marcos),
+        }
+
+
+def vazao(sucessos, falhas):
+    """Registros/s da etapa de cadastro (None se ela não rodou)."""
+    spans = resumo()["spans"]
+    cadastro = spans.get("cadastrar_funcionarios")
+    if not cadastro or not cadastro["total_s"]:
+        return None
+    return (sucessos + falhas) / cadastro["total_s"]
+
+
+def texto_resumo(sucessos, falhas):
+    """Resumo de vazão e latência em texto (para o email de status)."""
+    spans = resumo()["spans"]
+    linhas = []
+    registros_por_s = vazao(sucessos, falhas)
+    if registros_por_s is not None:
+        linhas.append(f"- Vazão: {registros_por_s:.2f} registros/s")
+    registro = spans.get("registro.total")
+    if registro:
+        linhas.append(
+            f"- Latência por registro: p50 {registro['p50_ms']} ms | "
+            f"p95 {registro['p95_ms']} ms | p99 {registro['p99_ms']} ms"
+        )
+    for etapa in ("inicializacao.navegador", "inicializacao.credenciais", "inicializacao.login", "iniciar_e_logar",
+                  "baixar_planilha", "ler_planilha", "cadastrar_funcionarios", "logout"):
+        if etapa in spans:
+            linhas.append(f"- {etapa}: {spans[etapa]['total_s']} s")
+    reciclagens = _contadores.get("navegador.reciclagens")
+    if reciclagens:
+        linhas.append(f"- Navegador reciclado: {reciclagens}x")
+    if "verificacao.confirmados" in _contadores:
+        linhas.append(
+            f"- Conferência em lote: {_contadores['verificacao.confirmados']} confirmados | "
+            f"{_contadores.get('verificacao.reenfileirados', 0)} reenviados"
+        )
+    primeiro = _marcos.get("primeiro_registro")
+    if primeiro is not None:
+        linhas.append(f"- Tempo até o primeiro registro: {primeiro} s")
+    return "\n".join(linhas)
+
+
+def salvar(caminho_base, extras=None):
+    """
+    Grava '<caminho_base>.json' (resumo completo + 'extras') e
+    '<caminho_base>.csv' (uma linha por span).
+    """
+    dados = resumo()
+    dados.update(extras or {})
+
+    with open(f"{caminho_base}.json", "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+    colunas = ["span", "quantidade", "total_s", "media_ms", "min_ms", "max_ms", "p50_ms", "p95_ms", "p99_ms"]
+    with open(f"{caminho_base}.csv", "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(colunas)
+        for nome, r in dados["spans"].items():
+            escritor.writerow([nome] + [r[c] for c in colunas[1:]])
+
+    logging.info(f"Métricas da execução salvas em {caminho_base}.json / .csv")
@@ -0,0 +1,228 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+
+from utils import metricas
+
+# Etapas grandes (spans executados poucas vezes) em que a memória é fotografada
+# na saída quando o perfil é da execução inteira. Spans por registro ficam de fora:
+# um snapshot do tracemalloc por linha da planilha custaria mais que o próprio cadastro.
+ETAPAS_PRINCIPAIS = (
+    "inicializacao.navegador", "inicializacao.credenciais", "inicializacao.login", "descriptografar_credenciais",
+    "preparar_sessao", "baixar_planilha", "cadastrar_funcionarios", "verificacao.busca", "logout",
+)
+
+
+class AmostradorPilhas:
+    """
+    Profiler por amostragem: a cada 'intervalo' segundos lê a pilha de TODAS
+    as threads (sys._current_frames) e conta cada pilha no formato "collapsed"
+    (uma linha 'thread;quadro;quadro contagem'), pronto para flamegraph.pl ou speedscope.
+    Só amostra enquanto 'ativo' estiver ligado.
+    """
+
+    def __init__(self, intervalo=0.005, max_quadros=128):
+        self.intervalo = intervalo
+        self.max_quadros = max_quadros
+        self.contagens = Counter()
+        self.ativo = threading.Event()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name="perfilador-amostras", daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self.ativo.set()  # Acorda a thread se estiver esperando
+        self._thread.join()
+
+    def _amostrar(self):
+        propria = threading.get_ident()
+        while not self._parar.is_set():
+            if not self.ativo.wait(0.5):
+                continue
+            nomes = {t.ident: t.name for t in threading.enumerate()}
+            for ident, quadro in sys._current_frames().items():
+                if ident == propria:
+                    continue
+                pilha = []
+                while quadro is not None and len(pilha) < self.max_quadros:
+                    codigo = quadro.f_code
+                    pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}".replace(";", ":"))
+                    quadro = quadro.f_back
+                pilha.append(nomes.get(ident, str(ident)).replace(";", ":").replace(" ", "_"))
+                self.contagens[";".join(reversed(pilha))] += 1
+            self._parar.wait(self.intervalo)
+
+    def salvar(self, caminho):
+        with open(caminho, "w", encoding="utf-8") as f:
+            for pilha, contagem in self.contagens.most_common():
+                f.write(f"{pilha} {contagem}\n")
+
+
+class _Etapa:
+    """Context manager que o gancho do metricas coloca em volta de cada span/item (ver Perfilador)."""
+
+    __slots__ = ("perfilador", "nome", "iteracao", "selecionada", "principal", "externa", "antes")
+
+    def __init__(self, perfilador, nome, iteracao):
+        self.perfilador = perfilador
+        self.nome = nome
+        self.iteracao = iteracao
+
+    def __enter__(self):
+        self.selecionada, self.principal, self.externa, self.antes = self.perfilador._entrar(self.nome, self.iteracao)
+
+    def __exit__(self, *exc):
+        self.perfilador._sair(self)
+        return False
+
+
+class Perfilador:
+    """
+    Modo --profile: cProfile (thread principal) + amostragem de pilhas (todas
+    as threads) + tracemalloc, na execução inteira ou só nas 'etapas' (nomes
+    dos spans do metricas, ex.: 'ler_planilha', 'validar_planilha',
+    'descriptografar_credenciais', 'cadastrar_funcionarios').
+
+    No fim grava, com o prefixo 'perfil_<data-hora>' em 'diretorio':
+    '.pstats' (cProfile), '.folded' (pilhas "collapsed" para flame graph) e
+    '_alocacoes.txt' (top-N de alocações por linha, por etapa e no fim).
+    """
+
+    def __init__(self, diretorio, etapas=None, top=25, intervalo_amostra=0.005):
+        self.etapas = set(etapas) if etapas else None  # None = execução inteira
+        self.top = top
+        self.base = os.path.join(diretorio or ".", f"perfil_{time.strftime('%Y%m%d-%H%M%S')}")
+        self.perfil = cProfile.Profile()
+        self.amostrador = AmostradorPilhas(intervalo_amostra)
+        self.memoria = {}  # {etapa: {"chamadas", "pico_bytes", "retido_bytes", "top"}}
+        self._lock = threading.Lock()
+        self._ativas = 0          # Etapas selecionadas em andamento (todas as threads)
+        self._profundidade = 0    # Aninhamento na thread principal (só a externa liga o cProfile)
+        self._pico = 0            # Pico geral (cada etapa zera o pico do tracemalloc para medir o seu)
+        self._inicio = None
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self):
+        self._inicio = time.perf_counter()
+        tracemalloc.start()
+        self.amostrador.iniciar()
+        if self.etapas is None:
+            self.amostrador.ativo.set()
+            self.perfil.enable()
+        metricas.definir_gancho(self._gancho)
+        alvo = "execução inteira" if self.etapas is None else ", ".join(sorted(self.etapas))
+        logging.info(f"Perfilador ligado ({alvo}). Resultados em {self.base}.*")
+
+    def finalizar(self):
+        metricas.definir_gancho(None)
+        if self.etapas is None:
+            self.perfil.disable()
+        self.amostrador.parar()
+
+        final = tracemalloc.take_snapshot()
+        pico = max(self._pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        arquivos = [f"{self.base}.folded", f"{self.base}_alocacoes.txt"]
+        self.amostrador.salvar(arquivos[0])
+        self._salvar_alocacoes(arquivos[1], final, pico)
+        try:
+            self.perfil.dump_stats(f"{self.base}.pstats")
+            arquivos.insert(0, f"{self.base}.pstats")
+            logging.info(f"Perfilador: funções com maior tempo acumulado:\n{self._resumo_cpu(15)}")
+        except (TypeError, ValueError):
+            # Nenhuma etapa selecionada chegou a rodar na thread principal
+            logging.warning("Perfilador: o cProfile não coletou nada (etapas selecionadas não rodaram).")
+
+        logging.info(
+            f"Perfilador: {time.perf_counter() - self._inicio:.1f}s perfilados, pico de memória Python "
+            f"{pico / 1024 / 1024:.1f} MB. Arquivos: {', '.join(arquivos)}"
+        )
+
+    # --- Gancho das etapas ---
+
+    def _gancho(self, nome, iteracao):
+        return _Etapa(self, nome, iteracao)
+
+    def _entrar(self, nome, iteracao):
+        selecionada = nome in self.etapas if self.etapas is not None else nome in ETAPAS_PRINCIPAIS
+        if not selecionada:
+            return False, False, False, None
+
+        principal = threading.current_thread() is threading.main_thread()
+        externa = principal and self._profundidade == 0
+        if principal:
+            self._profundidade += 1
+        if self.etapas is not None:
+            with self._lock:
+                self._ativas += 1
+                if self._ativas == 1:
+                    self.amostrador.ativo.set()
+            if externa:
+                self.perfil.enable()
+
+        antes = None
+        if externa and not iteracao:
+            # Memória só nas etapas que rodam poucas vezes (não em cada item iterado)
+            self._pico = max(self._pico, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            antes = tracemalloc.take_snapshot()
+        return True, principal, externa, antes
+
+    def _sair(self, etapa):
+        if not etapa.selecionada:
+            return
+        if etapa.externa and self.etapas is not None:
+            self.perfil.disable()
+        if etapa.antes is not None:
+            pico = tracemalloc.get_traced_memory()[1]
+            self._pico = max(self._pico, pico)
+            diferenca = tracemalloc.take_snapshot().compare_to(etapa.antes, "lineno")
+            registro = self.memoria.setdefault(
+                etapa.nome, {"chamadas": 0, "pico_bytes": 0, "retido_bytes": 0, "top": []}
+            )
+            registro["chamadas"] += 1
+            registro["pico_bytes"] = max(registro["pico_bytes"], pico)
+            registro["retido_bytes"] += sum(d.size_diff for d in diferenca)
+            registro["top"] = diferenca[:self.top]
+        if etapa.principal:
+            self._profundidade -= 1
+        if self.etapas is not None:
+            with self._lock:
+                self._ativas -= 1
+                if not self._ativas:
+                    self.amostrador.ativo.clear()
+
+    # --- Relatórios ---
+
+    def _resumo_cpu(self, linhas):
+        saida = io.StringIO()
+        pstats.Stats(self.perfil, stream=saida).sort_stats("cumulative").print_stats(linhas)
+        return saida.getvalue()
+
+    def _salvar_alocacoes(self, caminho, final, pico):
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(f"Pico de memória Python (tracemalloc): {pico / 1024 / 1024:.1f} MB\n")
+            for nome, registro in self.memoria.items():
+                f.write(
+                    f"\n=== Etapa '{nome}': {registro['chamadas']}x | pico {registro['pico_bytes'] / 1024 / 1024:.1f} MB | "
+                    f"retido na saída {registro['retido_bytes'] / 1024:+.0f} KiB ===\n"
+                    f"Top {self.top} linhas por memória alocada e ainda viva na saída (última execução):\n"
+                )
+                for estatistica in registro["top"]:
+                    f.write(f"  {estatistica}\n")
+
+            f.write(f"\n=== Fim da execução: top {self.top} linhas por memória ainda alocada ===\n")
+            for estatistica in final.statistics("lineno")[:self.top]:
+                f.write(f"  {estatistica}\n")
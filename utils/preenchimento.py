@@ -0,0 +1,96 @@
+import logging
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+from utils import saude
+
+# Preenche todos os campos, dispara os eventos 'input'/'change' (para frameworks
+# como React/Vue perceberem a mudança), confere os valores e, se todos
+# "pegaram", clica no botão de cadastro. Tudo numa única chamada ao navegador.
+_JS_PREENCHER_E_ENVIAR = """
+var campos = arguments[0], xpathBotao = arguments[1];
+
+function achar(tipo, valor) {
+    if (tipo === 'id') { return document.getElementById(valor); }
+    return document.evaluate(valor, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function definirValor(el, texto) {
+    // Usa o setter nativo do próprio tipo do elemento (input, textarea, select...)
+    // para não ser ignorado por inputs controlados
+    var descritor = null;
+    for (var p = Object.getPrototypeOf(el); p && !descritor; p = Object.getPrototypeOf(p)) {
+        descritor = Object.getOwnPropertyDescriptor(p, 'value');
+    }
+    if (descritor && descritor.set) { descritor.set.call(el, texto); } else { el.value = texto; }
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+
+function limpar(elementos) {
+    for (var n = 0; n < elementos.length; n++) {
+        try { if (elementos[n]) { definirValor(elementos[n], ''); } } catch (e) {}
+    }
+}
+
+var elementos = [], faltando = [];
+for (var n = 0; n < campos.length; n++) {
+    var el = achar(campos[n][1], campos[n][2]);
+    if (!el) { faltando.push(campos[n][0]); }
+    elementos.push(el);
+}
+if (faltando.length) { return {ok: false, faltando: faltando}; }
+
+try {
+    for (var n = 0; n < campos.length; n++) { definirValor(elementos[n], campos[n][3]); }
+} catch (e) {
+    // Campo que não aceita o setter: desfaz e deixa o send_keys cuidar do registro
+    limpar(elementos);
+    return {ok: false, faltando: [campos[n][0]], erro: String(e)};
+}
+
+var divergentes = [];
+for (var n = 0; n < campos.length; n++) {
+    if (elementos[n].value !== campos[n][3]) { divergentes.push(campos[n][0]); }
+}
+var botao = achar('xpath', xpathBotao);
+if (divergentes.length || !botao) {
+    // Desfaz o preenchimento para o caminho send_keys começar de campos vazios
+    limpar(elementos);
+    return {ok: false, faltando: botao ? divergentes : ['botao_cadastrar_funcionario']};
+}
+
+botao.click();
+return {ok: true, faltando: []};
+"""
+
+
+def preencher_e_enviar_rapido(driver, localizador, valores, xpath_botao):
+    """
+    Modo "fast fill": preenche o formulário e envia num único execute_script.
+
+    'valores' é um dict {campo: texto} (ex.: {"campo_nome": "Ana"}) e
+    'localizador' (LocalizadorCampos) fornece o seletor mais barato de cada
+    campo. Retorna True se o formulário foi enviado; False se algum valor não
+    "pegou" ou o script falhou (o chamador deve usar o caminho tradicional
+    com send_keys). Só um navegador morto levanta exceção.
+    """
+    campos = []
+    for campo, texto in valores.items():
+        by, valor = localizador.localizar(campo)
+        campos.append([campo, 'id' if by == By.ID else 'xpath', valor, texto])
+
+    try:
+        resultado = driver.execute_script(_JS_PREENCHER_E_ENVIAR, campos, xpath_botao) or {}
+    except WebDriverException as e:  # Inclui JavascriptException
+        if saude.navegador_morto(e):
+            raise
+        logging.warning("Preenchimento rápido falhou (%s). Usando send_keys.", e)
+        return False
+    if resultado.get('ok'):
+        return True
+
+    erro = f" ({resultado['erro']})" if resultado.get('erro') else ""
+    logging.warning("Preenchimento rápido não confirmou os campos %s%s. Usando send_keys.", resultado.get('faltando'), erro)
+    return False
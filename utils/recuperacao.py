@@ -0,0 +1,180 @@
+import time
+import logging
+import threading
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    NoSuchFrameException,
+    InvalidSessionIdException,
+)
+
+from utils import esperas
+from utils import metricas
+
+# --- Tipos de falha (do mais barato para o mais caro de recuperar) ---
+FALHA_ELEMENTO_OBSOLETO = "elemento_obsoleto"   # reentrar no iframe basta
+FALHA_IFRAME_PERDIDO = "iframe_perdido"         # reentrar no iframe ou recarregar a página
+FALHA_SESSAO_EXPIRADA = "sessao_expirada"       # fazer login de novo
+FALHA_SITE_INDISPONIVEL = "site_indisponivel"   # esperar (backoff) e contar no disjuntor
+FALHA_DESCONHECIDA = "desconhecida"             # recuperação antiga: refresh
+
+# Trechos que indicam página de erro do servidor/rede
+_SINAIS_SITE_FORA = (
+    "net::err_", "err_connection", "err_name_not_resolved", "err_timed_out",
+    "502 bad gateway", "503 service unavailable", "504 gateway timeout", "service unavailable",
+)
+
+
+class CircuitoAberto(Exception):
+    """O site falhou demais em sequência: a execução deve ser abortada (retomar depois com --resume)."""
+
+
+class DisjuntorSite:
+    """
+    Circuit breaker das falhas de "site indisponível".
+
+    Conta falhas de site CONSECUTIVAS (compartilhado entre os workers). Ao
+    chegar em 'limite_falhas', pausa a execução por 'pausa' segundos e deixa
+    passar uma nova tentativa; depois de 'max_pausas' pausas sem nenhum
+    sucesso, levanta CircuitoAberto em vez de gastar todas as retentativas
+    das linhas restantes.
+    """
+
+    def __init__(self, limite_falhas=5, pausa=30, max_pausas=3):
+        self.limite_falhas = limite_falhas
+        self.pausa = pausa
+        self.max_pausas = max_pausas
+        self.falhas_consecutivas = 0
+        self.pausas = 0
+        self._lock = threading.Lock()
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self.falhas_consecutivas = 0
+            self.pausas = 0
+
+    def estavel(self):
+        """True se não há falhas de site em sequência nem pausas desde o último sucesso."""
+        with self._lock:
+            return not self.falhas_consecutivas and not self.pausas
+
+    def registrar_falha(self):
+        with self._lock:
+            self.falhas_consecutivas += 1
+            if self.falhas_consecutivas < self.limite_falhas:
+                return
+            if self.pausas >= self.max_pausas:
+                raise CircuitoAberto(
+                    f"Site indisponível: {self.falhas_consecutivas} falhas seguidas após {self.pausas} pausas. Abortando."
+                )
+            self.pausas += 1
+            self.falhas_consecutivas = 0
+            pausa = self.pausa
+
+        metricas.contar("disjuntor.pausas")
+        logging.error(f"Disjuntor aberto: site indisponível. Pausando {pausa}s ({self.pausas}/{self.max_pausas})...")
+        time.sleep(pausa)  # Pausa proposital: não há condição a esperar enquanto o site está fora
+
+
+class RecuperadorFalhas:
+    """
+    Classifica a exceção de uma tentativa de cadastro e aplica a recuperação
+    mais barata para aquele tipo. Um por driver (os workers têm o seu).
+
+    'relogar(driver)' deve refazer o login e voltar à tela de cadastro.
+    """
+
+    def __init__(self, xpaths, id_iframe, disjuntor=None, relogar=None, backoff_inicial=2, backoff_maximo=30):
+        self.xpaths = xpaths
+        self.id_iframe = id_iframe
+        self.disjuntor = disjuntor or DisjuntorSite()
+        self.relogar = relogar
+        self.backoff_inicial = backoff_inicial
+        self.backoff_maximo = backoff_maximo
+        self._backoff = backoff_inicial
+        self.falhas = 0  # Total de falhas classificadas (quem chama compara antes/depois de um registro)
+
+    def classificar(self, driver, erro):
+        """Retorna um dos tipos FALHA_*; inspeciona a página quando a exceção sozinha não diz."""
+        if isinstance(erro, InvalidSessionIdException):
+            raise erro  # O navegador morreu: não há recuperação dentro do registro
+        if isinstance(erro, StaleElementReferenceException):
+            return FALHA_ELEMENTO_OBSOLETO
+        if isinstance(erro, NoSuchFrameException):
+            return FALHA_IFRAME_PERDIDO
+        if any(sinal in str(erro).lower() for sinal in _SINAIS_SITE_FORA):
+            return FALHA_SITE_INDISPONIVEL
+
+        try:
+            driver.switch_to.default_content()
+            if driver.current_url.startswith("chrome-error://"):
+                return FALHA_SITE_INDISPONIVEL
+            if driver.find_elements(By.XPATH, self.xpaths["campo_usuario"]):
+                return FALHA_SESSAO_EXPIRADA
+            if not driver.find_elements(By.ID, self.id_iframe):
+                texto = driver.execute_script("return document.body ? document.body.innerText : ''") or ""
+                if any(sinal in texto.lower() for sinal in _SINAIS_SITE_FORA):
+                    return FALHA_SITE_INDISPONIVEL
+                return FALHA_IFRAME_PERDIDO
+        except InvalidSessionIdException:
+            raise
+        except Exception as e:
+            logging.debug("Não foi possível inspecionar a página para classificar a falha: %s", e)
+            return FALHA_SITE_INDISPONIVEL
+
+        return FALHA_DESCONHECIDA
+
+    def registrar_sucesso(self):
+        self._backoff = self.backoff_inicial
+        self.disjuntor.registrar_sucesso()
+
+    def registrar_falha(self, driver, erro):
+        """
+        Classifica 'erro' (em TODA falha, inclusive na última tentativa) e
+        alimenta o disjuntor, que pode pausar ou levantar CircuitoAberto.
+        """
+        tipo = self.classificar(driver, erro)
+        self.falhas += 1
+        metricas.contar(f"falha.{tipo}")
+        logging.warning("Falha classificada como '%s'.", tipo)
+        if tipo == FALHA_SITE_INDISPONIVEL:
+            self.disjuntor.registrar_falha()
+        return tipo
+
+    def recuperar(self, driver, tipo, localizador):
+        """Deixa o driver pronto para a próxima tentativa, com a recuperação própria de 'tipo'."""
+        # Qualquer recuperação volta ao conteúdo principal; a próxima tentativa reentra no iframe
+        driver.switch_to.default_content()
+
+        if tipo == FALHA_ELEMENTO_OBSOLETO:
+            localizador.invalidar()
+
+        elif tipo == FALHA_IFRAME_PERDIDO:
+            localizador.invalidar()
+            if not driver.find_elements(By.ID, self.id_iframe):
+                # Saiu da tela de cadastro: volta pelo link (mais barato que recarregar tudo)
+                links_cadastro = driver.find_elements(By.XPATH, self.xpaths["botao_ir_cadastro"])
+                if links_cadastro:
+                    links_cadastro[0].click()
+                    esperas.esperar(driver, lambda d: d.find_elements(By.ID, self.id_iframe), "iframe_reaberto")
+                else:
+                    esperas.recarregar_pagina(driver, By.ID, self.id_iframe)
+
+        elif tipo == FALHA_SESSAO_EXPIRADA:
+            localizador.invalidar()
+            if self.relogar:
+                self.relogar(driver)
+            else:
+                esperas.recarregar_pagina(driver, By.ID, self.id_iframe)
+
+        elif tipo == FALHA_SITE_INDISPONIVEL:
+            logging.warning("Site indisponível. Aguardando %ss antes de recarregar...", self._backoff)
+            time.sleep(self._backoff)  # Backoff exponencial: dá tempo do servidor voltar
+            self._backoff = min(self._backoff * 2, self.backoff_maximo)
+            localizador.invalidar()
+            esperas.recarregar_pagina(driver, By.ID, self.id_iframe)
+
+        else:
+            localizador.invalidar()  # O formulário será recriado: ids podem mudar
+            esperas.recarregar_pagina(driver, By.ID, self.id_iframe)
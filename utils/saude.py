@@ -0,0 +1,190 @@
+import os
+import time
+import logging
+import statistics
+from collections import deque
+
+from selenium.common.exceptions import InvalidSessionIdException
+
+from utils import metricas
+
+try:
+    import psutil  # Opcional: sem ele, o RSS é lido do /proc (Linux)
+except ImportError:
+    psutil = None
+
+# Mensagens de erro de um navegador/chromedriver que já morreu
+_SINAIS_NAVEGADOR_MORTO = (
+    "invalid session id", "chrome not reachable", "session deleted", "disconnected",
+    "no such window", "connection refused", "max retries exceeded",
+)
+
+
+def navegador_morto(erro):
+    """True se 'erro' indica que o navegador (ou o chromedriver) não responde mais."""
+    if isinstance(erro, InvalidSessionIdException):
+        return True
+    return any(sinal in str(erro).lower() for sinal in _SINAIS_NAVEGADOR_MORTO)
+
+
+def _rss_proc(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def rss_arvore(pid):
+    """RSS (bytes) do processo 'pid' e de todos os descendentes; None se não for possível medir."""
+    if psutil:
+        try:
+            processo = psutil.Process(pid)
+            total = 0
+            for p in [processo] + processo.children(recursive=True):
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir("/proc"):
+        return None
+    filhos = {}
+    for nome in os.listdir("/proc"):
+        if not nome.isdigit():
+            continue
+        try:
+            with open(f"/proc/{nome}/stat") as f:
+                # O nome do processo (entre parênteses) pode ter espaços: o ppid vem depois do último ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        filhos.setdefault(ppid, []).append(int(nome))
+
+    total, pendentes = 0, [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        total += _rss_proc(atual)
+        pendentes.extend(filhos.get(atual, ()))
+    return total
+
+
+def pid_chromedriver(driver):
+    """PID do chromedriver (o Chrome e os seus processos são filhos dele)."""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+class VigiaNavegador:
+    """
+    Acompanha a saúde do navegador numa execução longa e decide quando
+    reciclá-lo (fechar, abrir outro e logar de novo):
+
+    - 'reciclar_a_cada': a cada N registros (0 = desligado);
+    - 'limite_rss_mb': RSS da árvore chromedriver + Chrome, amostrado a cada
+      'intervalo_amostra' registros (0 = desligado);
+    - 'fator_latencia': mediana dos últimos 'janela' registros acima de
+      fator x a mediana da primeira janela após abrir o navegador (0 = desligado).
+      Só entram na amostra registros "limpos" (ver 'registrar'): backoffs e
+      pausas do disjuntor medem o site, não o navegador.
+
+    'reciclar(driver)' recebe o driver velho e retorna um novo já logado e na
+    tela de cadastro. O driver vigiado fica em 'driver', para quem abriu a
+    sessão original encerrar o certo no fim (ver 'adotar' e 'atual').
+    """
+
+    def __init__(self, reciclar, reciclar_a_cada=0, limite_rss_mb=0, fator_latencia=0,
+                 janela=50, intervalo_amostra=25):
+        self._reciclar = reciclar
+        self.reciclar_a_cada = reciclar_a_cada
+        self.limite_rss_bytes = int(limite_rss_mb * 1024 * 1024)
+        self.fator_latencia = fator_latencia
+        self.janela = janela
+        self.intervalo_amostra = intervalo_amostra
+        self.driver = None
+        self.reciclagens = 0
+        self._reiniciar_amostras()
+
+    def _reiniciar_amostras(self):
+        self._registros = 0
+        self._latencias = deque(maxlen=self.janela)
+        self._mediana_base = None
+        self._motivo = None
+
+    def adotar(self, driver):
+        """Passa a vigiar 'driver' (sessão aberta por fora, ex.: no início ou entre jobs do lote)."""
+        if driver is not self.driver:
+            self.driver = driver
+            self._reiniciar_amostras()
+
+    def atual(self, driver):
+        """O driver em uso: o último reciclado, ou 'driver' se nunca houve reciclagem."""
+        return self.driver or driver
+
+    def registrar(self, driver, segundos, amostrar_latencia=True):
+        """
+        Registra um registro e verifica os limites. Retorna True se é hora de reciclar.
+        Com 'amostrar_latencia=False' (registro que precisou de retentativa, ou
+        site instável) a latência fica fora da amostra e não dispara a reciclagem.
+        """
+        self._registros += 1
+        if amostrar_latencia:
+            self._latencias.append(segundos)
+
+        if self.reciclar_a_cada and self._registros >= self.reciclar_a_cada:
+            self._motivo = f"{self._registros} registros nesta sessão"
+            return True
+
+        if amostrar_latencia and self.fator_latencia and len(self._latencias) == self.janela:
+            mediana = statistics.median(self._latencias)
+            if self._mediana_base is None:
+                self._mediana_base = mediana
+            elif mediana > self.fator_latencia * self._mediana_base:
+                self._motivo = (
+                    f"latência mediana {mediana * 1000:.0f} ms > {self.fator_latencia}x "
+                    f"a do início da sessão ({self._mediana_base * 1000:.0f} ms)"
+                )
+                return True
+
+        if self.limite_rss_bytes and self._registros % self.intervalo_amostra == 0:
+            pid = pid_chromedriver(driver)
+            rss = rss_arvore(pid) if pid else None
+            if rss is not None:
+                logging.debug("RSS do navegador: %.0f MB", rss / 1024 / 1024)
+                if rss > self.limite_rss_bytes:
+                    self._motivo = f"RSS do navegador {rss / 1024 / 1024:.0f} MB > {self.limite_rss_bytes / 1024 / 1024:.0f} MB"
+                    return True
+
+        return False
+
+    def reciclar(self, driver, motivo=None, disjuntor=None):
+        """
+        Fecha 'driver', abre outro (com login) e retorna o novo. As amostras recomeçam do zero.
+        Se o novo login falhar (site fora do ar), a falha vai para o 'disjuntor'
+        (DisjuntorSite), que pausa e deixa tentar de novo ou levanta CircuitoAberto;
+        sem disjuntor, o erro sobe para quem chamou.
+        """
+        motivo = motivo or self._motivo or "solicitado"
+        logging.warning("Reciclando o navegador (%s)...", motivo)
+        inicio = time.perf_counter()
+        with metricas.span("navegador.reciclagem"):
+            while True:
+                try:
+                    self.driver = self._reciclar(driver)
+                    break
+                except Exception as e:
+                    if disjuntor is None:
+                        raise
+                    logging.error("Reciclagem do navegador falhou: %s", e)
+                    metricas.contar("navegador.reciclagens_falhas")
+                    disjuntor.registrar_falha()  # Pausa ou levanta CircuitoAberto (retome com --resume)
+        self.reciclagens += 1
+        metricas.contar("navegador.reciclagens")
+        self._reiniciar_amostras()
+        logging.info(f"Navegador reciclado em {time.perf_counter() - inicio:.1f}s (reciclagem nº {self.reciclagens}).")
+        return self.driver
@@ -0,0 +1,115 @@
+import os
+import json
+import logging
+import threading
+
+# Caminho do chromedriver resolvido nesta execução (evita nova consulta de versão a cada login)
+_chromedriver_resolvido = None
+_lock = threading.Lock()
+
+# Perfis do Chrome (user-data-dir) já abertos: o Chrome não aceita duas instâncias no mesmo perfil
+_perfis_em_uso = set()
+
+ARQUIVO_CACHE_CHROMEDRIVER = '.chromedriver_path'
+
+
+def resolver_chromedriver(caminho_configurado=None, arquivo_cache=ARQUIVO_CACHE_CHROMEDRIVER):
+    """
+    Retorna o caminho do chromedriver, consultando o webdriver-manager no máximo uma vez.
+
+    Ordem: caminho fixo do config.ini -> cache em memória -> cache em disco ->
+    ChromeDriverManager().install() (que então é gravado no cache). Se o
+    webdriver-manager falhar (ex.: máquina sem internet), usa o cache em disco.
+    """
+    global _chromedriver_resolvido
+
+    if caminho_configurado:
+        return caminho_configurado
+
+    with _lock:
+        if _chromedriver_resolvido and os.path.exists(_chromedriver_resolvido):
+            return _chromedriver_resolvido
+
+        caminho_em_disco = None
+        if os.path.exists(arquivo_cache):
+            with open(arquivo_cache, encoding='utf-8') as f:
+                caminho_em_disco = f.read().strip()
+            if caminho_em_disco and os.path.exists(caminho_em_disco):
+                logging.info(f"Usando chromedriver em cache: {caminho_em_disco}")
+                _chromedriver_resolvido = caminho_em_disco
+                return caminho_em_disco
+
+        try:
+            # Importação tardia: só é necessária quando não há cache
+            from webdriver_manager.chrome import ChromeDriverManager
+            caminho = ChromeDriverManager().install()
+        except Exception as e:
+            logging.error(f"webdriver-manager falhou e não há chromedriver em cache válido: {e}")
+            raise
+
+        with open(arquivo_cache, 'w', encoding='utf-8') as f:
+            f.write(caminho)
+        logging.info(f"Chromedriver resolvido e guardado em cache: {caminho}")
+        _chromedriver_resolvido = caminho
+        return caminho
+
+
+def invalidar_chromedriver(arquivo_cache=ARQUIVO_CACHE_CHROMEDRIVER):
+    """
+    Esquece o chromedriver em cache (memória e disco): depois de uma atualização
+    do Chrome, o binário guardado não serve mais e precisa ser resolvido de novo.
+    """
+    global _chromedriver_resolvido
+
+    with _lock:
+        _chromedriver_resolvido = None
+        if os.path.exists(arquivo_cache):
+            os.remove(arquivo_cache)
+    logging.info("Cache do chromedriver descartado.")
+
+
+def reservar_perfil(perfil_chrome):
+    """Reserva o user-data-dir para esta sessão. Retorna False se outra sessão já o usa."""
+    with _lock:
+        if perfil_chrome in _perfis_em_uso:
+            return False
+        _perfis_em_uso.add(perfil_chrome)
+        return True
+
+
+def liberar_perfil(perfil_chrome):
+    with _lock:
+        _perfis_em_uso.discard(perfil_chrome)
+
+
+def salvar_sessao(driver, arquivo_sessao):
+    """Grava os cookies e a URL do dashboard da sessão logada (permissão só do dono)."""
+    estado = {"url_dashboard": driver.current_url, "cookies": driver.get_cookies()}
+    temporario = arquivo_sessao + '.tmp'
+    fd = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporario, arquivo_sessao)
+    logging.info(f"Sessão salva em {arquivo_sessao} ({len(estado['cookies'])} cookies).")
+
+
+def carregar_sessao(arquivo_sessao):
+    """Retorna o estado salvo por 'salvar_sessao' ou None."""
+    if not arquivo_sessao or not os.path.exists(arquivo_sessao):
+        return None
+    try:
+        with open(arquivo_sessao, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Arquivo de sessão inválido, será ignorado: {e}")
+        return None
+
+
+def aplicar_cookies(driver, url, estado):
+    """Abre o domínio da aplicação e injeta os cookies salvos."""
+    driver.get(url)
+    for cookie in estado.get("cookies", []):
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            logging.debug(f"Cookie ignorado ({cookie.get('name')}): {e}")
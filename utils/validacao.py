@@ -0,0 +1,151 @@
+import os
+import logging
+import pandas as pd
+
+# Colunas esperadas e quais são obrigatórias (mesma regra do cadastro)
+COLUNAS = ['Nome', 'Sobrenome', 'Email', 'Cargo', 'Empresa', 'Endereço', 'Telefone']
+OBRIGATORIAS = ['Nome', 'Email', 'Cargo']
+
+REGEX_EMAIL = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+TAMANHO_TELEFONE = (10, 13)  # dígitos: DDD + número, com ou sem código do país
+
+
+def _como_texto(serie):
+    """
+    Converte a coluna para texto sem espaços nas pontas: números inteiros
+    lidos como float (ex.: 11987654321.0) viram '11987654321' e vazios viram NA.
+    """
+    if pd.api.types.is_integer_dtype(serie):
+        texto = serie.astype('string')
+    else:
+        texto = serie.astype('string').str.strip()
+
+        # Só valores que JÁ são números (um texto como '0119...' não pode perder o zero)
+        if pd.api.types.is_float_dtype(serie):
+            eh_numero = serie.notna()
+        elif pd.api.types.infer_dtype(serie, skipna=True) in ('string', 'empty'):
+            eh_numero = None  # Coluna só de textos: nada a converter
+        else:
+            eh_numero = serie.map(type).isin((int, float))
+
+        if eh_numero is not None and eh_numero.any():
+            numeros = pd.to_numeric(serie[eh_numero], errors='coerce')
+            inteiros = numeros[numeros.notna() & (numeros % 1 == 0)]
+            texto[inteiros.index] = inteiros.astype('int64').astype('string')
+    return texto.mask(texto.eq(''))
+
+
+def validar_dataframe(df, emails_vistos=None):
+    """
+    Valida e normaliza a planilha com operações vetorizadas do pandas.
+
+    Retorna (limpo, rejeitados): 'limpo' só tem linhas prontas para o
+    cadastro (textos normalizados, email minúsculo, telefone só com dígitos);
+    'rejeitados' tem as demais, com a coluna 'motivo'. Se 'emails_vistos'
+    (set) for informado, emails que já estão nele contam como duplicados e os
+    emails aceitos são acrescentados a ele (validação em lotes).
+    """
+    df = df.copy()
+    for coluna in COLUNAS:
+        df[coluna] = _como_texto(df[coluna]) if coluna in df else pd.Series(pd.NA, index=df.index, dtype='string')
+
+    df['Email'] = df['Email'].str.lower()
+    df['Telefone'] = df['Telefone'].str.replace(r'\D', '', regex=True).mask(lambda s: s.eq(''))
+
+    # O primeiro motivo encontrado é o que fica registrado
+    motivo = pd.Series('', index=df.index, dtype='string')
+
+    def marcar(condicao, texto):
+        nonlocal motivo
+        motivo = motivo.mask(motivo.eq('') & condicao.fillna(False).astype(bool), texto)
+
+    for coluna in OBRIGATORIAS:
+        marcar(df[coluna].isna(), f"campo obrigatório ausente: {coluna}")
+
+    marcar(~df['Email'].str.match(REGEX_EMAIL), "email inválido")
+
+    tamanho_telefone = df['Telefone'].str.len()
+    marcar(
+        df['Telefone'].notna() & ~tamanho_telefone.between(*TAMANHO_TELEFONE),
+        "telefone inválido"
+    )
+
+    validos = motivo.eq('')
+    duplicado = validos & df['Email'].duplicated(keep='first')
+    if emails_vistos:
+        # Consulta direta ao set (O(1) por linha), sem reconstruir o set a cada lote
+        duplicado |= validos & df['Email'].map(emails_vistos.__contains__, na_action='ignore').fillna(False).astype(bool)
+    marcar(duplicado, "email duplicado")
+
+    aceitos = motivo.eq('')
+    limpo = df.loc[aceitos, COLUNAS]
+    rejeitados = df.loc[~aceitos].assign(motivo=motivo[~aceitos])
+
+    if emails_vistos is not None:
+        emails_vistos.update(limpo['Email'].tolist())
+
+    return limpo, rejeitados
+
+
+class ValidadorPlanilha:
+    """
+    Aplica 'validar_dataframe' em lotes sobre a leitura em streaming.
+
+    Mantém a memória constante (um lote por vez) e preserva a regra de
+    duplicidade entre lotes com um set de emails já aceitos. As linhas
+    rejeitadas vão para um CSV com o número do registro e o motivo.
+
+    O primeiro lote é pequeno ('lote_inicial') e cada lote seguinte dobra até
+    'tamanho_lote': o cadastro começa logo, sem esperar milhares de linhas
+    serem lidas, e o resto da planilha ainda ganha a vetorização em lotes grandes.
+    """
+
+    def __init__(self, arquivo_rejeitados, tamanho_lote=5000, lote_inicial=50):
+        self.arquivo_rejeitados = arquivo_rejeitados
+        self.tamanho_lote = tamanho_lote
+        self.lote_inicial = min(lote_inicial, tamanho_lote)
+        self.rejeitados = 0
+        self._emails_vistos = set()
+        self._cabecalho_gravado = False
+        if os.path.exists(arquivo_rejeitados):
+            os.remove(arquivo_rejeitados)
+
+    def _processar_lote(self, lote, primeiro_registro):
+        df = pd.DataFrame(lote)
+        df.index = range(primeiro_registro, primeiro_registro + len(lote))
+        limpo, rejeitados = validar_dataframe(df, self._emails_vistos)
+
+        if len(rejeitados):
+            self.rejeitados += len(rejeitados)
+            rejeitados.rename_axis('registro').to_csv(
+                self.arquivo_rejeitados,
+                mode='a',
+                header=not self._cabecalho_gravado,
+                encoding='utf-8'
+            )
+            self._cabecalho_gravado = True
+
+        # Monta os dicionários direto das colunas (bem mais rápido que to_dict('records')),
+        # trocando NA por None para o cadastro tratar como vazio
+        colunas = [limpo[c].to_numpy(dtype=object, na_value=None) for c in COLUNAS]
+        return [dict(zip(COLUNAS, valores)) for valores in zip(*colunas)]
+
+    def filtrar(self, dados_planilha):
+        """Gera apenas os registros válidos, já normalizados."""
+        lote = []
+        primeiro_registro = 1
+        tamanho = self.lote_inicial
+        for funcionario in dados_planilha:
+            lote.append(funcionario)
+            if len(lote) >= tamanho:
+                yield from self._processar_lote(lote, primeiro_registro)
+                primeiro_registro += len(lote)
+                lote = []
+                tamanho = min(tamanho * 2, self.tamanho_lote)
+        if lote:
+            yield from self._processar_lote(lote, primeiro_registro)
+
+        if self.rejeitados:
+            logging.warning(f"{self.rejeitados} registros rejeitados na validação. Detalhes em: {self.arquivo_rejeitados}")
+        else:
+            logging.info("Validação da planilha: nenhum registro rejeitado.")